@@ -0,0 +1,97 @@
+"""
+JSON API для чтения ленты новостей и комментариев.
+
+Ответы собираются из кортежей values_list без моделей и шаблонов.
+Страницы листаются курсором ?after=, а кэшируются так же, как HTML:
+по версии новостей, с условным GET для анонимов.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views import generic
+
+from .cache import (cache_anonymous, get_list_version, get_news_version,
+                    news_page_key)
+from .models import News
+from .pagination import InvalidCursor, keyset_page
+from .views import approved_comments_page
+
+NEWS_API_FIELDS = ('id', 'title', 'text', 'date', 'comment_count')
+
+
+def page_response(request, page, serialize):
+    """Ответ со страницей и ссылкой на следующую."""
+    next_url = None
+    if page.next_cursor:
+        query = request.GET.copy()
+        query['after'] = page.next_cursor
+        next_url = f'{request.path}?{query.urlencode()}'
+    return JsonResponse({
+        'results': [serialize(row) for row in page.object_list],
+        'next': next_url,
+    })
+
+
+def serialize_news(row):
+    return row._asdict()
+
+
+def serialize_comment(row):
+    return {
+        'id': row.id,
+        'text': row.text,
+        'created': row.created,
+        'author': row.author_username,
+    }
+
+
+class ApiView(generic.View):
+    """Ошибки запроса отдаются в JSON, а не HTML-страницей."""
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except InvalidCursor as error:
+            return JsonResponse(
+                {'errors': {'after': [str(error)]}}, status=400
+            )
+        except Http404:
+            return JsonResponse({'detail': 'Не найдено.'}, status=404)
+
+
+@method_decorator(
+    cache_anonymous(lambda request: get_list_version()), name='get'
+)
+class NewsListApi(ApiView):
+    """Лента новостей от свежих к старым по курсору (date, id)."""
+
+    def get(self, request, *args, **kwargs):
+        cursor = request.GET.get('after')
+        page = cache.get_or_set(
+            news_page_key(get_list_version(), cursor),
+            lambda: keyset_page(
+                News.objects.values_list(*NEWS_API_FIELDS, named=True),
+                ('date', 'id'),
+                cursor,
+                settings.NEWS_API_PAGE_SIZE,
+                descending=True,
+            ),
+            settings.NEWS_FRAGMENT_CACHE_TIMEOUT,
+        )
+        return page_response(request, page, serialize_news)
+
+
+@method_decorator(
+    cache_anonymous(lambda request, pk: get_news_version(pk)), name='get'
+)
+class NewsCommentsApi(ApiView):
+    """Одобренные комментарии новости по курсору (created, id)."""
+
+    def get(self, request, pk, *args, **kwargs):
+        get_object_or_404(News.objects.only('id'), pk=pk)
+        page = approved_comments_page(
+            pk, get_news_version(pk), request.GET.get('after')
+        )
+        return page_response(request, page, serialize_comment)
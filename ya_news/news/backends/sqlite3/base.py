@@ -0,0 +1,105 @@
+"""
+Бэкенд SQLite, настроенный для одновременной работы многих запросов.
+
+При подключении включаются WAL (читатели не блокируют писателя),
+synchronous=NORMAL, mmap и увеличенный кеш страниц, а ожидание
+блокировки задаётся busy_timeout. Транзакции открываются через
+BEGIN IMMEDIATE: блокировка записи берётся сразу, а не при первой
+записи, когда SQLite уже не может подождать и отвечает «database is
+locked». Если блокировку не дождались, запрос вне транзакции
+повторяется несколько раз с растущей паузой.
+
+Параметры в OPTIONS, помимо аргументов sqlite3.connect:
+pragmas — словарь, дополняющий PRAGMAS; transaction_mode — режим BEGIN
+(DEFERRED, IMMEDIATE или EXCLUSIVE); lock_retries — число повторов.
+"""
+import random
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в килобайтах.
+    'cache_size': -20000,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+LOCK_RETRIES = 3
+# Пауза перед первым повтором, секунды; дальше она удваивается.
+LOCK_RETRY_DELAY = 0.05
+
+
+def is_locked(error):
+    return 'database is locked' in str(error)
+
+
+class RetryingCursor(base.SQLiteCursorWrapper):
+    """Повторяет запрос, не дождавшийся блокировки, вне транзакции."""
+
+    def __init__(self, connection, retries):
+        super().__init__(connection)
+        self.retries = retries
+
+    def _retry(self, method, *args):
+        for attempt in range(self.retries + 1):
+            try:
+                return method(*args)
+            except base.Database.OperationalError as error:
+                # Внутри транзакции повтор одного запроса не поможет:
+                # её целиком откатит и повторит вызывающий код.
+                if (
+                    attempt == self.retries
+                    or self.connection.in_transaction
+                    or not is_locked(error)
+                ):
+                    raise
+            time.sleep(LOCK_RETRY_DELAY * 2 ** attempt * random.uniform(1, 2))
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._retry(super().executemany, query, list(param_list))
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = {**PRAGMAS, **options.get('pragmas', {})}
+        self.transaction_mode = options.get(
+            'transaction_mode', 'IMMEDIATE'
+        ).upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'transaction_mode должен быть одним из {TRANSACTION_MODES}.'
+            )
+        self.lock_retries = options.get('lock_retries', LOCK_RETRIES)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for option in ('pragmas', 'transaction_mode', 'lock_retries'):
+            params.pop(option, None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for pragma, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {pragma} = {value}')
+        return connection
+
+    def create_cursor(self, name=None):
+        return self.connection.cursor(
+            factory=lambda connection: RetryingCursor(
+                connection, self.lock_retries
+            )
+        )
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,126 @@
+"""
+Потоковый импорт и экспорт новостей в JSON Lines и CSV.
+
+Файл читается построчно, новости сохраняются пачками: для каждой пачки
+уже существующие новости ищутся по естественному ключу (заголовок, дата)
+запросами по KEYS_PER_QUERY пар, затем bulk_update, bulk_create
+и переиндексация в одной транзакции.
+"""
+import csv
+import json
+from datetime import date
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+from .cache import bump_on_commit
+from .models import News
+from .search import get_backend
+
+FIELDS = ('title', 'text', 'date')
+# SQLite ограничивает глубину дерева выражения тысячей узлов.
+KEYS_PER_QUERY = 300
+
+
+def read_records(stream, fmt):
+    """Словари новостей из потока, по одной записи за раз."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_records(stream, fmt, rows):
+    """Пишет кортежи (title, text, date) в поток."""
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(FIELDS)
+        for title, text, news_date in rows:
+            writer.writerow((title, text, news_date.isoformat()))
+        return
+    for title, text, news_date in rows:
+        stream.write(json.dumps(
+            {'title': title, 'text': text, 'date': news_date.isoformat()},
+            ensure_ascii=False,
+        ) + '\n')
+
+
+def export_news(stream, fmt, chunk_size=2000):
+    rows = News.objects.order_by('pk').values_list(*FIELDS).iterator(
+        chunk_size=chunk_size
+    )
+    write_records(stream, fmt, rows)
+
+
+def _to_news(record):
+    return News(
+        title=record['title'],
+        text=record['text'],
+        date=News._meta.get_field('date').to_python(
+            record.get('date') or date.today()
+        ),
+    )
+
+
+def _by_natural_keys(keys, *fields):
+    """
+    Новости с точными парами (заголовок, дата), а не их произведением.
+
+    Пары разбиваются на запросы по KEYS_PER_QUERY.
+    """
+    keys = iter(keys)
+    while True:
+        chunk = list(islice(keys, KEYS_PER_QUERY))
+        if not chunk:
+            return
+        yield from News.objects.filter(reduce(
+            or_, (Q(title=title, date=news_date) for title, news_date in chunk)
+        )).only('pk', *fields)
+
+
+def _save_batch(batch):
+    """Сохраняет пачку, возвращает число созданных и обновлённых."""
+    by_key = {news.natural_key(): news for news in batch}
+    with transaction.atomic():
+        existing = {
+            news.natural_key(): news
+            for news in _by_natural_keys(by_key, *FIELDS)
+        }
+        to_update = []
+        for key in existing.keys() & by_key.keys():
+            existing[key].text = by_key.pop(key).text
+            to_update.append(existing[key])
+        News.objects.bulk_update(to_update, ('text',))
+        created = News.objects.bulk_create(list(by_key.values()))
+        if created and created[0].pk is None:
+            # SQLite не возвращает первичные ключи из bulk_create.
+            created = list(_by_natural_keys(by_key, 'title', 'text'))
+        # bulk-операции не вызывают сигналы: индекс обновляем в той же
+        # транзакции, версии кэша — после её фиксации.
+        get_backend().index_news(to_update + created)
+        bump_on_commit(*(news.pk for news in to_update + created))
+    return len(by_key), len(to_update)
+
+
+def import_news(records, batch_size=1000, progress=None):
+    """
+    Загружает новости пачками по batch_size, каждая в своей транзакции.
+
+    progress(created, updated) вызывается после каждой пачки.
+    """
+    records = iter(records)
+    created = updated = 0
+    while True:
+        batch = [_to_news(record) for record in islice(records, batch_size)]
+        if not batch:
+            return created, updated
+        batch_created, batch_updated = _save_batch(batch)
+        created += batch_created
+        updated += batch_updated
+        if progress:
+            progress(created, updated)
@@ -0,0 +1,165 @@
+"""
+Версии новостей для ключей кэша фрагментов.
+
+Версия — это момент последнего изменения новости или её комментариев
+в наносекундах. Она входит в ключи фрагментов, поэтому изменение новости
+делает старые фрагменты недостижимыми, и удалять их не нужно. Если
+версии новости нет в кэше (вытеснена или новость не менялась), вместо
+неё берётся версия списка: она сдвигается при любом изменении, так что
+устаревший фрагмент не может вернуться. Отсутствующие версии новостей
+в кэш не записываются, и запросы к несуществующим новостям его не
+заполняют.
+
+Запрос, получивший версию, новее которой реплики ещё не видели, читает
+с основной базы, чтобы не закэшировать под новой версией старые данные.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .routers import require_fresh
+
+NEWS_VERSION_KEY = 'news:version:{}'
+LIST_VERSION_KEY = 'news:version:list'
+
+
+def _get_versions(keys):
+    versions = cache.get_many([*keys, LIST_VERSION_KEY])
+    if LIST_VERSION_KEY not in versions:
+        versions[LIST_VERSION_KEY] = time_ns()
+        cache.set(LIST_VERSION_KEY, versions[LIST_VERSION_KEY], timeout=None)
+    versions = {
+        key: versions.get(key, versions[LIST_VERSION_KEY]) for key in keys
+    }
+    if versions:
+        require_fresh(max(versions.values()))
+    return versions
+
+
+def get_news_versions(pks):
+    """Возвращает словарь {pk новости: версия}."""
+    keys = {NEWS_VERSION_KEY.format(pk): pk for pk in pks}
+    versions = _get_versions(list(keys))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_news_version(pk):
+    return get_news_versions([pk])[pk]
+
+
+def get_list_version():
+    """Версия, меняющаяся при изменении любой новости или комментария."""
+    return _get_versions([LIST_VERSION_KEY])[LIST_VERSION_KEY]
+
+
+def bump_news_versions(pks):
+    """Делает устаревшими все закэшированные фрагменты новостей."""
+    version = time_ns()
+    versions = {NEWS_VERSION_KEY.format(pk): version for pk in pks}
+    versions[LIST_VERSION_KEY] = version
+    cache.set_many(versions, timeout=None)
+
+
+def bump_news_version(pk):
+    bump_news_versions([pk])
+
+
+def collect_on_commit(callback_type, items, using=None):
+    """
+    Добавляет items в обработчик callback_type текущей транзакции.
+
+    Обработчик — множество, которое копит элементы всей транзакции.
+    Его первый запуск после фиксации обрабатывает их разом и очищает
+    множество, повторные регистрации того же обработчика пусты.
+    """
+    connection = transaction.get_connection(using)
+    callback = next(
+        (
+            entry[1] for entry in reversed(connection.run_on_commit)
+            if isinstance(entry[1], callback_type)
+        ),
+        None,
+    )
+    if callback is None:
+        callback = callback_type()
+    callback.update(items)
+    # Регистрируем при каждом вызове, чтобы обработчик запустили и те,
+    # кто выполняет только колбэки после некоторого момента, например
+    # captureOnCommitCallbacks в тестах.
+    transaction.on_commit(callback, using=using)
+
+
+class PendingVersions(set):
+    """Новости, версии которых сдвигаются после фиксации транзакции."""
+
+    def __call__(self):
+        if self:
+            pks = set(self)
+            self.clear()
+            bump_news_versions(pks)
+
+
+def bump_on_commit(*pks, using=None):
+    """Сдвигает версии новостей один раз после фиксации транзакции."""
+    collect_on_commit(PendingVersions, pks, using)
+
+
+def bump_list_version():
+    """Делает устаревшими страницы со списком новостей."""
+    cache.set(LIST_VERSION_KEY, time_ns(), timeout=None)
+
+
+def _cursor_hash(cursor):
+    return hashlib.md5((cursor or '').encode()).hexdigest()
+
+
+def comments_page_key(pk, version, cursor):
+    return f'news:{pk}:comments:{version}:{_cursor_hash(cursor)}'
+
+
+def news_page_key(version, cursor):
+    return f'news:list:{version}:{_cursor_hash(cursor)}'
+
+
+def cache_anonymous(version_func):
+    """
+    Условный GET и публичное кэширование страниц для анонимов.
+
+    ETag и Last-Modified строятся из версии, которую возвращает
+    version_func(request, *args, **kwargs), без обращений к БД.
+    Ответы авторизованным пользователям помечаются как private.
+    """
+    def etag(request, *args, **kwargs):
+        return str(version_func(request, *args, **kwargs))
+
+    def last_modified(request, *args, **kwargs):
+        version = version_func(request, *args, **kwargs)
+        return datetime.fromtimestamp(version / 10 ** 9, tz=timezone.utc)
+
+    def decorator(view_func):
+        conditional_view = condition(etag, last_modified)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.user.is_authenticated:
+                # Версия нужна и здесь: по ней запрос выбирает базу до
+                # первого чтения, см. news.routers.require_fresh.
+                version_func(request, *args, **kwargs)
+                response = view_func(request, *args, **kwargs)
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                response = conditional_view(request, *args, **kwargs)
+                patch_cache_control(
+                    response, public=True, max_age=settings.NEWS_CACHE_MAX_AGE
+                )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
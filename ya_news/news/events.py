@@ -0,0 +1,109 @@
+"""
+Рассылка событий о новых комментариях подписчикам потоков SSE.
+
+Бэкенд задаётся настройкой NEWS_EVENTS_BACKEND. InProcessBackend
+доставляет события сразу, но только подписчикам своего процесса.
+Комментарии, одобренные в другом процессе (например, командой
+moderate_comments), потоки находят сами, опрашивая БД раз в
+NEWS_SSE_POLL_INTERVAL секунд. Бэкенд с тем же интерфейсом поверх
+внешней шины доставляет их без этой задержки.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache, partial
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# Сколько непрочитанных событий копится у медленного подписчика.
+QUEUE_SIZE = 100
+
+
+def _offer(queue, message):
+    """Переполненная очередь теряет событие, а не тормозит рассылку."""
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
+
+
+class InProcessBackend:
+    """Подписчики — очереди asyncio в циклах событий текущего процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(dict)
+
+    @property
+    def connections(self):
+        with self._lock:
+            return sum(map(len, self._subscribers.values()))
+
+    def subscribe(self, channel):
+        """Вызывается из цикла событий; возвращает очередь событий."""
+        queue = asyncio.Queue(QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[channel][queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        with self._lock:
+            self._subscribers[channel].pop(queue, None)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    def publish(self, channel, message):
+        """Можно вызывать из любого потока."""
+        with self._lock:
+            targets = list(self._subscribers.get(channel, {}).items())
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # Цикл подписчика уже закрыт, отписка вот-вот случится.
+                pass
+
+
+@lru_cache(maxsize=None)
+def get_hub():
+    """Общий для процесса экземпляр бэкенда событий."""
+    return import_string(settings.NEWS_EVENTS_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_hub(setting, **kwargs):
+    if setting == 'NEWS_EVENTS_BACKEND':
+        get_hub.cache_clear()
+
+
+def news_channel(news_pk):
+    return f'news:{news_pk}'
+
+
+def comment_event(comment):
+    return {
+        'id': comment.pk,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+        'approved': comment.approved.isoformat(),
+        'author': comment.author.username,
+    }
+
+
+def _publish(comments):
+    hub = get_hub()
+    for comment in comments:
+        hub.publish(news_channel(comment.news_id), comment_event(comment))
+
+
+def publish_comments(comments):
+    """
+    Публикует одобренные комментарии после фиксации транзакции.
+
+    События собираются уже после фиксации: до неё авторов не читаем.
+    """
+    transaction.on_commit(partial(_publish, comments))
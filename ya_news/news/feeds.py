@@ -0,0 +1,233 @@
+"""
+RSS- и Atom-ленты новостей и комментариев.
+
+Документ ленты собирается заранее, после фиксации изменения новости или
+комментария, и хранится в кэше вместе с версией, из которой построен.
+Все изменения одной транзакции пересобирают каждую затронутую ленту
+один раз. Запрос ленты не обращается к БД: документ отдаётся из кэша
+с ETag и Last-Modified. Если документ вытеснен или устарел после массовой
+операции без сигналов, он пересобирается при первом запросе.
+"""
+import hashlib
+from datetime import datetime, time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+
+from .cache import collect_on_commit, get_list_version, get_news_version
+from .models import Comment, News
+
+FEED_KEY = 'news:feed:{}:{}:{}'
+
+
+class NewsFeed(Feed):
+    title = 'YaNews'
+    description = 'Последние новости'
+
+    def link(self):
+        return reverse('news:home')
+
+    def items(self):
+        return News.objects.order_by('-date', '-id')[
+            :settings.NEWS_FEED_ITEMS
+        ]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('news:detail', kwargs={'pk': item.pk})
+
+    def item_pubdate(self, item):
+        return timezone.make_aware(datetime.combine(item.date, time.min))
+
+
+class NewsAtomFeed(NewsFeed):
+    feed_type = Atom1Feed
+    subtitle = NewsFeed.description
+
+
+class CommentsFeed(Feed):
+
+    def get_object(self, request, pk):
+        return get_object_or_404(News, pk=pk)
+
+    def title(self, obj):
+        return f'Комментарии: {obj.title}'
+
+    def description(self, obj):
+        return f'Последние комментарии к новости «{obj.title}»'
+
+    def link(self, obj):
+        return reverse('news:detail', kwargs={'pk': obj.pk})
+
+    def items(self, obj):
+        return obj.comment_set.filter(
+            status=Comment.Status.APPROVED
+        ).select_related('author').order_by('-created', '-id')[
+            :settings.NEWS_FEED_ITEMS
+        ]
+
+    def item_title(self, item):
+        return item.author.username
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse(
+            'news:detail', kwargs={'pk': item.news_id}
+        ) + f'#comment-{item.pk}'
+
+    def item_pubdate(self, item):
+        return item.created
+
+
+class CommentsAtomFeed(CommentsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+# Ленты по виду и формату; у лент комментариев есть pk новости.
+FEEDS = {
+    ('news', 'rss'): NewsFeed(),
+    ('news', 'atom'): NewsAtomFeed(),
+    ('comments', 'rss'): CommentsFeed(),
+    ('comments', 'atom'): CommentsAtomFeed(),
+}
+
+
+class FeedRequest(HttpRequest):
+    """
+    Запрос для сборки ленты вне обработки запроса.
+
+    Адрес сайта берётся из NEWS_FEED_BASE_URL, поэтому ссылки в ленте
+    одинаковы, где бы она ни собиралась.
+    """
+
+    def __init__(self):
+        super().__init__()
+        url = urlsplit(settings.NEWS_FEED_BASE_URL)
+        self.META['HTTP_HOST'] = url.netloc
+        self._scheme = url.scheme
+
+    def _get_scheme(self):
+        return self._scheme
+
+
+def feed_version(kind, pk):
+    return get_list_version() if kind == 'news' else get_news_version(pk)
+
+
+def build_feed(kind, fmt, pk=None):
+    """Собирает документ ленты и сохраняет его в кэше."""
+    version = feed_version(kind, pk)
+    args = () if pk is None else (pk,)
+    response = FEEDS[kind, fmt](FeedRequest(), *args)
+    document = {
+        'version': version,
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': '"{}"'.format(hashlib.md5(response.content).hexdigest()),
+        'last_modified': version // 10 ** 9,
+    }
+    cache.set(FEED_KEY.format(kind, fmt, pk), document, timeout=None)
+    return document
+
+
+def get_feed(kind, fmt, pk=None):
+    """Документ ленты из кэша, если он построен из текущей версии."""
+    document = cache.get(FEED_KEY.format(kind, fmt, pk))
+    if document is None or document['version'] != feed_version(kind, pk):
+        document = build_feed(kind, fmt, pk)
+    return document
+
+
+def refresh_news_feeds():
+    """Пересобирает ленты новостей."""
+    for kind, fmt in FEEDS:
+        if kind == 'news':
+            build_feed(kind, fmt)
+
+
+def refresh_comment_feeds(news_pk):
+    """Пересобирает ленты комментариев новости или удаляет их вместе с ней."""
+    news_exists = News.objects.filter(pk=news_pk).exists()
+    for kind, fmt in FEEDS:
+        if kind != 'comments':
+            continue
+        if news_exists:
+            build_feed(kind, fmt, news_pk)
+        else:
+            cache.delete(FEED_KEY.format(kind, fmt, news_pk))
+
+
+class PendingFeeds(set):
+    """Ленты (вид, pk новости), пересобираемые после фиксации транзакции."""
+
+    def __call__(self):
+        feeds = set(self)
+        self.clear()
+        if ('news', None) in feeds:
+            refresh_news_feeds()
+        for kind, news_pk in feeds:
+            if kind == 'comments':
+                refresh_comment_feeds(news_pk)
+
+
+def schedule_feeds(news_pk, news=False):
+    """
+    Пересобирает ленты комментариев новости после фиксации транзакции.
+
+    С news=True пересобираются и ленты новостей. Каждая лента
+    собирается один раз, сколько бы строк ни изменила транзакция.
+    """
+    feeds = [('comments', news_pk)]
+    if news:
+        feeds.append(('news', None))
+    collect_on_commit(PendingFeeds, feeds)
+
+
+def serve_feed(request, kind, fmt, pk=None):
+    if (kind, fmt) not in FEEDS:
+        raise Http404('Неизвестный формат ленты.')
+    document = get_feed(kind, fmt, pk)
+    response = get_conditional_response(
+        request,
+        etag=document['etag'],
+        last_modified=document['last_modified'],
+    )
+    if response is None:
+        response = HttpResponse(
+            document['content'], content_type=document['content_type']
+        )
+    response['ETag'] = document['etag']
+    response['Last-Modified'] = http_date(document['last_modified'])
+    patch_cache_control(
+        response, public=True, max_age=settings.NEWS_CACHE_MAX_AGE
+    )
+    return response
+
+
+def news_feed(request, fmt):
+    """Лента последних новостей."""
+    return serve_feed(request, 'news', fmt)
+
+
+def comments_feed(request, pk, fmt):
+    """Лента одобренных комментариев к новости."""
+    return serve_feed(request, 'comments', fmt, pk)
@@ -0,0 +1,48 @@
+"""
+Окружение Jinja2 для горячих шаблонов из каталога jinja2/.
+
+Шаблоны повторяют вывод шаблонов Django из templates/, поэтому здесь
+те же теги и фильтры: url, cache, localize, truncatewords и fill_url.
+"""
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template.defaultfilters import truncatewords
+from django.urls import reverse
+from django.utils.formats import localize
+from jinja2 import Environment
+from markupsafe import Markup
+
+from .templatetags.url_patterns import fill_url
+
+
+def url(viewname, *args):
+    return reverse(viewname, args=args)
+
+
+def cache(timeout, fragment_name, *vary_on, caller):
+    """
+    Аналог тега {% cache %} для вызова через {% call %}.
+
+    Ключ тот же, что у тега Django, поэтому фрагменты общие для движков.
+    """
+    try:
+        fragment_cache = caches['template_fragments']
+    except InvalidCacheBackendError:
+        fragment_cache = caches['default']
+    key = make_template_fragment_key(fragment_name, vary_on)
+    value = fragment_cache.get(key)
+    if value is None:
+        value = caller()
+        fragment_cache.set(key, value, timeout)
+    return Markup(value)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({'cache': cache, 'url': url})
+    env.filters.update({
+        'fill_url': fill_url,
+        'localize': localize,
+        'truncatewords': truncatewords,
+    })
+    return env
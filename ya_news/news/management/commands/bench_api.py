@@ -0,0 +1,67 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from news.models import Comment, News
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность JSON API и HTML-страниц. '
+        'Данные создаются во временной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--news', type=int, default=500)
+        parser.add_argument('--comments', type=int, default=200)
+
+    def measure(self, client, url, requests, cold):
+        """Запросов в секунду; cold — с пустым кэшем перед каждым."""
+        started = time.perf_counter()
+        for _ in range(requests):
+            if cold:
+                cache.clear()
+            client.get(url)
+        return requests / (time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        with transaction.atomic():
+            News.objects.bulk_create(
+                News(title=f'Новость {i}', text='Текст новости. ' * 20)
+                for i in range(options['news'])
+            )
+            news = News.objects.first()
+            author = get_user_model().objects.create(username='bench_api')
+            Comment.objects.bulk_create(
+                Comment(news=news, author=author, text=f'Комментарий {i}')
+                for i in range(options['comments'])
+            )
+            pages = (
+                ('HTML главная', reverse('news:home')),
+                ('API лента', reverse('news:api_list')),
+                ('HTML новость', reverse(
+                    'news:detail', kwargs={'pk': news.pk}
+                )),
+                ('API комментарии', reverse(
+                    'news:api_comments', kwargs={'pk': news.pk}
+                )),
+            )
+            results = [
+                (name, self.measure(client, url, options['requests'], True),
+                 self.measure(client, url, options['requests'], False))
+                for name, url in pages
+            ]
+            transaction.set_rollback(True)
+        cache.clear()
+        for name, cold, warm in results:
+            self.stdout.write(
+                f'{name:>16}: без кэша {cold:.0f} запр/с, '
+                f'с кэшем {warm:.0f} запр/с'
+            )
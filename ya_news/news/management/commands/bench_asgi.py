@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from news.models import News
+
+BENCH_TITLE = 'bench_asgi'
+# Режим: точка входа и включены ли асинхронные представления.
+MODES = {
+    'wsgi': ('wsgi', '0'),
+    'asgi-sync': ('asgi', '0'),
+    'asgi': ('asgi', '1'),
+}
+
+
+def wsgi_request(application, path, cookie):
+    environ = {'PATH_INFO': path, 'wsgi.input': BytesIO()}
+    if cookie:
+        environ['HTTP_COOKIE'] = cookie
+    setup_testing_defaults(environ)
+    statuses = []
+    started = time.perf_counter()
+    body = application(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    b''.join(body)
+    body.close()
+    return time.perf_counter() - started, int(statuses[0].split()[0])
+
+
+async def asgi_request(application, path, cookie):
+    headers = [(b'host', b'127.0.0.1')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': headers, 'client': ('127.0.0.1', 0),
+        'server': ('127.0.0.1', 80),
+    }
+    disconnect = asyncio.Event()
+    statuses = []
+
+    async def receive():
+        if not statuses:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    disconnect.set()
+    return time.perf_counter() - started, statuses[0]
+
+
+def run_wsgi(paths, requests, concurrency, cookie):
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(
+            lambda number: wsgi_request(
+                application, paths[number % len(paths)], cookie
+            ),
+            range(requests),
+        ))
+
+
+def run_asgi(paths, requests, concurrency, cookie):
+    from django.core.asgi import get_asgi_application
+    application = get_asgi_application()
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(number):
+            async with semaphore:
+                return await asgi_request(
+                    application, paths[number % len(paths)], cookie
+                )
+        return await asyncio.gather(*map(limited, range(requests)))
+    return asyncio.run(main())
+
+
+def summary(results, elapsed):
+    latencies = sorted(latency for latency, _ in results)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'rps': len(results) / elapsed,
+        'p50': quantiles[49] * 1000,
+        'p95': quantiles[94] * 1000,
+        'p99': quantiles[98] * 1000,
+        'errors': sum(status >= 400 for _, status in results),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку и пропускную способность страниц чтения '
+        'под WSGI и ASGI с синхронными и асинхронными представлениями. '
+        'Каждый режим запускается в отдельном процессе, приложение '
+        'вызывается напрямую, без сети.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--news', type=int, default=50)
+        parser.add_argument('--mode', choices=tuple(MODES))
+        parser.add_argument('--path', action='append', default=[])
+        parser.add_argument('--cookie', default='')
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            entry_point, _ = MODES[options['mode']]
+            run = run_wsgi if entry_point == 'wsgi' else run_asgi
+            started = time.perf_counter()
+            results = run(
+                options['path'], options['requests'],
+                options['concurrency'], options['cookie'],
+            )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(json.dumps(summary(results, elapsed)))
+            return
+        News.objects.bulk_create(
+            News(title=BENCH_TITLE, text='Текст новости. ' * 20)
+            for _ in range(options['news'])
+        )
+        try:
+            news = News.objects.filter(title=BENCH_TITLE).first()
+            paths = [
+                reverse('news:home'),
+                reverse('news:detail', kwargs={'pk': news.pk}),
+            ]
+            for mode in MODES:
+                self.report(mode, paths, options)
+        finally:
+            News.objects.filter(title=BENCH_TITLE).delete()
+
+    def report(self, mode, paths, options):
+        command = [
+            sys.executable, sys.argv[0], 'bench_asgi', '--mode', mode,
+            '--requests', str(options['requests']),
+            '--concurrency', str(options['concurrency']),
+        ]
+        for path in paths:
+            command += ['--path', path]
+        _, async_views = MODES[mode]
+        output = subprocess.run(
+            command, capture_output=True, check=True, text=True,
+            env={**os.environ, 'ASYNC_VIEWS': async_views},
+        ).stdout
+        result = json.loads(output)
+        self.stdout.write(
+            f'{mode:>9}: {result["rps"]:.0f} запр/с, '
+            f'p50 {result["p50"]:.1f} мс, p95 {result["p95"]:.1f} мс, '
+            f'p99 {result["p99"]:.1f} мс, ошибок {result["errors"]}'
+        )
@@ -0,0 +1,67 @@
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import Comment, News
+
+
+def measure(queryset):
+    """Время и пиковая память на загрузку всех строк выборки."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = list(queryset)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(rows), elapsed, peak
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает загрузку комментариев полными моделями и лёгкой '
+        'проекцией. Данные создаются во временной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=10_000)
+        parser.add_argument('--authors', type=int, default=100)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            news = News.objects.create(title='Бенчмарк', text='Текст')
+            user_model = get_user_model()
+            user_model.objects.bulk_create([
+                user_model(username=f'bench_{i}', password='!')
+                for i in range(options['authors'])
+            ])
+            authors = list(
+                user_model.objects.filter(username__startswith='bench_')
+            )
+            Comment.objects.bulk_create(
+                (
+                    Comment(
+                        news=news,
+                        author=authors[i % len(authors)],
+                        text=f'Комментарий номер {i}. ' * 5,
+                    )
+                    for i in range(options['comments'])
+                ),
+                batch_size=1000,
+            )
+            results = (
+                ('select_related', measure(
+                    news.comment_set.select_related('author')
+                )),
+                ('listing_rows', measure(news.comment_set.listing_rows())),
+            )
+            transaction.set_rollback(True)
+        for name, (count, elapsed, peak) in results:
+            self.stdout.write(
+                f'{name:>15}: {count} строк, {elapsed * 1000:.1f} мс, '
+                f'пик памяти {peak / 2 ** 20:.2f} МиБ'
+            )
+        saved = results[0][1][2] - results[1][1][2]
+        self.stdout.write(f'Экономия памяти: {saved / 2 ** 20:.2f} МиБ')
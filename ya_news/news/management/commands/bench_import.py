@@ -0,0 +1,64 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.bulk_io import import_news, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость import_news и loaddata. Данные загружаются '
+        'во временных транзакциях и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=50_000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        records = [
+            {
+                'title': f'Новость {i}',
+                'text': f'Текст новости номер {i}. ' * 10,
+                'date': f'20{i % 20 + 10}-01-01',
+            }
+            for i in range(options['news'])
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            feed = Path(directory) / 'feed.jsonl'
+            feed.write_text('\n'.join(
+                json.dumps(record, ensure_ascii=False) for record in records
+            ), encoding='utf-8')
+            fixture = Path(directory) / 'feed.json'
+            fixture.write_text(json.dumps([
+                {'model': 'news.news', 'fields': record}
+                for record in records
+            ], ensure_ascii=False), encoding='utf-8')
+
+            def run_import():
+                with open(feed, encoding='utf-8') as stream:
+                    import_news(
+                        read_records(stream, 'jsonl'),
+                        batch_size=options['batch_size'],
+                    )
+
+            for name, load in (
+                ('loaddata', lambda: call_command(
+                    'loaddata', str(fixture), verbosity=0
+                )),
+                ('import_news', run_import),
+            ):
+                with transaction.atomic():
+                    started = time.perf_counter()
+                    load()
+                    elapsed = time.perf_counter() - started
+                    transaction.set_rollback(True)
+                self.stdout.write(
+                    f'{name:>12}: {elapsed:.2f} с, '
+                    f'{options["news"] / elapsed:.0f} новостей в секунду'
+                )
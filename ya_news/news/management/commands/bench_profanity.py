@@ -0,0 +1,47 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from news.profanity import AhoCorasickMatcher, SubstringMatcher
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+
+
+def random_word(rng, length):
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает проверку текста перебором слов и автоматом '
+        'Ахо — Корасик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--words', type=int, default=5000)
+        parser.add_argument('--text-length', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=100)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        words = [
+            random_word(rng, rng.randint(5, 12))
+            for _ in range(options['words'])
+        ]
+        text = ' '.join(
+            random_word(rng, rng.randint(2, 9))
+            for _ in range(options['text_length'] // 6)
+        )
+        for matcher_class in (SubstringMatcher, AhoCorasickMatcher):
+            started = time.perf_counter()
+            matcher = matcher_class(words)
+            compiled = time.perf_counter()
+            for _ in range(options['repeat']):
+                matcher.search(text)
+            finished = time.perf_counter()
+            self.stdout.write(
+                f'{matcher_class.__name__:>18}: сборка '
+                f'{(compiled - started) * 1000:.1f} мс, проверка '
+                f'{(finished - compiled) / options["repeat"] * 1000:.3f} мс'
+            )
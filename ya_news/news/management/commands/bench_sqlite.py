@@ -0,0 +1,154 @@
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+from django.db.utils import ConnectionHandler
+
+ALIAS = DEFAULT_DB_ALIAS
+# Бэкенд и время жизни соединения: 0 — новое соединение на запрос,
+# как было без CONN_MAX_AGE.
+MODES = {
+    'sqlite3': ('django.db.backends.sqlite3', 0),
+    'tuned': ('news.backends.sqlite3', None),
+}
+SCHEMA = (
+    'CREATE TABLE comment ('
+    'id INTEGER PRIMARY KEY, news_id INTEGER NOT NULL, text TEXT NOT NULL)',
+    'CREATE INDEX comment_news_idx ON comment (news_id, id)',
+)
+
+
+def read(connection, news_id):
+    """Страница новости: счётчик и последние комментарии."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COUNT(*) FROM comment WHERE news_id = %s', [news_id]
+        )
+        cursor.fetchone()
+        cursor.execute(
+            'SELECT id, text FROM comment WHERE news_id = %s '
+            'ORDER BY id DESC LIMIT 20', [news_id]
+        )
+        cursor.fetchall()
+
+
+def write(connection, news_id):
+    """Комментарий: в одной транзакции проверка и вставка."""
+    connection._start_transaction_under_autocommit()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT COUNT(*) FROM comment WHERE news_id = %s', [news_id]
+            )
+            cursor.fetchone()
+            cursor.execute(
+                'INSERT INTO comment (news_id, text) VALUES (%s, %s)',
+                [news_id, 'Комментарий ' * 10],
+            )
+    except Exception:
+        connection.rollback()
+        raise
+    connection.commit()
+
+
+class Worker(threading.Thread):
+
+    def __init__(self, handler, operation, news, deadline, persistent):
+        super().__init__()
+        self.handler = handler
+        self.operation = operation
+        self.news = news
+        self.deadline = deadline
+        self.persistent = persistent
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        connection = self.handler[ALIAS]
+        while time.perf_counter() < self.deadline:
+            started = time.perf_counter()
+            try:
+                self.operation(connection, random.randint(1, self.news))
+            except OperationalError:
+                self.errors += 1
+            else:
+                self.latencies.append(time.perf_counter() - started)
+            if not self.persistent:
+                connection.close()
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность одновременных чтений и записей '
+        'на обычном бэкенде sqlite3 и на news.backends.sqlite3 '
+        'с постоянными соединениями. База создаётся во временном каталоге.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--news', type=int, default=50)
+        parser.add_argument('--comments', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        for mode in MODES:
+            with tempfile.TemporaryDirectory() as directory:
+                self.report(mode, Path(directory) / 'bench.sqlite3', options)
+
+    def report(self, mode, path, options):
+        engine, conn_max_age = MODES[mode]
+        handler = ConnectionHandler({ALIAS: {
+            'ENGINE': engine, 'NAME': path, 'CONN_MAX_AGE': conn_max_age,
+        }})
+        connection = handler[ALIAS]
+        with connection.cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany(
+                'INSERT INTO comment (news_id, text) VALUES (%s, %s)',
+                [
+                    (number % options['news'] + 1, 'Комментарий')
+                    for number in range(options['comments'])
+                ],
+            )
+        connection.close()
+        deadline = time.perf_counter() + options['seconds']
+        workers = [
+            Worker(
+                handler, operation, options['news'], deadline,
+                persistent=conn_max_age != 0,
+            )
+            for operation, count in (
+                (read, options['readers']), (write, options['writers'])
+            )
+            for _ in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        line = [f'{mode:>7}:']
+        for operation in (read, write):
+            done = [
+                worker for worker in workers if worker.operation is operation
+            ]
+            latencies = sorted(
+                latency for worker in done for latency in worker.latencies
+            )
+            p99 = (
+                statistics.quantiles(latencies, n=100)[98] * 1000
+                if len(latencies) > 1 else 0
+            )
+            rate = len(latencies) / options['seconds']
+            line.append(
+                f'{operation.__name__} {rate:.0f} оп/с (p99 {p99:.1f} мс, '
+                f'ошибок {sum(worker.errors for worker in done)});'
+            )
+        self.stdout.write(' '.join(line))
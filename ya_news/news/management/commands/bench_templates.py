@@ -0,0 +1,110 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory, override_settings
+
+from news.models import News
+from news.templatetags.url_patterns import url_pattern
+
+TEMPLATE_NAME = 'news/home.html'
+# Так строка списка выглядела до url_pattern: reverse на каждую новость.
+PATTERN_ROW = '{{ detail_url|fill_url:news.pk }}'
+REVERSE_ROW = "{% url 'news:detail' news.pk %}"
+
+
+def uncached_engine():
+    """Движок Django без cached.Loader: шаблон компилируется каждый раз."""
+    params = dict(settings.TEMPLATES[0])
+    del params['BACKEND']
+    options = dict(params.pop('OPTIONS'))
+    options['loaders'] = options['loaders'][0][1]
+    return DjangoTemplates({
+        **params, 'NAME': 'uncached', 'APP_DIRS': False, 'OPTIONS': options,
+    })
+
+
+def jinja2_engine():
+    try:
+        from django.template.backends.jinja2 import Jinja2
+    except ImportError:
+        return None
+    params = dict(settings.JINJA2_TEMPLATES)
+    del params['BACKEND']
+    return Jinja2({**params, 'NAME': 'jinja2', 'APP_DIRS': False})
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время рендеринга главной (news/home.html) на 1 000 и '
+        '10 000 новостей: без кеша шаблонов, с reverse на каждую строку, '
+        'в текущем профиле и на Jinja2. Кеш фрагментов отключён.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items', type=int, nargs='+', default=[1000, 10000]
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        django_engine = engines['django']
+        source = django_engine.engine.find_template(
+            TEMPLATE_NAME
+        )[0].source
+        variants = {
+            'без кеша шаблонов': lambda: uncached_engine().get_template(
+                TEMPLATE_NAME
+            ),
+            'reverse в строке': lambda: django_engine.from_string(
+                source.replace(PATTERN_ROW, REVERSE_ROW)
+            ),
+            'профиль django': lambda: django_engine.get_template(
+                TEMPLATE_NAME
+            ),
+        }
+        jinja2 = jinja2_engine()
+        if jinja2 is not None:
+            variants['профиль jinja2'] = lambda: jinja2.get_template(
+                TEMPLATE_NAME
+            )
+        dummy_cache = {'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }}
+        with override_settings(CACHES=dummy_cache):
+            for items in options['items']:
+                context = self.context(items)
+                for name, get_template in variants.items():
+                    started = time.perf_counter()
+                    for _ in range(options['repeat']):
+                        get_template().render(context, request)
+                    elapsed = (
+                        (time.perf_counter() - started) / options['repeat']
+                    )
+                    self.stdout.write(
+                        f'{items:>6} новостей, {name:<18}: '
+                        f'{elapsed * 1000:.1f} мс'
+                    )
+
+    @staticmethod
+    def context(items):
+        news_list = [
+            News(
+                pk=number, title=f'Новость {number}', date=date.today(),
+                text='Текст новости. ' * 20, comment_count=number % 3,
+            )
+            for number in range(1, items + 1)
+        ]
+        for news in news_list:
+            news.cache_version = 1
+        return {
+            'object_list': news_list,
+            'detail_url': url_pattern('news:detail'),
+            'fragment_cache_timeout': settings.NEWS_FRAGMENT_CACHE_TIMEOUT,
+        }
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from news.bulk_io import export_news
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает новости в JSON Lines или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-', help='Файл или «-» для stdout.'
+        )
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default=None,
+            help='По умолчанию определяется по расширению файла.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        if path == '-':
+            export_news(self.stdout, fmt, options['chunk_size'])
+            return
+        with open(path, 'w', encoding='utf-8', newline='') as stream:
+            export_news(stream, fmt, options['chunk_size'])
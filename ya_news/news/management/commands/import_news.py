@@ -0,0 +1,52 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from news.bulk_io import import_news, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает новости из JSON Lines или CSV. Существующие '
+        'новости с тем же заголовком и датой обновляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или «-» для stdin.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default=None,
+            help='По умолчанию определяется по расширению файла.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        started = time.perf_counter()
+
+        def progress(created, updated):
+            rate = (created + updated) / (time.perf_counter() - started)
+            self.stderr.write(
+                f'\rСоздано: {created}, обновлено: {updated} '
+                f'({rate:.0f} в секунду)',
+                ending='',
+            )
+
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        try:
+            created, updated = import_news(
+                read_records(stream, fmt),
+                batch_size=options['batch_size'],
+                progress=progress,
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stderr.write('')
+        self.stdout.write(f'Создано: {created}, обновлено: {updated}')
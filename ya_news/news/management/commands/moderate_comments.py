@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from news.moderation import moderate_pending
+
+
+class Command(BaseCommand):
+    help = 'Разбирает очередь комментариев, ожидающих модерации.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Проверять в пуле процессов вместо пула потоков.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и выйти, не дожидаясь новых комментариев.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            approved, rejected = moderate_pending(
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                processes=options['processes'],
+            )
+            if approved or rejected:
+                self.stdout.write(
+                    f'Одобрено: {approved}, отклонено: {rejected}'
+                )
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from news.models import Comment, News
+from news.search import get_backend
+
+
+def batches(queryset, size):
+    """Строки выборки пачками по первичному ключу, память ограничена."""
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс новостей и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        size = options['batch_size']
+        backend.clear()
+        news_total = comments_total = 0
+        for batch in batches(News.objects.only('title', 'text'), size):
+            backend.index_news(batch)
+            news_total += len(batch)
+        approved = Comment.objects.filter(
+            status=Comment.Status.APPROVED
+        ).only('news_id', 'text')
+        for batch in batches(approved, size):
+            backend.index_comments(batch)
+            comments_total += len(batch)
+        self.stdout.write(
+            f'Проиндексировано новостей: {news_total}, '
+            f'комментариев: {comments_total}'
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.cache import bump_news_version
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики комментариев новостей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько новостей проверять за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            batch = list(
+                News.objects.filter(pk__gt=last_pk).order_by('pk')
+                .with_comment_counts()
+                .values_list('pk', 'comment_count', 'comment_total')
+                [:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            drifted = [pk for pk, stored, actual in batch if stored != actual]
+            if drifted:
+                with transaction.atomic():
+                    fixed += News.objects.filter(
+                        pk__in=drifted
+                    ).recount_comments()
+                for pk in drifted:
+                    bump_news_version(pk)
+            checked += len(batch)
+        self.stdout.write(
+            f'Проверено новостей: {checked}, исправлено: {fixed}'
+        )
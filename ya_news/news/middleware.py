@@ -0,0 +1,65 @@
+import random
+import time
+
+from django.conf import settings
+
+from .instrumentation import METRICS, RequestProfile
+from .routers import end_request, start_request
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет запросы за основной базой на время после записи."""
+
+    cookie_name = 'primary_db'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_request(
+            request.method not in SAFE_METHODS
+            or self.cookie_name in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = end_request(token)
+        if wrote:
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class InstrumentationMiddleware:
+    """Замеряет долю запросов, см. news.instrumentation."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+        profile = request.profile = RequestProfile()
+        with profile.record():
+            response = self.get_response(request)
+        match = request.resolver_match
+        METRICS.observe(match.view_name if match else 'unmatched', profile)
+        response['Server-Timing'] = profile.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, 'profile', None)
+        if profile is not None and not response.is_rendered:
+            started = time.perf_counter()
+
+            def finish(response):
+                profile.template_time += time.perf_counter() - started
+
+            response.add_post_render_callback(finish)
+        return response
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+TABLES = {
+    'news_news_fts': 'title, text',
+    'news_comment_fts': 'news_id UNINDEXED, text',
+}
+
+
+def create_fts_tables(apps, schema_editor):
+    """Таблицы нужны только бэкенду SQLiteFTS5Backend."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            for table, columns in TABLES.items():
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE {table} USING fts5({columns}, '
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                )
+    except OperationalError:
+        pass
+
+
+def drop_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for table in TABLES:
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_comment_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_tables, drop_fts_tables),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['date', 'title'], name='news_date_title_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:56
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_approved(apps, schema_editor):
+    Comment = apps.get_model('news', 'Comment')
+    Comment.objects.filter(status='approved').update(approved=F('created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_news_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='approved',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_approved, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['news', 'approved'], name='comment_news_approved_idx'),
+        ),
+    ]
@@ -1,24 +1,172 @@
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
+from threading import local
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import bump_on_commit
+
+# Приращения счётчиков, накопленные внутри News.deferred_comment_counts().
+_deferred_counts = local()
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def get_by_natural_key(self, title, date):
+        return self.get(title=title, date=date)
+
+    def with_comment_counts(self):
+        """Добавляет к новостям число одобренных комментариев."""
+        return self.annotate(comment_total=models.Count(
+            'comment',
+            filter=models.Q(comment__status=Comment.Status.APPROVED),
+        ))
+
+    def recount_comments(self):
+        """Пересчитывает счётчики одним UPDATE с подзапросом."""
+        counts = Comment.objects.filter(
+            news=OuterRef('pk'), status=Comment.Status.APPROVED
+        ).order_by().values('news').annotate(
+            total=Count('pk')
+        ).values('total')
+        return self.update(comment_count=Coalesce(Subquery(counts), 0))
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
+        indexes = (
+            models.Index(fields=('date', 'title'), name='news_date_title_idx'),
+            models.Index(fields=('date', 'id'), name='news_date_id_idx'),
+        )
 
     def __str__(self):
         return self.title
 
+    def natural_key(self):
+        return (self.title, self.date)
+
+    def save(self, *args, **kwargs):
+        """
+        Не перезаписываем счётчик комментариев при обычном сохранении.
+
+        Счётчик меняется только атомарными F()-обновлениями.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comment_count'
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def change_comment_counts(cls, deltas):
+        """Сдвигает счётчики комментариев: deltas — {news_id: приращение}."""
+        pending = getattr(_deferred_counts, 'deltas', None)
+        if pending is not None:
+            pending.update(deltas)
+            return
+        for news_id, delta in deltas.items():
+            if delta:
+                cls.objects.filter(pk=news_id).update(
+                    comment_count=F('comment_count') + delta
+                )
+
+    @classmethod
+    @contextmanager
+    def deferred_comment_counts(cls):
+        """
+        Копит изменения счётчиков и применяет их при выходе из блока.
+
+        Вместо UPDATE на каждый комментарий — один UPDATE на новость.
+        """
+        if getattr(_deferred_counts, 'deltas', None) is not None:
+            yield
+            return
+        _deferred_counts.deltas = Counter()
+        try:
+            yield
+            deltas = _deferred_counts.deltas
+        finally:
+            _deferred_counts.deltas = None
+        cls.change_comment_counts(deltas)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    LISTING_FIELDS = (
+        'id', 'text', 'created', 'status', 'author_id', 'author_username'
+    )
+
+    def listing_rows(self):
+        """
+        Лёгкие строки комментариев для вывода списком.
+
+        Вместо полных экземпляров Comment и User — именованные кортежи
+        только с нужными колонками.
+        """
+        return self.annotate(
+            author_username=F('author__username')
+        ).values_list(*self.LISTING_FIELDS, named=True)
+
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
+        """Массовое создание комментариев вместе с обновлением счётчиков."""
+        objs = list(objs)
+        now = timezone.now()
+        for comment in objs:
+            if comment.is_approved and comment.approved is None:
+                comment.approved = now
+        with transaction.atomic(using=self.db, savepoint=False):
+            created = super().bulk_create(
+                objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts
+            )
+            deltas = Counter(
+                comment.news_id for comment in created
+                if comment.status == Comment.Status.APPROVED
+            )
+            if ignore_conflicts:
+                # Пропущенные строки неизвестны — пересчитываем по БД.
+                News.objects.filter(pk__in=deltas).recount_comments()
+            else:
+                News.change_comment_counts(deltas)
+            bump_on_commit(*deltas, using=self.db)
+        from .search import get_backend
+        # На SQLite bulk_create не возвращает первичные ключи, такие
+        # комментарии попадут в поиск после rebuild_search_index.
+        get_backend().index_comments([
+            comment for comment in created
+            if comment.pk and comment.is_approved
+        ])
+        return created
+
+    def delete(self):
+        """Удаление комментариев с одним UPDATE счётчика на новость."""
+        with transaction.atomic(using=self.db, savepoint=False):
+            with News.deferred_comment_counts():
+                return super().delete()
+
 
 class Comment(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'На модерации'
+        APPROVED = 'approved', 'Одобрен'
+        REJECTED = 'rejected', 'Отклонён'
+
     news = models.ForeignKey(
         News,
         on_delete=models.CASCADE
@@ -29,9 +177,55 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.APPROVED,
+    )
+    # Курсор потоков SSE: одобренное позже отправленного, см. news.sse.
+    approved = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_id_idx',
+            ),
+            models.Index(
+                fields=('status', 'id'),
+                name='comment_status_id_idx',
+            ),
+            models.Index(
+                fields=('news', 'approved'),
+                name='comment_news_approved_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def save(self, *args, **kwargs):
+        """При одобрении, в том числе повторном, запоминаем его время."""
+        if (
+            self.is_approved
+            and getattr(self, 'saved_status', None) != self.Status.APPROVED
+        ):
+            self.approved = timezone.now()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'approved'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминаем статус из БД, чтобы видеть его смену при сохранении."""
+        instance = super().from_db(db, field_names, values)
+        instance.saved_status = instance.__dict__.get('status')
+        return instance
+
+    @property
+    def is_approved(self):
+        return self.status == self.Status.APPROVED
@@ -0,0 +1,111 @@
+"""
+Фоновая модерация комментариев.
+
+Новые комментарии сохраняются со статусом «на модерации». Обработчик
+забирает их из БД пачками, проверяет в пуле потоков или процессов
+и записывает решения массовыми UPDATE.
+"""
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .cache import bump_news_version
+from .events import publish_comments
+from .forms import BAD_WORDS
+from .models import Comment, News
+from .profanity import get_matcher
+from .search import get_backend
+
+LINK_PATTERN = re.compile(r'https?://|www\.', re.IGNORECASE)
+MAX_LINKS_IN_COMMENT = 2
+
+
+def check_bad_words(text):
+    """Текст не содержит запрещённых слов."""
+    return get_matcher(BAD_WORDS).search(text) is None
+
+
+def check_links(text):
+    """Текст не похож на ссылочный спам."""
+    return len(LINK_PATTERN.findall(text)) <= MAX_LINKS_IN_COMMENT
+
+
+def moderate_text(text):
+    """Прогоняет текст через все проверки из COMMENT_MODERATION_CHECKS."""
+    return all(
+        import_string(check)(text)
+        for check in settings.COMMENT_MODERATION_CHECKS
+    )
+
+
+def moderate_pending(batch_size=500, workers=4, processes=False):
+    """
+    Обрабатывает одну пачку комментариев из очереди.
+
+    Возвращает пару (одобрено, отклонено).
+    """
+    batch = list(
+        Comment.objects.filter(status=Comment.Status.PENDING)
+        .order_by('id').values_list('id', 'text')[:batch_size]
+    )
+    if not batch:
+        return 0, 0
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        verdicts = executor.map(
+            moderate_text,
+            [text for _, text in batch],
+            chunksize=max(1, len(batch) // workers),
+        )
+        decisions = {Comment.Status.APPROVED: [], Comment.Status.REJECTED: []}
+        for (pk, _), approved in zip(batch, verdicts):
+            decisions[
+                Comment.Status.APPROVED if approved
+                else Comment.Status.REJECTED
+            ].append(pk)
+    return save_decisions(decisions)
+
+
+def save_decisions(decisions):
+    """Записывает решения модерации и обновляет счётчики новостей."""
+    news_ids = set()
+    approved_ids = []
+    saved = Counter()
+    with transaction.atomic():
+        for status, pks in decisions.items():
+            # Пока шла проверка, комментарий могли удалить или изменить.
+            still_pending = list(
+                Comment.objects.select_for_update().filter(
+                    pk__in=pks, status=Comment.Status.PENDING
+                ).values_list('id', 'news_id')
+            )
+            Comment.objects.filter(
+                pk__in=[pk for pk, _ in still_pending]
+            ).update(
+                status=status,
+                approved=(
+                    timezone.now() if status == Comment.Status.APPROVED
+                    else None
+                ),
+            )
+            news_ids.update(news_id for _, news_id in still_pending)
+            saved[status] = len(still_pending)
+            if status == Comment.Status.APPROVED:
+                approved_ids = [pk for pk, _ in still_pending]
+                News.change_comment_counts(
+                    Counter(news_id for _, news_id in still_pending)
+                )
+    for news_id in news_ids:
+        bump_news_version(news_id)
+    get_backend().index_comments(
+        Comment.objects.filter(pk__in=approved_ids).only('news_id', 'text')
+    )
+    publish_comments(
+        Comment.objects.filter(pk__in=approved_ids).select_related('author')
+    )
+    return saved[Comment.Status.APPROVED], saved[Comment.Status.REJECTED]
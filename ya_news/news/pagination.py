@@ -0,0 +1,74 @@
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import BigIntegerField, Q
+from django.http import Http404
+
+KeysetPage = namedtuple('KeysetPage', ('object_list', 'next_cursor'))
+
+
+class InvalidCursor(Http404):
+    """Курсор не распаковывается: страницы отвечают 404, API — 400."""
+
+
+def encode_cursor(values):
+    """Упаковывает значения ключа в строку для параметра ?after=."""
+    raw = json.dumps([
+        value.isoformat() if hasattr(value, 'isoformat') else value
+        for value in values
+    ])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(model, fields, cursor):
+    """Распаковывает курсор в значения полей модели."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(fields):
+            raise ValueError
+        values = [
+            model._meta.get_field(name).to_python(value)
+            for name, value in zip(fields, values)
+        ]
+        # Число вне 64-битного диапазона драйвер БД не примет.
+        if any(
+            isinstance(value, int) and abs(value) > BigIntegerField.MAX_BIGINT
+            for value in values
+        ):
+            raise ValueError
+        return values
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        raise InvalidCursor('Некорректный курсор страницы.')
+
+
+def keyset_page(queryset, fields, cursor, per_page, descending=False):
+    """
+    Возвращает страницу после курсора по паре полей без OFFSET.
+
+    Последнее поле должно быть уникальным, например первичным ключом.
+    """
+    first, second = fields
+    prefix = '-' if descending else ''
+    lookup = 'lt' if descending else 'gt'
+    queryset = queryset.order_by(prefix + first, prefix + second)
+    if cursor:
+        first_value, second_value = decode_cursor(
+            queryset.model, fields, cursor
+        )
+        queryset = queryset.filter(
+            Q(**{f'{first}__{lookup}': first_value})
+            | Q(**{first: first_value, f'{second}__{lookup}': second_value})
+        )
+    object_list = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        last = object_list[-1]
+        next_cursor = encode_cursor(
+            [getattr(last, name) for name in fields]
+        )
+    return KeysetPage(object_list, next_cursor)
@@ -0,0 +1,141 @@
+"""
+Поиск запрещённых слов в тексте комментариев.
+
+Список слов компилируется один раз в автомат Ахо — Корасик, поэтому
+проверка текста идёт за один проход независимо от размера списка.
+"""
+import os
+import threading
+import unicodedata
+from collections import deque
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+# Латинские буквы и символы, которыми подменяют похожие кириллические.
+HOMOGLYPHS = str.maketrans({
+    'a': 'а', 'b': 'в', 'c': 'с', 'e': 'е', 'h': 'н', 'k': 'к',
+    'm': 'м', 'o': 'о', 'p': 'р', 't': 'т', 'x': 'х', 'y': 'у',
+    'ё': 'е', '0': 'о', '@': 'а',
+})
+
+
+def normalize(text):
+    """Приводит текст к форме, в которой сравниваются слова."""
+    return unicodedata.normalize('NFKC', text).casefold().translate(
+        HOMOGLYPHS
+    )
+
+
+class SubstringMatcher:
+    """Проверка каждого слова через вхождение подстроки."""
+
+    def __init__(self, words):
+        self.words = [word for word in map(normalize, words) if word]
+
+    def search(self, text):
+        """Возвращает первое найденное слово или None."""
+        text = normalize(text)
+        for word in self.words:
+            if word in text:
+                return word
+        return None
+
+
+class AhoCorasickMatcher:
+    """Автомат Ахо — Корасик по нормализованному списку слов."""
+
+    def __init__(self, words):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+        for word in map(normalize, words):
+            if word:
+                self._add(word)
+        self._build_failure_links()
+
+    def _add(self, word):
+        state = 0
+        for char in word:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            state = next_state
+        self.output[state] = word
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                if self.output[next_state] is None:
+                    # Слово, которое заканчивается суффиксом текущего.
+                    self.output[next_state] = self.output[
+                        self.fail[next_state]
+                    ]
+
+    def search(self, text):
+        """Возвращает первое найденное слово или None."""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for char in normalize(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+
+def read_words(path):
+    """Слова из файла: по одному на строку, # — комментарий."""
+    with open(path, encoding='utf-8') as words_file:
+        return [
+            line.strip() for line in words_file
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+
+
+_lock = threading.Lock()
+_compiled = {}
+
+
+def get_matcher(default_words):
+    """
+    Скомпилированный матчер для текущего списка слов.
+
+    Список берётся из файла BAD_WORDS_FILE, если он задан, иначе
+    используется default_words. Изменённый файл перечитывается
+    при следующем вызове.
+    """
+    path = getattr(settings, 'BAD_WORDS_FILE', None)
+    mtime = os.stat(path).st_mtime_ns if path else None
+    key = (path, mtime, id(default_words))
+    matcher = _compiled.get(key)
+    if matcher is None:
+        with _lock:
+            matcher = _compiled.get(key)
+            if matcher is None:
+                matcher_class = import_string(settings.BAD_WORDS_MATCHER)
+                words = read_words(path) if path else default_words
+                matcher = matcher_class(words)
+                _compiled.clear()
+                _compiled[key] = matcher
+    return matcher
+
+
+@receiver(setting_changed)
+def reset_matchers(setting, **kwargs):
+    if setting in ('BAD_WORDS_FILE', 'BAD_WORDS_MATCHER'):
+        _compiled.clear()
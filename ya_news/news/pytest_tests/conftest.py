@@ -1,5 +1,7 @@
 import pytest
 
+from django.conf import settings
+from django.core.cache import cache
 from django.test import Client
 from django.contrib.auth.models import User
 from django.urls import reverse
@@ -7,6 +9,18 @@ from django.urls import reverse
 from news.models import Comment, News
 
 
+def pytest_configure(config):
+    """
+    Объявляет реплику для тестов маршрутизации чтений.
+
+    Её тестовая база SQLite, как и основная, создаётся в памяти.
+    """
+    settings.DATABASES.setdefault('replica', {
+        'ENGINE': 'news.backends.sqlite3',
+        'NAME': settings.BASE_DIR / 'db.replica.sqlite3',
+    })
+
+
 @pytest.fixture
 def create_news_user(db):
     return News.objects.create(title='Заголовок', text='Текст', author=user)
@@ -47,6 +61,14 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Очищает кэш фрагментов, чтобы тесты не влияли друг на друга."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def news():
     """Создает новость для тестов."""
@@ -150,3 +172,9 @@ def logout_url():
 def signup_url():
     """Возвращает URL страницы регистрации."""
     return reverse('users:signup')
+
+
+@pytest.fixture
+def search_url():
+    """Возвращает URL страницы поиска."""
+    return reverse('news:search')
@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+
+from news.models import Comment, News
+from news.pagination import encode_cursor
+
+API_LIST_URL = reverse('news:api_list')
+
+
+def read_all(client, url):
+    """Проходит все страницы по ссылкам next."""
+    results = []
+    while url:
+        data = client.get(url).json()
+        results += data['results']
+        url = data['next']
+    return results
+
+
+@pytest.fixture
+def api_comments_url(news):
+    return reverse('news:api_comments', kwargs={'pk': news.pk})
+
+
+def test_news_feed_reaches_old_news(client, settings):
+    """Лента доступна целиком, от свежих новостей к старым."""
+    settings.NEWS_API_PAGE_SIZE = 3
+    today = date.today()
+    News.objects.bulk_create([
+        News(title=f'Новость {i}', text='Текст',
+             date=today - timedelta(days=i % 4))
+        for i in range(10)
+    ])
+    results = read_all(client, API_LIST_URL)
+    assert len(results) == 10
+    keys = [(item['date'], item['id']) for item in results]
+    assert keys == sorted(keys, reverse=True)
+    assert set(results[0]) == {'id', 'title', 'text', 'date',
+                               'comment_count'}
+
+
+def test_comments_only_approved_in_order(client, settings, news, user,
+                                         api_comments_url):
+    """Комментарии идут по (created, id), без непроверенных."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 2
+    comments = [
+        Comment.objects.create(news=news, author=user, text=f'Комментарий {i}')
+        for i in range(5)
+    ]
+    Comment.objects.create(news=news, author=user, text='На модерации',
+                           status=Comment.Status.PENDING)
+    results = read_all(client, api_comments_url)
+    assert [item['id'] for item in results] == [c.pk for c in comments]
+    assert results[0]['author'] == user.username
+
+
+def test_comments_of_missing_news(client):
+    """Комментарии несуществующей новости дают 404."""
+    url = reverse('news:api_comments', kwargs={'pk': 404})
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('url', (
+    API_LIST_URL,
+    pytest.lazy_fixture('api_comments_url'),
+))
+def test_api_conditional_get(client, url, news):
+    """API отдаёт публичные кэш-заголовки и 304 до изменения новости."""
+    response = client.get(url)
+    assert 'public' in response['Cache-Control']
+    response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize('after', (
+    '!!!', encode_cursor(['2024-01-01', 10 ** 21]),
+))
+def test_invalid_cursor_is_json_error(client, after):
+    """Битый курсор даёт 400 в JSON, а не HTML-страницу 404."""
+    response = client.get(API_LIST_URL, {'after': after})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert 'after' in response.json()['errors']
+
+
+def test_missing_news_is_json_error(client):
+    """Комментарии несуществующей новости — 404 в JSON."""
+    response = client.get(reverse('news:api_comments', kwargs={'pk': 404}))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Не найдено.'}
+
+
+def test_api_refreshed_after_change(client, news, api_comments_url, user,
+                                    django_capture_on_commit_callbacks):
+    """Закэшированная страница обновляется после изменения новости."""
+    assert client.get(api_comments_url).json()['results'] == []
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=user, text='Новый')
+    results = client.get(api_comments_url).json()['results']
+    assert [item['text'] for item in results] == ['Новый']
+    news.title = 'Обновлённая'
+    with django_capture_on_commit_callbacks(execute=True):
+        news.save()
+    results = client.get(API_LIST_URL).json()['results']
+    assert results[0]['title'] == 'Обновлённая'
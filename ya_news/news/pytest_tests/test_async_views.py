@@ -0,0 +1,52 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory
+
+from news import views
+from news.async_views import async_view, read_view
+from news.instrumentation import RequestProfile
+from news.models import News
+
+
+def test_read_view_sync_without_flag(settings):
+    """Без ASYNC_VIEWS страницы остаются синхронными."""
+    settings.ASYNC_VIEWS = False
+    view = views.NewsList.as_view()
+    assert read_view(view) is view
+    settings.ASYNC_VIEWS = True
+    assert asyncio.iscoroutinefunction(read_view(view))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_view_renders_in_pool():
+    """Асинхронная страница рендерится целиком в потоке пула."""
+    news = News.objects.create(title='Асинхронная новость', text='Текст')
+    threads = []
+
+    def view(request, *args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return views.NewsDetailView.as_view()(request, *args, **kwargs)
+
+    request = AsyncRequestFactory().get('/')
+    request.user = AnonymousUser()
+    response = async_to_sync(async_view(view))(request, pk=news.pk)
+    assert response.status_code == 200
+    assert news.title in response.content.decode()
+    assert threads[0].startswith('news-view')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_render_time_recorded(news):
+    """Рендеринг в потоке пула попадает в замер запроса."""
+    request = AsyncRequestFactory().get('/')
+    request.user = AnonymousUser()
+    with RequestProfile().record(memory=False) as profile:
+        async_to_sync(async_view(views.NewsDetailView.as_view()))(
+            request, pk=news.pk
+        )
+    assert profile.template_time > 0
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from django.core.management import call_command
+
+from news.bulk_io import import_news
+from news.cache import get_list_version
+from news.models import News
+
+
+@pytest.fixture
+def feed(tmp_path):
+    path = tmp_path / 'feed.jsonl'
+    path.write_text('\n'.join(
+        json.dumps({
+            'title': f'Новость {i}', 'text': f'Текст {i}',
+            'date': f'2024-01-{i + 1:02d}',
+        }, ensure_ascii=False)
+        for i in range(5)
+    ), encoding='utf-8')
+    return path
+
+
+def test_import_creates_news_in_batches(feed):
+    """Все записи файла загружаются при любом размере пачки."""
+    call_command('import_news', str(feed), batch_size=2)
+    assert News.objects.count() == 5
+    assert News.objects.get(title='Новость 3').text == 'Текст 3'
+
+
+def test_import_upserts_by_natural_key(feed, client, search_url):
+    """Повторный импорт обновляет новости по заголовку и дате."""
+    call_command('import_news', str(feed))
+    feed.write_text(json.dumps({
+        'title': 'Новость 0', 'text': 'Обновлённый текст',
+        'date': '2024-01-01',
+    }, ensure_ascii=False), encoding='utf-8')
+    call_command('import_news', str(feed))
+    assert News.objects.count() == 5
+    assert News.objects.get_by_natural_key(
+        'Новость 0', '2024-01-01'
+    ).text == 'Обновлённый текст'
+    results = client.get(search_url, {'q': 'обновлённый'}).context['results']
+    assert len(results) == 1
+
+
+@pytest.mark.parametrize('extension', ('jsonl', 'csv'))
+def test_export_import_round_trip(extension, feed, tmp_path):
+    """Выгрузка загружается обратно без потерь."""
+    call_command('import_news', str(feed))
+    exported = tmp_path / f'export.{extension}'
+    call_command('export_news', str(exported))
+    before = set(News.objects.values_list('title', 'text', 'date'))
+    News.objects.all().delete()
+    call_command('import_news', str(exported))
+    assert set(News.objects.values_list('title', 'text', 'date')) == before
+
+
+def test_import_matches_exact_natural_keys(
+        django_capture_on_commit_callbacks):
+    """Обновляется только новость с той же парой (заголовок, дата)."""
+    News.objects.bulk_create([
+        News(title='Первая', text='Старый текст', date='2024-01-01'),
+        News(title='Вторая', text='Старый текст', date='2024-01-02'),
+    ])
+    version = get_list_version()
+    with django_capture_on_commit_callbacks(execute=True):
+        created, updated = import_news([
+            {'title': 'Первая', 'text': 'Новый текст', 'date': '2024-01-02'},
+        ])
+        assert get_list_version() == version
+    assert (created, updated) == (1, 0)
+    assert get_list_version() != version
+    assert set(News.objects.values_list('title', 'text')) == {
+        ('Первая', 'Старый текст'),
+        ('Вторая', 'Старый текст'),
+        ('Первая', 'Новый текст'),
+    }
+
+
+def test_import_default_batch_size():
+    """Полная пачка по умолчанию создаётся и повторно обновляется."""
+    records = [
+        {'title': f'Новость {i}', 'text': 'Текст', 'date': '2024-01-01'}
+        for i in range(1000)
+    ]
+    assert import_news(records) == (1000, 0)
+    assert import_news(records) == (0, 1000)
+    assert News.objects.count() == 1000
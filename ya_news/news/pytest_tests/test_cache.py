@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from news.cache import NEWS_VERSION_KEY, get_news_version
+from news.models import Comment, News
+from .constant import TEXT_COMMENT
+
+
+@pytest.fixture(params=('locmem', 'filebased'))
+def cache_backend(request, settings, tmp_path):
+    """Прогоняет тесты кэша на локальном и файловом бэкендах."""
+    if request.param == 'filebased':
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+    return request.param
+
+
+def test_home_entry_served_from_cache(cache_backend, client, home_url, news,
+                                      django_capture_on_commit_callbacks):
+    """Запись на главной берётся из кэша до изменения новости."""
+    client.get(home_url)
+    News.objects.filter(pk=news.pk).update(title='Без сигнала')
+    assert news.title in client.get(home_url).content.decode()
+    news.title = 'Через save'
+    with django_capture_on_commit_callbacks(execute=True):
+        news.save()
+    assert 'Через save' in client.get(home_url).content.decode()
+
+
+def test_detail_refreshed_after_comment(cache_backend, auth_client,
+                                        news_detail_url, comment,
+                                        django_capture_on_commit_callbacks):
+    """Новый и отредактированный комментарий сразу видны на странице."""
+    auth_client.get(news_detail_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_client.post(news_detail_url, data={'text': 'Свежий комментарий'})
+        auth_client.post(
+            reverse('news:edit', kwargs={'pk': comment.pk}),
+            data=TEXT_COMMENT,
+        )
+    content = auth_client.get(news_detail_url).content.decode()
+    assert 'Свежий комментарий' in content
+    assert TEXT_COMMENT['text'] in content
+
+
+def test_user_links_not_cached(cache_backend, auth_client,
+                               not_author_client, news_detail_url, comment):
+    """Ссылки автора не попадают в кэшированные фрагменты."""
+    edit_url = reverse('news:edit', kwargs={'pk': comment.pk})
+    assert edit_url in auth_client.get(news_detail_url).content.decode()
+    content = not_author_client.get(news_detail_url).content.decode()
+    assert comment.text in content
+    assert edit_url not in content
+
+
+def test_bulk_created_comments_invalidate_home(
+        client, home_url, news, user, django_capture_on_commit_callbacks):
+    """Массовое создание комментариев обновляет счётчик на главной."""
+    client.get(home_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.bulk_create([
+            Comment(news=news, author=user, text='Комментарий')
+        ])
+    assert 'Комментариев: 1' in client.get(home_url).content.decode()
+
+
+@pytest.mark.parametrize('url', (
+    pytest.lazy_fixture('home_url'),
+    pytest.lazy_fixture('news_detail_url'),
+))
+def test_anonymous_conditional_get(client, url, news,
+                                   django_capture_on_commit_callbacks):
+    """Повторный запрос анонима с ETag получает 304."""
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert 'public' in response['Cache-Control']
+    assert 'Cookie' in response['Vary']
+    assert response.has_header('Last-Modified')
+    etag = response['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    news.title = 'Обновлённый заголовок'
+    with django_capture_on_commit_callbacks(execute=True):
+        news.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_new_comment_changes_detail_etag(client, news_detail_url, news, user,
+                                         django_capture_on_commit_callbacks):
+    """Новый комментарий меняет ETag страницы новости."""
+    etag = client.get(news_detail_url)['ETag']
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=user, text='Новый')
+    response = client.get(news_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_version_bumped_after_commit(news,
+                                     django_capture_on_commit_callbacks):
+    """Версия новости меняется только после фиксации транзакции."""
+    version = get_news_version(news.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        news.save()
+        assert get_news_version(news.pk) == version
+    assert get_news_version(news.pk) != version
+
+
+@pytest.mark.parametrize('name', ('news:detail', 'news:api_comments'))
+def test_missing_news_versions_not_stored(client, name):
+    """Запросы к несуществующим новостям не заводят версии в кэше."""
+    response = client.get(reverse(name, args=(404,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert cache.get(NEWS_VERSION_KEY.format(404)) is None
+
+
+def test_authenticated_pages_are_private(auth_client, news_detail_url):
+    """Страницы авторизованных пользователей не кэшируются прокси."""
+    response = auth_client.get(news_detail_url)
+    assert 'private' in response['Cache-Control']
+    assert not response.has_header('ETag')
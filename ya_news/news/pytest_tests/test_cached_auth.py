@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from news.backends.auth import user_cache_key
+
+AUTH_TABLES = ('FROM "auth_user"', 'FROM "django_session"')
+
+
+def auth_queries(queries):
+    return [
+        query for query in queries.captured_queries
+        if any(table in query['sql'] for table in AUTH_TABLES)
+    ]
+
+
+def test_logged_in_detail_skips_auth_queries(auth_client, news_detail_url):
+    """Повторный запрос с сессией не читает сессию и пользователя из БД."""
+    auth_client.get(news_detail_url)
+    with CaptureQueriesContext(connection) as queries:
+        response = auth_client.get(news_detail_url)
+    assert response.wsgi_request.user.is_authenticated
+    assert len(auth_queries(queries)) <= 1
+
+
+def test_login_written_to_db_after_request(client, login_url):
+    """Сессия после входа записывается в БД к концу запроса."""
+    user = User.objects.create_user(username='reader', password='secret')
+    client.post(login_url, {'username': 'reader', 'password': 'secret'})
+    session = Session.objects.get(pk=client.session.session_key)
+    assert session.get_decoded()['_auth_user_id'] == str(user.pk)
+
+
+def test_password_change_invalidates_user(auth_client, user, news_detail_url):
+    """После смены пароля старая сессия перестаёт действовать."""
+    auth_client.get(news_detail_url)
+    user.set_password('new-password')
+    user.save()
+    response = auth_client.get(news_detail_url)
+    assert not response.wsgi_request.user.is_authenticated
+
+
+def test_logout_forgets_user_and_session(auth_client, user, logout_url,
+                                         news_detail_url):
+    """Выход удаляет сессию и пользователя из кеша."""
+    auth_client.get(news_detail_url)
+    session_key = auth_client.session.session_key
+    assert cache.get(user_cache_key(user.pk)) is not None
+    auth_client.post(logout_url)
+    assert cache.get(user_cache_key(user.pk)) is None
+    assert not Session.objects.filter(pk=session_key).exists()
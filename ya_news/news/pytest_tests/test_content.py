@@ -1,9 +1,14 @@
+from http import HTTPStatus
+
 import pytest
 
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from news.forms import CommentForm
+from news.models import Comment, News
 
 
 def test_news_count(client, home_url, create_news):
@@ -23,6 +28,31 @@ def test_news_order(client, home_url):
     assert dates == sorted(dates, reverse=True)
 
 
+def test_comment_count_on_home(client, home_url, news_with_comments):
+    """Число комментариев на главной берётся из счётчика новости."""
+    news_item, _ = news_with_comments
+    response = client.get(home_url)
+    news_list = response.context['object_list']
+    counts = {news.pk: news.comment_count for news in news_list}
+    assert counts[news_item.pk] == 5
+    assert 'Комментариев: 5' in response.content.decode()
+
+
+def test_home_queries_do_not_depend_on_comments(client, home_url,
+                                                create_news, user):
+    """Количество запросов главной не зависит от числа комментариев."""
+    with CaptureQueriesContext(connection) as without_comments:
+        client.get(home_url)
+    Comment.objects.bulk_create([
+        Comment(news=news_item, author=user, text=f'Комментарий {i}')
+        for news_item in News.objects.all()
+        for i in range(20)
+    ])
+    with CaptureQueriesContext(connection) as with_comments:
+        client.get(home_url)
+    assert len(with_comments) == len(without_comments)
+
+
 def test_comments_order(client, news_with_comments):
     """Проверка, что комментарии отсортированы в хронологическом порядке."""
     news_item, _ = news_with_comments
@@ -34,6 +64,35 @@ def test_comments_order(client, news_with_comments):
     assert dates == sorted(dates)
 
 
+def test_comments_keyset_pagination(client, news_with_comments, settings):
+    """Переход по курсорам ?after= выдаёт все комментарии без повторов."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 2
+    news_item, _ = news_with_comments
+    detail_url = reverse('news:detail', kwargs={'pk': news_item.pk})
+    seen, pages, cursor = [], 0, None
+    while True:
+        response = client.get(
+            detail_url, {'after': cursor} if cursor else {}
+        )
+        seen += [comment.id for comment in response.context['comments']]
+        pages += 1
+        cursor = response.context['next_cursor']
+        if cursor is None:
+            break
+    expected = list(
+        news_item.comment_set.order_by('created', 'id')
+        .values_list('pk', flat=True)
+    )
+    assert seen == expected
+    assert pages == 3
+
+
+def test_invalid_comments_cursor(client, news_detail_url):
+    """Испорченный курсор приводит к 404."""
+    response = client.get(news_detail_url, {'after': 'не-курсор'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.parametrize("client_fixture, form_visible", (
     ('client', False),        # Анонимный пользователь
     ('auth_client', True)     # Авторизованный пользователь
@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+
+from news import feeds
+from news.models import Comment
+
+RSS_URL = reverse('news:feed', kwargs={'fmt': 'rss'})
+ATOM_URL = reverse('news:feed', kwargs={'fmt': 'atom'})
+
+
+@pytest.fixture
+def comments_feed_url(news):
+    return reverse('news:comments_feed', kwargs={'pk': news.pk, 'fmt': 'rss'})
+
+
+@pytest.mark.parametrize('url, content_type', (
+    (RSS_URL, 'application/rss+xml'),
+    (ATOM_URL, 'application/atom+xml'),
+))
+def test_news_feeds(client, url, content_type, news):
+    """Ленты новостей отдаются в RSS и Atom со ссылками на сайт."""
+    response = client.get(url)
+    assert response['Content-Type'].startswith(content_type)
+    content = response.content.decode()
+    assert news.title in content
+    detail_url = reverse('news:detail', kwargs={'pk': news.pk})
+    assert f'http://localhost:8000{detail_url}' in content
+
+
+def test_feed_served_from_cache_without_queries(
+        client, news, django_assert_num_queries):
+    """Собранная лента отдаётся без запросов к БД, повтор получает 304."""
+    client.get(RSS_URL)
+    with django_assert_num_queries(0):
+        response = client.get(RSS_URL)
+    assert 'public' in response['Cache-Control']
+    with django_assert_num_queries(0):
+        response = client.get(RSS_URL, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_feeds_rebuilt_on_commit(client, news, user, comments_feed_url,
+                                 django_assert_num_queries,
+                                 django_capture_on_commit_callbacks):
+    """После фиксации изменения ленты пересобираются заранее."""
+    client.get(RSS_URL)
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=user, text='В ленту')
+        news.title = 'Новый заголовок'
+        news.save()
+    with django_assert_num_queries(0):
+        news_content = client.get(RSS_URL).content.decode()
+        comments_content = client.get(comments_feed_url).content.decode()
+    assert 'Новый заголовок' in news_content
+    assert 'В ленту' in comments_content
+
+
+@pytest.fixture
+def built_feeds(monkeypatch):
+    """Список лент (вид, формат, pk), собранных во время теста."""
+    built = []
+    build_feed = feeds.build_feed
+
+    def record(kind, fmt, pk=None):
+        built.append((kind, fmt, pk))
+        return build_feed(kind, fmt, pk)
+
+    monkeypatch.setattr(feeds, 'build_feed', record)
+    return built
+
+
+def test_bulk_delete_rebuilds_each_feed_once(
+        news, user, built_feeds, django_capture_on_commit_callbacks):
+    """Удаление пачки комментариев пересобирает только ленты их новости
+    и только один раз.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        news.save()
+        Comment.objects.bulk_create([
+            Comment(news=news, author=user, text=f'Комментарий {i}')
+            for i in range(5)
+        ])
+    built_feeds.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.all().delete()
+    assert sorted(built_feeds) == [
+        ('comments', 'atom', news.pk), ('comments', 'rss', news.pk),
+    ]
+
+
+def test_pending_comment_does_not_rebuild_feeds(
+        news, user, built_feeds, django_capture_on_commit_callbacks):
+    """Комментарий на модерации ленты не меняет."""
+    with django_capture_on_commit_callbacks(execute=True):
+        news.save()
+    built_feeds.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=user, text='На модерации',
+                               status=Comment.Status.PENDING)
+    assert built_feeds == []
+
+
+def test_stale_feed_rebuilt_after_bulk_change(
+        client, news, user, comments_feed_url,
+        django_capture_on_commit_callbacks):
+    """Массовое создание без сигналов тоже обновляет ленту."""
+    client.get(comments_feed_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        news.save()
+        Comment.objects.bulk_create([
+            Comment(news=news, author=user, text='Пакетный комментарий')
+        ])
+    assert 'Пакетный комментарий' in client.get(
+        comments_feed_url).content.decode()
+
+
+def test_pending_comments_not_in_feed(client, news, user, comments_feed_url):
+    """Непроверенные комментарии в ленту не попадают."""
+    Comment.objects.create(news=news, author=user, text='На модерации',
+                           status=Comment.Status.PENDING)
+    assert 'На модерации' not in client.get(
+        comments_feed_url).content.decode()
+
+
+def test_unknown_feed(client):
+    """Неизвестный формат и несуществующая новость дают 404."""
+    assert client.get(
+        reverse('news:feed', kwargs={'fmt': 'json'})
+    ).status_code == HTTPStatus.NOT_FOUND
+    url = reverse('news:comments_feed', kwargs={'pk': 404, 'fmt': 'atom'})
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,83 @@
+import pytest
+from django.urls import reverse
+
+from news.instrumentation import METRICS, RequestProfile
+from news.models import Comment, News
+
+
+@pytest.fixture
+def instrumented(settings):
+    settings.INSTRUMENTATION_SAMPLE_RATE = 1
+    METRICS.clear()
+    yield
+    METRICS.clear()
+
+
+@pytest.fixture
+def many_news(user):
+    news_list = [
+        News.objects.create(title=f'Новость {number}', text='Текст')
+        for number in range(10)
+    ]
+    for news in news_list[:5]:
+        for number in range(3):
+            Comment.objects.create(
+                news=news, author=user, text=f'Комментарий {number}')
+    return news_list
+
+
+def test_disabled_without_sampling(settings, client, home_url):
+    """Без выборки замеров нет."""
+    settings.INSTRUMENTATION_SAMPLE_RATE = 0
+    response = client.get(home_url)
+    assert 'Server-Timing' not in response
+    assert not hasattr(response.wsgi_request, 'profile')
+
+
+def test_server_timing_header(instrumented, client, home_url, many_news):
+    """Замер попадает в заголовок Server-Timing."""
+    response = client.get(home_url)
+    profile = response.wsgi_request.profile
+    assert profile.query_count > 0
+    assert profile.template_time > 0
+    assert profile.peak_memory > 0
+    timing = response['Server-Timing']
+    assert f'desc="{profile.query_count} queries"' in timing
+    assert 'tpl;dur=' in timing
+    assert 'total;dur=' in timing
+
+
+@pytest.mark.parametrize('url_name', ('news:home', 'news:detail'))
+def test_read_pages_have_no_repeated_queries(instrumented, auth_client,
+                                             many_news, url_name):
+    """На страницах чтения нет повторяющихся запросов (N+1)."""
+    kwargs = {'pk': many_news[0].pk} if url_name == 'news:detail' else {}
+    response = auth_client.get(reverse(url_name, kwargs=kwargs))
+    assert response.wsgi_request.profile.duplicates == {}
+
+
+def test_comment_count_n_plus_one_detected(many_news):
+    """Подсчёт комментариев в цикле по новостям распознаётся как N+1."""
+    profile = RequestProfile()
+    with profile.record(memory=False):
+        for news in News.objects.all():
+            news.comment_set.count()
+    [(sql, count)] = profile.duplicates.items()
+    assert 'COUNT(*)' in sql
+    assert count == len(many_news)
+
+
+def test_metrics_endpoint(instrumented, client, home_url):
+    """Счётчики по представлениям отдаются в формате Prometheus."""
+    client.get(home_url)
+    client.get(home_url)
+    body = client.get(reverse('metrics')).content.decode()
+    assert '# TYPE yanews_requests_total counter' in body
+    assert 'yanews_requests_total{view="news:home"} 2' in body
+    assert 'yanews_db_queries_total{view="news:home"}' in body
+
+
+def test_metrics_hidden_from_outside(client, settings):
+    """Счётчики недоступны не из INTERNAL_IPS."""
+    settings.INTERNAL_IPS = []
+    assert client.get(reverse('metrics')).status_code == 404
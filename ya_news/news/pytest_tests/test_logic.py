@@ -1,7 +1,12 @@
 from http import HTTPStatus
 
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
+from news.moderation import moderate_pending
 from .constant import TEXT_COMMENT
 
 
@@ -55,3 +60,76 @@ def test_user_cant_delete_comment_of_another(another_auth_client,
     response = another_auth_client.delete(news_delete_url)
     assert response.status_code == HTTPStatus.NOT_FOUND  # 404
     assert Comment.objects.count() == initial_comment_count
+
+
+def test_comment_count_follows_comments(auth_client, news_detail_url, news):
+    """Счётчик растёт после одобрения комментария и падает при удалении."""
+    auth_client.post(news_detail_url, data=TEXT_COMMENT)
+    news.refresh_from_db()
+    assert news.comment_count == 0
+    moderate_pending()
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    Comment.objects.get().delete()
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_comment_count_after_bulk_operations(news, user):
+    """Массовое создание и удаление комментариев обновляют счётчик."""
+    Comment.objects.bulk_create([
+        Comment(news=news, author=user, text=f'Комментарий {i}')
+        for i in range(3)
+    ])
+    news.refresh_from_db()
+    assert news.comment_count == 3
+    Comment.objects.filter(news=news).delete()
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_bulk_delete_updates_each_news_once(news, user):
+    """Массовое удаление обновляет счётчик каждой новости одним запросом."""
+    other_news = News.objects.create(title='Другая', text='Текст')
+    Comment.objects.bulk_create([
+        Comment(news=item, author=user, text=f'Комментарий {i}')
+        for item in (news, other_news) for i in range(3)
+    ])
+    with CaptureQueriesContext(connection) as queries:
+        Comment.objects.all().delete()
+    updates = [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "news_news"')
+    ]
+    assert len(updates) == 2
+    assert set(
+        News.objects.values_list('comment_count', flat=True)
+    ) == {0}
+
+
+def test_bulk_create_ignore_conflicts_counts_inserted(news, comment):
+    """Пропущенные из-за конфликта комментарии не попадают в счётчик."""
+    Comment.objects.bulk_create([
+        Comment(pk=comment.pk, news=news, author=comment.author, text='Дубль'),
+        Comment(news=news, author=comment.author, text='Новый'),
+    ], ignore_conflicts=True)
+    news.refresh_from_db()
+    assert news.comment_count == 2
+
+
+def test_news_save_keeps_comment_count(news, comment):
+    """Сохранение устаревшего экземпляра новости не сбрасывает счётчик."""
+    stale_news = News.objects.get(pk=news.pk)
+    Comment.objects.create(news=news, author=comment.author, text='Ещё')
+    stale_news.title = 'Новый заголовок'
+    stale_news.save()
+    stale_news.refresh_from_db()
+    assert stale_news.comment_count == 2
+
+
+def test_recount_comments_repairs_drift(news, comment):
+    """Команда recount_comments исправляет рассинхронизацию счётчика."""
+    News.objects.filter(pk=news.pk).update(comment_count=42)
+    call_command('recount_comments', batch_size=1)
+    news.refresh_from_db()
+    assert news.comment_count == 1
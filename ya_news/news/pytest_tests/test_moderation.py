@@ -0,0 +1,50 @@
+import pytest
+
+from django.core.management import call_command
+
+from news.models import Comment
+from news.moderation import moderate_pending
+from .constant import TEXT_COMMENT
+
+SPAM = {'text': 'http://a.example http://b.example http://c.example'}
+
+
+def comment_texts(client, url):
+    return [comment.text for comment in client.get(url).context['comments']]
+
+
+def test_new_comment_waits_for_moderation(auth_client, another_auth_client,
+                                          news_detail_url):
+    """До модерации комментарий видит только его автор."""
+    auth_client.post(news_detail_url, data=TEXT_COMMENT)
+    assert Comment.objects.get().status == Comment.Status.PENDING
+    assert TEXT_COMMENT['text'] in comment_texts(auth_client, news_detail_url)
+    assert TEXT_COMMENT['text'] not in comment_texts(
+        another_auth_client, news_detail_url
+    )
+
+
+@pytest.mark.parametrize('processes', (False, True))
+def test_moderation_decisions(processes, auth_client, client,
+                              news_detail_url, news):
+    """Обработчик одобряет обычные комментарии и отклоняет спам."""
+    auth_client.post(news_detail_url, data=TEXT_COMMENT)
+    auth_client.post(news_detail_url, data=SPAM)
+    assert moderate_pending(workers=2, processes=processes) == (1, 1)
+    assert comment_texts(client, news_detail_url) == [TEXT_COMMENT['text']]
+    assert SPAM['text'] not in comment_texts(auth_client, news_detail_url)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_edited_comment_is_moderated_again(auth_client, news_edit_url,
+                                           comment, news):
+    """Отредактированный комментарий снимается с публикации до проверки."""
+    auth_client.post(news_edit_url, data=TEXT_COMMENT)
+    comment.refresh_from_db()
+    news.refresh_from_db()
+    assert comment.status == Comment.Status.PENDING
+    assert news.comment_count == 0
+    call_command('moderate_comments', once=True)
+    news.refresh_from_db()
+    assert news.comment_count == 1
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from news.forms import BAD_WORDS, WARNING
+from news.profanity import (AhoCorasickMatcher, SubstringMatcher,
+                            get_matcher)
+
+
+@pytest.mark.parametrize('matcher_class', (
+    AhoCorasickMatcher, SubstringMatcher
+))
+@pytest.mark.parametrize('text, expected', (
+    ('Какой же ты НЕГОДЯЙ!', 'негодяй'),
+    ('рeдиска с латинской e', 'редиска'),
+    ('хорошая спокойная речь', None),
+    ('ушёл', 'ушел'),
+    ('хершел', 'ерш'),
+))
+def test_matchers_agree(matcher_class, text, expected):
+    """Оба матчера одинаково находят слова с учётом нормализации."""
+    matcher = matcher_class(('редиска', 'негодяй', 'ушел', 'ерш'))
+    assert matcher.search(text) == expected
+
+
+def test_bad_words_file_hot_reload(settings, tmp_path):
+    """Изменённый файл со словами подхватывается без перезапуска."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# словарь\nбяка\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    assert get_matcher(BAD_WORDS).search('ну ты и бяка')
+    assert not get_matcher(BAD_WORDS).search('ну ты и бука')
+    words_file.write_text('бука\n', encoding='utf-8')
+    os.utime(words_file, ns=(0, 10 ** 18))
+    assert get_matcher(BAD_WORDS).search('ну ты и бука')
+
+
+def test_homoglyph_comment_rejected(auth_client, news_detail_url):
+    """Комментарий с латинскими буквами вместо кириллицы отклоняется."""
+    response = auth_client.post(
+        news_detail_url, data={'text': 'Ты нeгoдяй'}
+    )
+    assert WARNING in response.context['form'].errors['text']
@@ -0,0 +1,83 @@
+import pytest
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from news.middleware import ReplicaPinMiddleware
+from news.models import News
+from news.routers import end_request, start_request, sync_replicas
+
+pytestmark = [
+    pytest.mark.skipif(
+        'replica' not in settings.DATABASES,
+        reason='Псевдоним replica не объявлен.',
+    ),
+    pytest.mark.django_db(
+        transaction=True, databases=[DEFAULT_DB_ALIAS, 'replica']
+    ),
+]
+
+
+@pytest.fixture
+def replica(settings):
+    """Реплика включена и совпадает с основной базой."""
+    settings.DATABASE_REPLICAS = ['replica']
+    sync_replicas()
+    return connections['replica']
+
+
+def test_pages_read_from_replica(replica, home_url):
+    """Страницы читаются с реплики, которая не старше версии в кэше."""
+    News.objects.create(title='Свежая новость', text='Текст')
+    sync_replicas()
+    with CaptureQueriesContext(replica) as queries:
+        response = Client().get(home_url)
+    assert queries.captured_queries
+    assert 'Свежая новость' in response.content.decode()
+
+
+def test_stale_replica_not_cached(replica, home_url):
+    """Пока реплика отстаёт, кэшируемые страницы читаются с основной базы."""
+    client = Client()
+    client.get(home_url)
+    News.objects.create(title='Свежая новость', text='Текст')
+    with CaptureQueriesContext(replica) as queries:
+        response = client.get(home_url)
+    assert not queries.captured_queries
+    assert 'Свежая новость' in response.content.decode()
+
+
+def test_reads_after_write_stay_on_primary(replica, auth_client,
+                                           news_detail_url):
+    """После записи клиент некоторое время читает с основной базы."""
+    response = auth_client.post(news_detail_url, data={'text': 'Отзыв'})
+    cookie = response.cookies[ReplicaPinMiddleware.cookie_name]
+    assert cookie['max-age'] == 10
+    with CaptureQueriesContext(replica) as queries:
+        auth_client.get(news_detail_url)
+    assert not queries.captured_queries
+
+
+def test_reads_outside_requests_on_primary(replica):
+    """Вне запросов и внутри транзакций чтения идут на основную базу."""
+    assert router.db_for_read(News) == DEFAULT_DB_ALIAS
+    token = start_request(pinned=False)
+    try:
+        assert router.db_for_read(News) == 'replica'
+        with transaction.atomic():
+            assert router.db_for_read(News) == DEFAULT_DB_ALIAS
+        assert router.db_for_write(News) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(News) == DEFAULT_DB_ALIAS
+    finally:
+        assert end_request(token)
+
+
+def test_undeclared_replica_falls_back_to_primary(settings):
+    """Реплика без записи в DATABASES не используется."""
+    settings.DATABASE_REPLICAS = ['missing']
+    token = start_request(pinned=False)
+    try:
+        assert router.db_for_read(News) == DEFAULT_DB_ALIAS
+    finally:
+        end_request(token)
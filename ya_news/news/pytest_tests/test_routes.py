@@ -7,6 +7,7 @@ HOME_URL = pytest.lazy_fixture('home_url')
 LOGIN_URL = pytest.lazy_fixture('login_url')
 LOGOUT_URL = pytest.lazy_fixture('logout_url')
 SIGNUP_URL = pytest.lazy_fixture('signup_url')
+SEARCH_URL = pytest.lazy_fixture('search_url')
 DETAIL_NEWS_URL = pytest.lazy_fixture('news_detail_url')
 EDIT_COMMENT_URL = pytest.lazy_fixture('news_edit_url')
 DELETE_COMMENT_URL = pytest.lazy_fixture('news_delete_url')
@@ -23,6 +24,7 @@ URL_ACCESS_PARAMS = [
     (ANONYMOUS_CLIENT, HTTPStatus.OK, LOGIN_URL),
     (ANONYMOUS_CLIENT, HTTPStatus.OK, LOGOUT_URL),
     (ANONYMOUS_CLIENT, HTTPStatus.OK, SIGNUP_URL),
+    (ANONYMOUS_CLIENT, HTTPStatus.OK, SEARCH_URL),
     (AUTHOR_CLIENT, HTTPStatus.OK, DELETE_COMMENT_URL),
     (AUTHOR_CLIENT, HTTPStatus.OK, EDIT_COMMENT_URL),
     (NOT_AUTHOR_CLIENT, HTTPStatus.NOT_FOUND, DELETE_COMMENT_URL),
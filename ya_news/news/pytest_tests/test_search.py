@@ -0,0 +1,100 @@
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from news.models import Comment, News
+from news.moderation import moderate_pending
+from news.search import (LikeSearchBackend, SQLiteFTS5Backend,
+                         _fts_tables_exist, get_backend)
+
+
+@pytest.fixture(params=(
+    'news.search.SQLiteFTS5Backend', 'news.search.LikeSearchBackend'
+))
+def search_backend(request, settings):
+    settings.NEWS_SEARCH_BACKEND = request.param
+    return request.param
+
+
+@pytest.fixture
+def article(db):
+    return News.objects.create(
+        title='Погода в Москве',
+        text='Начало статьи. ' * 50 + 'Синоптики обещают <b>снегопад</b>. '
+        + 'Конец статьи. ' * 50,
+    )
+
+
+def search(client, search_url, query):
+    return client.get(search_url, {'q': query}).context['results']
+
+
+def test_news_found_with_snippet(search_backend, client, search_url,
+                                 article):
+    """Новость находится по тексту, фрагмент подсвечен и экранирован."""
+    results = search(client, search_url, 'снегопад')
+    assert [(r.kind, r.news_id) for r in results] == [('news', article.pk)]
+    snippet = results[0].snippet
+    assert '<mark>снегопад</mark>' in snippet
+    assert '&lt;b&gt;' in snippet
+    assert len(snippet) < len(article.text)
+
+
+def test_only_approved_comments_found(client, auth_client, search_url,
+                                      article):
+    """Комментарий попадает в поиск только после одобрения."""
+    auth_client.post(
+        reverse('news:detail', kwargs={'pk': article.pk}),
+        data={'text': 'Метель будет сильной'},
+    )
+    assert search(client, search_url, 'метель') == []
+    moderate_pending()
+    results = search(client, search_url, 'метель')
+    assert [(r.kind, r.title) for r in results] == [
+        ('comment', article.title)
+    ]
+
+
+def test_index_follows_changes(client, search_url, article, comment):
+    """Изменение и удаление обновляют индекс FTS5."""
+    article.text = 'Ожидается гололёд'
+    article.save()
+    assert search(client, search_url, 'снегопад') == []
+    assert len(search(client, search_url, 'гололёд')) == 1
+    article.delete()
+    assert search(client, search_url, 'гололёд') == []
+
+
+def test_rebuild_search_index(client, search_url, article, news, user):
+    """Команда перестраивает индекс, в том числе для bulk_create."""
+    Comment.objects.bulk_create([
+        Comment(news=news, author=user, text='Массовый комментарий')
+    ])
+    SQLiteFTS5Backend().clear()
+    assert search(client, search_url, 'снегопад') == []
+    call_command('rebuild_search_index', batch_size=1)
+    assert len(search(client, search_url, 'снегопад')) == 1
+    assert len(search(client, search_url, 'массовый')) == 1
+
+
+@pytest.fixture
+def without_fts_tables(settings):
+    """Миграция не создала таблицы поиска: SQLite собран без FTS5."""
+    settings.NEWS_SEARCH_BACKEND = 'auto'
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TABLE news_news_fts')
+        cursor.execute('DROP TABLE news_comment_fts')
+    _fts_tables_exist.cache_clear()
+    yield
+    _fts_tables_exist.cache_clear()
+
+
+def test_auto_backend_without_fts_tables(without_fts_tables, client,
+                                         search_url):
+    """Без таблиц FTS5 сохранение и поиск работают через LIKE."""
+    assert isinstance(get_backend(), LikeSearchBackend)
+    news = News.objects.create(title='Погода', text='Обещают снегопад.')
+    results = search(client, search_url, 'снегопад')
+    assert [(r.kind, r.news_id) for r in results] == [('news', news.pk)]
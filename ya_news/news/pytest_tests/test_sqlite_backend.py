@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+from django.db.utils import ConnectionHandler
+
+
+def open_database(path, **options):
+    handler = ConnectionHandler({DEFAULT_DB_ALIAS: {
+        'ENGINE': 'news.backends.sqlite3', 'NAME': path, 'OPTIONS': options,
+    }})
+    return handler[DEFAULT_DB_ALIAS]
+
+
+@pytest.fixture
+def database(tmp_path):
+    connection = open_database(tmp_path / 'db.sqlite3')
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+    yield connection
+    connection.close()
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_applied(database):
+    """При подключении включаются WAL и остальные прагмы."""
+    assert pragma(database, 'journal_mode') == 'wal'
+    assert pragma(database, 'synchronous') == 1
+    assert pragma(database, 'busy_timeout') == 5000
+    assert pragma(database, 'cache_size') == -20000
+
+
+def test_pragmas_overridden(tmp_path):
+    """Прагмы дополняются и переопределяются через OPTIONS."""
+    connection = open_database(
+        tmp_path / 'db.sqlite3', pragmas={'busy_timeout': 100}, timeout=1,
+    )
+    assert pragma(connection, 'busy_timeout') == 100
+    connection.close()
+
+
+def test_transaction_takes_write_lock(database, tmp_path):
+    """Транзакция сразу берёт блокировку записи."""
+    other = open_database(
+        tmp_path / 'db.sqlite3', pragmas={'busy_timeout': 0},
+        lock_retries=0,
+    )
+    database._start_transaction_under_autocommit()
+    with pytest.raises(OperationalError, match='locked'):
+        other._start_transaction_under_autocommit()
+    database.rollback()
+    other.close()
+
+
+def test_write_retried_on_lock(database, tmp_path):
+    """Запись, не дождавшаяся блокировки, повторяется."""
+    other = open_database(
+        tmp_path / 'db.sqlite3', pragmas={'busy_timeout': 0},
+        lock_retries=5,
+    )
+    database._start_transaction_under_autocommit()
+    database.inc_thread_sharing()
+    release = threading.Timer(0.1, database.rollback)
+    release.start()
+    with other.cursor() as cursor:
+        cursor.execute('INSERT INTO item (id) VALUES (1)')
+    release.join()
+    database.dec_thread_sharing()
+    with other.cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM item')
+        assert cursor.fetchone() == (1,)
+    other.close()
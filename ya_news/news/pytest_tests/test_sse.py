@@ -0,0 +1,238 @@
+import asyncio
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from news.events import InProcessBackend, get_hub, publish_comments
+from news.models import Comment
+from news.moderation import moderate_pending
+from news.sse import to_cursor, with_comment_streams
+
+
+async def not_found(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 418,
+                'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+APPLICATION = with_comment_streams(not_found)
+
+
+class Stream:
+    """Клиент ASGI, читающий ответ по сообщениям."""
+
+    def __init__(self, path, headers=()):
+        self.messages = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        scope = {'type': 'http', 'path': path, 'headers': list(headers)}
+        self.task = asyncio.ensure_future(
+            APPLICATION(scope, self.receive, self.messages.put)
+        )
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def read(self):
+        return await asyncio.wait_for(self.messages.get(), timeout=5)
+
+    async def close(self):
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, timeout=5)
+
+
+def stream_url(news):
+    return f'/news/{news.pk}/events/'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_new_approved_comment_pushed(news, user):
+    """Сохранённый одобренный комментарий приходит в открытый поток."""
+    async def scenario():
+        stream = Stream(stream_url(news))
+        start = await stream.read()
+        assert start['status'] == 200
+        assert (b'content-type',
+                b'text/event-stream; charset=utf-8') in start['headers']
+        assert (await stream.read())['body'].startswith(b'retry:')
+        await sync_to_async(Comment.objects.create)(
+            news=news, author=user, text='Прямой эфир')
+        body = (await stream.read())['body'].decode()
+        await stream.close()
+        return body
+
+    body = asyncio.run(scenario())
+    assert 'event: comment' in body
+    assert 'Прямой эфир' in body
+    assert get_hub().connections == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_from_other_process_polled(settings, monkeypatch, news, user):
+    """Одобренное в другом процессе поток находит опросом БД."""
+    settings.NEWS_SSE_POLL_INTERVAL = 0.05
+    # Рассылка другого процесса до подписчиков этого не доходит.
+    monkeypatch.setattr(
+        InProcessBackend, 'publish', lambda self, channel, message: None
+    )
+    old = Comment.objects.create(news=news, author=user, text='Старый')
+
+    async def scenario():
+        stream = Stream(stream_url(news))
+        await stream.read()
+        await stream.read()
+        await sync_to_async(Comment.objects.create)(
+            news=news, author=user, text='Из модерации')
+        body = (await stream.read())['body'].decode()
+        await stream.close()
+        return body
+
+    body = asyncio.run(scenario())
+    assert 'Из модерации' in body
+    assert old.text not in body
+
+
+@pytest.mark.django_db(transaction=True)
+def test_missed_comments_replayed(news, user):
+    """По Last-Event-ID переподключение получает пропущенное."""
+    first, second = (
+        Comment.objects.create(news=news, author=user, text=text)
+        for text in ('Первый', 'Второй')
+    )
+
+    async def scenario():
+        stream = Stream(stream_url(news), [(
+            b'last-event-id', str(to_cursor(first.approved)).encode()
+        )])
+        await stream.read()
+        body = (await stream.read())['body'].decode()
+        await stream.close()
+        return body
+
+    body = asyncio.run(scenario())
+    assert f'id: {to_cursor(second.approved)}' in body
+    assert 'Первый' not in body
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_of_missing_news():
+    """Поток несуществующей новости отвечает 404."""
+    async def scenario():
+        stream = Stream('/news/404/events/')
+        return (await stream.read())['status']
+
+    assert asyncio.run(scenario()) == 404
+
+
+def test_connections_bounded(settings, news):
+    """Сверх лимита соединений поток отвечает 503."""
+    settings.NEWS_SSE_MAX_CONNECTIONS = 0
+
+    async def scenario():
+        stream = Stream(stream_url(news))
+        return await stream.read()
+
+    start = asyncio.run(scenario())
+    assert start['status'] == 503
+    assert (b'retry-after', b'5') in start['headers']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_idle_stream_closed(settings, news):
+    """Соединение без событий закрывается, отправив пинги."""
+    settings.NEWS_SSE_IDLE_TIMEOUT = 0.1
+    settings.NEWS_SSE_HEARTBEAT = 0.02
+
+    async def scenario():
+        stream = Stream(stream_url(news))
+        messages = [await stream.read()]
+        while True:
+            messages.append(await stream.read())
+            if not messages[-1].get('more_body', False):
+                break
+        await asyncio.wait_for(stream.task, timeout=5)
+        return messages
+
+    messages = asyncio.run(scenario())
+    assert any(message.get('body') == b': ping\n\n' for message in messages)
+    assert get_hub().connections == 0
+
+
+def test_other_paths_go_to_django():
+    """Остальные запросы уходят в приложение Django."""
+    async def scenario():
+        stream = Stream('/news/1/')
+        return (await stream.read())['status']
+
+    assert asyncio.run(scenario()) == 418
+
+
+def test_only_approved_comments_published(monkeypatch, news, user,
+                                          django_capture_on_commit_callbacks):
+    """Комментарий на модерации публикуется только после одобрения."""
+    published = []
+    monkeypatch.setattr(
+        InProcessBackend, 'publish',
+        lambda self, channel, message: published.append(message['text']),
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=user, text='Проверяется',
+                               status=Comment.Status.PENDING)
+    assert published == []
+    with django_capture_on_commit_callbacks(execute=True):
+        moderate_pending(workers=1)
+    assert published == ['Проверяется']
+
+
+def test_event_built_after_commit(news, comment, django_assert_num_queries,
+                                  django_capture_on_commit_callbacks):
+    """До фиксации публикация не читает автора комментария."""
+    comment = Comment.objects.get(pk=comment.pk)
+    with django_capture_on_commit_callbacks() as callbacks:
+        with django_assert_num_queries(0):
+            publish_comments([comment])
+    assert len(callbacks) == 1
+
+
+@pytest.mark.parametrize('polled', (False, True))
+@pytest.mark.django_db(transaction=True)
+def test_comments_approved_out_of_id_order(settings, monkeypatch, polled,
+                                           news, user):
+    """
+    Одобренное позже более нового комментария тоже приходит в поток.
+
+    Так бывает с ожидавшим модерации и с отредактированным комментарием.
+    """
+    settings.NEWS_SSE_POLL_INTERVAL = 0.05
+    if polled:
+        monkeypatch.setattr(
+            InProcessBackend, 'publish', lambda self, channel, message: None
+        )
+    waiting = Comment.objects.create(news=news, author=user, text='Ждал',
+                                     status=Comment.Status.PENDING)
+    edited = Comment.objects.create(news=news, author=user, text='Старый')
+
+    def approve_older():
+        edited.text = 'Исправленный'
+        edited.status = Comment.Status.PENDING
+        edited.save()
+        moderate_pending(workers=1)
+
+    async def scenario():
+        stream = Stream(stream_url(news))
+        await stream.read()
+        await stream.read()
+        await sync_to_async(Comment.objects.create)(
+            news=news, author=user, text='Новый')
+        bodies = [(await stream.read())['body'].decode()]
+        await sync_to_async(approve_older)()
+        while not all(
+            text in ''.join(bodies) for text in ('Ждал', 'Исправленный')
+        ):
+            bodies.append((await stream.read())['body'].decode())
+        await stream.close()
+        return ''.join(bodies)
+
+    body = asyncio.run(scenario())
+    assert body.count('event: comment') == 3
+    assert waiting.pk < edited.pk
@@ -0,0 +1,36 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from news.models import News
+from news.templatetags.url_patterns import fill_url, url_pattern
+
+
+def normalized(response):
+    return ' '.join(response.content.decode().split())
+
+
+def test_url_pattern_matches_reverse():
+    """Заполненный шаблон адреса совпадает с результатом reverse."""
+    for viewname in ('news:detail', 'news:edit', 'news:delete'):
+        assert fill_url(url_pattern(viewname), 42) == reverse(
+            viewname, args=[42])
+
+
+def test_jinja2_home_matches_django(settings, client, home_url, user):
+    """Главная на Jinja2 совпадает с главной на шаблонах Django."""
+    pytest.importorskip('jinja2')
+    settings.TEMPLATES = [*settings.TEMPLATES, settings.JINJA2_TEMPLATES]
+    for number in range(3):
+        News.objects.create(
+            title=f'Новость <{number}>', text='Очень длинный текст. ' * 20,
+            comment_count=number,
+        )
+    client.force_login(user)
+    pages = []
+    for engine in ('django', 'jinja2'):
+        settings.HOT_TEMPLATE_ENGINE = engine
+        cache.clear()
+        pages.append(normalized(client.get(home_url)))
+    assert pages[0] == pages[1]
+    assert '&lt;2&gt;' in pages[1]
@@ -0,0 +1,118 @@
+"""
+Чтение с реплик базы данных.
+
+Реплики перечисляются в DATABASE_REPLICAS псевдонимами из DATABASES.
+На реплики уходят только чтения внутри HTTP-запроса, который ничего не
+пишет и которому не нужно видеть свежие записи: запросы с записью и
+следующие за ними DATABASE_REPLICA_PIN_SECONDS секунд (метку ставит
+ReplicaPinMiddleware в cookie) читают с основной базы. Чтения вне
+запросов — команды, сигналы, фоновая модерация — тоже идут на основную.
+
+Страницы, закэшированные под версией новости (см. news.cache), строятся
+с реплики, только если реплика не старше этой версии: момент, до которого
+записи основной базы точно есть на репликах, хранится в кэше под
+REPLICAS_SYNCED_KEY. Его ставит sync_replicas(), при потоковой репликации
+— периодическая задача по задержке реплик. Без метки такие страницы
+читаются с основной базы.
+"""
+import contextvars
+import random
+import sqlite3
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICAS_SYNCED_KEY = 'db:replicas:synced'
+
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+class RequestState:
+    """Можно ли запросу читать с реплики и писал ли он."""
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def start_request(pinned):
+    """Возвращает токен для end_request."""
+    return _request_state.set(RequestState(pinned))
+
+
+def end_request(token):
+    """Сбрасывает состояние запроса; возвращает True, если была запись."""
+    state = _request_state.get()
+    _request_state.reset(token)
+    return state.wrote
+
+
+def require_fresh(version):
+    """Переводит запрос на основную базу, если реплики старше version."""
+    state = _request_state.get()
+    if (
+        state is not None
+        and not state.pinned
+        and version > cache.get(REPLICAS_SYNCED_KEY, 0)
+    ):
+        state.pinned = True
+
+
+def declared_replicas():
+    """Реплики из DATABASE_REPLICAS, объявленные в DATABASES."""
+    return [
+        alias for alias in settings.DATABASE_REPLICAS
+        if alias in settings.DATABASES
+    ]
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        replicas = declared_replicas()
+        if (
+            not replicas
+            or state is None
+            or state.pinned
+            # Внутри транзакции данные читаются из неё же.
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и на основной базе.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def sync_replicas():
+    """
+    Копирует основную базу SQLite во все реплики.
+
+    Заменяет репликацию при запуске на двух файлах SQLite и в тестах.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    # Всё зафиксированное до этого момента попадёт в копии.
+    synced = time_ns()
+    for alias in declared_replicas():
+        target = sqlite3.connect(
+            connections[alias].get_connection_params()['database'], uri=True
+        )
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
+    cache.set(REPLICAS_SYNCED_KEY, synced, timeout=None)
@@ -0,0 +1,230 @@
+"""
+Поиск по новостям и комментариям.
+
+Бэкенд выбирается настройкой NEWS_SEARCH_BACKEND. SQLiteFTS5Backend
+хранит индекс в виртуальных таблицах FTS5 и строит подсветку совпадений
+средствами SQLite. LikeSearchBackend работает на любой СУБД через
+icontains. Индекс обновляется сигналами News и Comment, полностью
+перестраивается командой rebuild_search_index.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Lower, StrIndex, Substr
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .models import Comment, News
+
+SearchResult = namedtuple(
+    'SearchResult', ('kind', 'object_id', 'news_id', 'title', 'snippet')
+)
+
+NEWS_TABLE = 'news_news_fts'
+COMMENT_TABLE = 'news_comment_fts'
+WORD = re.compile(r'\w+')
+# Маркеры подсветки: управляющие символы не встречаются в тексте
+# и переживают экранирование HTML.
+MARK_START, MARK_END = '\x02', '\x03'
+SNIPPET_WORDS = 16
+SNIPPET_CHARS = 160
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и превращает маркеры в <mark>."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class SQLiteFTS5Backend:
+    """Индекс в таблицах FTS5, ранжирование BM25."""
+
+    def index_news(self, news_list):
+        self._replace(
+            NEWS_TABLE, '(rowid, title, text)',
+            [(news.pk, news.title, news.text) for news in news_list],
+        )
+
+    def index_comments(self, comments):
+        self._replace(
+            COMMENT_TABLE, '(rowid, news_id, text)',
+            [
+                (comment.pk, comment.news_id, comment.text)
+                for comment in comments
+            ],
+        )
+
+    def remove_news(self, pks):
+        self._delete(NEWS_TABLE, pks)
+
+    def remove_comments(self, pks):
+        self._delete(COMMENT_TABLE, pks)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {NEWS_TABLE}')
+            cursor.execute(f'DELETE FROM {COMMENT_TABLE}')
+
+    def _replace(self, table, columns, rows):
+        if not rows:
+            return
+        placeholders = ', '.join(['%s'] * len(rows[0]))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {table} WHERE rowid = %s',
+                [(row[0],) for row in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {table} {columns} VALUES ({placeholders})', rows
+            )
+
+    def _delete(self, table, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {table} WHERE rowid = %s',
+                [(pk,) for pk in pks],
+            )
+
+    def search(self, query, limit):
+        words = WORD.findall(query)
+        if not words:
+            return []
+        match = ' '.join(f'"{word}"*' for word in words)
+        snippet = (
+            f"'{MARK_START}', '{MARK_END}', '…', {SNIPPET_WORDS}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT * FROM ('
+                f"  SELECT 'news', rowid, rowid, title,"
+                f'    snippet({NEWS_TABLE}, -1, {snippet}),'
+                f'    bm25({NEWS_TABLE}, 5, 1) AS rank'
+                f'  FROM {NEWS_TABLE} WHERE {NEWS_TABLE} MATCH %s'
+                f'  UNION ALL'
+                f"  SELECT 'comment', rowid, news_id, NULL,"
+                f'    snippet({COMMENT_TABLE}, 1, {snippet}),'
+                f'    bm25({COMMENT_TABLE})'
+                f'  FROM {COMMENT_TABLE} WHERE {COMMENT_TABLE} MATCH %s'
+                f') ORDER BY rank LIMIT %s',
+                [match, match, limit],
+            )
+            rows = cursor.fetchall()
+        titles = dict(
+            News.objects.filter(
+                pk__in={row[2] for row in rows if row[3] is None}
+            ).values_list('pk', 'title')
+        )
+        return [
+            SearchResult(
+                kind, object_id, news_id,
+                title if title is not None else titles.get(news_id, ''),
+                highlight(snippet),
+            )
+            for kind, object_id, news_id, title, snippet, _ in rows
+        ]
+
+
+class LikeSearchBackend:
+    """
+    Поиск подстроки средствами любой СУБД, без отдельного индекса.
+
+    Фрагмент вокруг совпадения вырезается в запросе, полный текст
+    статьи из БД не читается.
+    """
+
+    def index_news(self, news_list):
+        pass
+
+    def index_comments(self, comments):
+        pass
+
+    def remove_news(self, pks):
+        pass
+
+    def remove_comments(self, pks):
+        pass
+
+    def clear(self):
+        pass
+
+    def _with_snippet(self, queryset, query):
+        position = StrIndex(Lower('text'), Value(query.lower()))
+        return queryset.annotate(
+            snippet=Substr(
+                'text',
+                Greatest(position - SNIPPET_CHARS // 2, Value(1)),
+                SNIPPET_CHARS,
+            )
+        )
+
+    def _highlight(self, snippet, query):
+        marked = re.sub(
+            f'({re.escape(query)})', f'{MARK_START}\\1{MARK_END}',
+            snippet, flags=re.IGNORECASE,
+        )
+        return highlight(marked)
+
+    def search(self, query, limit):
+        query = query.strip()
+        if not query:
+            return []
+        news = self._with_snippet(
+            News.objects.filter(text__icontains=query)
+            | News.objects.filter(title__icontains=query),
+            query,
+        ).values_list('pk', 'title', 'snippet')[:limit]
+        comments = self._with_snippet(
+            Comment.objects.filter(
+                status=Comment.Status.APPROVED, text__icontains=query
+            ),
+            query,
+        ).values_list(
+            'pk', 'news_id', F('news__title'), 'snippet'
+        )[:limit]
+        results = [
+            SearchResult(
+                'news', pk, pk, title, self._highlight(snippet, query)
+            )
+            for pk, title, snippet in news
+        ] + [
+            SearchResult(
+                'comment', pk, news_id, title,
+                self._highlight(snippet, query),
+            )
+            for pk, news_id, title, snippet in comments
+        ]
+        return results[:limit]
+
+
+@lru_cache(maxsize=None)
+def _fts_tables_exist(vendor, database_name):
+    return vendor == 'sqlite' and {NEWS_TABLE, COMMENT_TABLE} <= set(
+        connection.introspection.table_names()
+    )
+
+
+def get_backend():
+    """
+    Бэкенд поиска согласно настройке NEWS_SEARCH_BACKEND.
+
+    'auto' — SQLiteFTS5Backend, если миграция создала таблицы FTS5,
+    иначе LikeSearchBackend.
+    """
+    backend = settings.NEWS_SEARCH_BACKEND
+    if backend == 'auto':
+        use_fts = _fts_tables_exist(
+            connection.vendor, str(connection.settings_dict['NAME'])
+        )
+        backend = (
+            'news.search.SQLiteFTS5Backend' if use_fts
+            else 'news.search.LikeSearchBackend'
+        )
+    return import_string(backend)()
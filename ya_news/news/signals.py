@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends.auth import forget_user
+from .cache import bump_on_commit
+from .events import publish_comments
+from .feeds import schedule_feeds
+from .models import Comment, News
+from .search import get_backend
+
+
+def was_approved(instance, created):
+    """Был ли комментарий одобрен до этого сохранения."""
+    return (
+        not created
+        and getattr(instance, 'saved_status', None) == Comment.Status.APPROVED
+    )
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count(sender, instance, created, **kwargs):
+    """
+    Счётчик новости учитывает только одобренные комментарии.
+
+    Он меняется при создании одобренного комментария и при смене
+    статуса уже сохранённого.
+    """
+    if kwargs.get('raw'):
+        return
+    delta = instance.is_approved - was_approved(instance, created)
+    if delta:
+        News.change_comment_counts({instance.news_id: delta})
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """
+    Удалённый одобренный комментарий уменьшает счётчик новости.
+
+    Срабатывает и при удалении через QuerySet.delete() или каскадом;
+    QuerySet.delete() сводит уменьшения в один UPDATE на новость.
+    """
+    if instance.is_approved:
+        News.change_comment_counts({instance.news_id: -1})
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_news_fragments(sender, instance, **kwargs):
+    """Изменение новости сбрасывает её фрагменты после фиксации."""
+    bump_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_fragments(sender, instance, **kwargs):
+    """Изменение комментария сбрасывает фрагменты новости после фиксации."""
+    bump_on_commit(instance.news_id)
+
+
+@receiver(post_save, sender=News)
+def index_news(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_backend().index_news([instance])
+
+
+@receiver(post_delete, sender=News)
+def unindex_news(sender, instance, **kwargs):
+    get_backend().remove_news([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, raw=False, **kwargs):
+    """В поиск попадают только одобренные комментарии."""
+    if raw:
+        return
+    if instance.is_approved:
+        get_backend().index_comments([instance])
+    else:
+        get_backend().remove_comments([instance.pk])
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    get_backend().remove_comments([instance.pk])
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def schedule_news_feeds(sender, instance, raw=False, **kwargs):
+    """Ленты пересобираются после фиксации изменения новости."""
+    if not raw:
+        schedule_feeds(instance.pk, news=True)
+
+
+@receiver(post_save, sender=Comment)
+def schedule_saved_comment_feeds(sender, instance, created, raw=False,
+                                 **kwargs):
+    """В лентах только одобренные комментарии: прочие их не меняют."""
+    if not raw and (instance.is_approved or was_approved(instance, created)):
+        schedule_feeds(instance.news_id)
+
+
+@receiver(post_delete, sender=Comment)
+def schedule_deleted_comment_feeds(sender, instance, **kwargs):
+    if instance.is_approved:
+        schedule_feeds(instance.news_id)
+
+
+@receiver(post_save, sender=Comment)
+def publish_approved_comment(sender, instance, raw=False, **kwargs):
+    """Одобренный комментарий уходит в потоки SSE его новости."""
+    if not raw and instance.is_approved:
+        publish_comments([instance])
+
+
+@receiver(post_save, sender=Comment)
+def remember_saved_status(sender, instance, **kwargs):
+    """Последний приёмник: теперь в БД записан текущий статус."""
+    instance.saved_status = instance.status
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_saved_user(sender, instance, **kwargs):
+    """Изменённый пользователь (например, пароль) перечитывается из БД."""
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
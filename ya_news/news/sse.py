@@ -0,0 +1,241 @@
+"""
+Поток новых комментариев новости в формате Server-Sent Events.
+
+Поток обслуживается отдельным ASGI-приложением в обход Django, чтобы
+долгое соединение не занимало поток и не проходило через middleware.
+Число соединений на процесс ограничено NEWS_SSE_MAX_CONNECTIONS, а
+соединение без событий закрывается через NEWS_SSE_IDLE_TIMEOUT секунд;
+браузер переподключается сам и по Last-Event-ID получает пропущенное.
+
+События своего процесса приходят через бэкенд рассылки, а комментарии,
+одобренные в других процессах, поток находит, запрашивая из БД раз
+в NEWS_SSE_POLL_INTERVAL секунд одобренные позже курсора. Курсор — время
+одобрения (Comment.approved) в микросекундах, он же id события. Порядок
+одобрений не совпадает с порядком id: комментарий, одобренный раньше
+созданного позже, и отредактированный комментарий, одобренный заново,
+тоже приходят в поток.
+"""
+import asyncio
+import json
+import math
+import re
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .events import comment_event, get_hub, news_channel
+from .models import Comment, News
+
+STREAM_PATH = re.compile(r'^/news/(?P<pk>\d+)/events/$')
+# Через сколько миллисекунд браузеру переподключаться.
+RETRY_MS = 5000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+MAX_CURSOR = (datetime.max.replace(tzinfo=timezone.utc) - EPOCH) // MICROSECOND
+# Сколько микросекунд до курсора повторяет опрос: транзакция могла
+# одобрить комментарий раньше уже отправленного, а зафиксироваться позже.
+POLL_OVERLAP = 10 * 10 ** 6
+
+
+def to_cursor(moment):
+    return (moment - EPOCH) // MICROSECOND
+
+
+def event_cursor(event):
+    return to_cursor(datetime.fromisoformat(event['approved']))
+
+
+def encode_event(event):
+    data = json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return (
+        f'id: {event_cursor(event)}\nevent: comment\ndata: {data}\n\n'
+    ).encode()
+
+
+def load_events(news_pk, after, limit=None):
+    """События комментариев новости, одобренных позже курсора after."""
+    comments = Comment.objects.filter(
+        news_id=news_pk,
+        status=Comment.Status.APPROVED,
+        approved__gt=EPOCH + after * MICROSECOND,
+    ).select_related('author').order_by('approved', 'pk')[:limit]
+    return [comment_event(comment) for comment in comments]
+
+
+class Delivered:
+    """
+    Одобрения, уже отправленные потоку: пары (id комментария, курсор).
+
+    Опрос повторяет последние POLL_OVERLAP микросекунд, а рассылка
+    приносит то же, что и опрос, поэтому одобрения из этого окна
+    запоминаются и второй раз не отправляются.
+    """
+
+    def __init__(self, cursor, events=()):
+        self.cursor = cursor
+        self.seen = set()
+        self.filter(events)
+
+    @property
+    def poll_after(self):
+        return self.cursor - POLL_OVERLAP
+
+    def filter(self, events):
+        """Оставляет неотправленные события и запоминает их."""
+        fresh = []
+        for event in events:
+            key = (event['id'], event_cursor(event))
+            if key not in self.seen:
+                self.seen.add(key)
+                self.cursor = max(self.cursor, key[1])
+                fresh.append(event)
+        self.seen = {key for key in self.seen if key[1] > self.poll_after}
+        return fresh
+
+
+def load_backlog(news_pk, last_event_id):
+    """
+    События после Last-Event-ID и отправленное до подключения.
+
+    Без Last-Event-ID поток начинается с текущего момента. Если новости
+    нет, возвращает None.
+    """
+    if not News.objects.filter(pk=news_pk).exists():
+        return None
+    if last_event_id.isdigit():
+        cursor = min(int(last_event_id), MAX_CURSOR)
+        backlog = load_events(news_pk, cursor, settings.NEWS_SSE_BACKLOG)
+    else:
+        cursor = to_cursor(timezone.now())
+        backlog = []
+    # Одобренное до курсора клиент уже получил, опрос его не повторяет.
+    delivered = Delivered(cursor, [
+        event for event in load_events(news_pk, cursor - POLL_OVERLAP)
+        if event_cursor(event) <= cursor
+    ])
+    return delivered.filter(backlog), delivered
+
+
+async def send_status(send, status, text, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'text/plain; charset=utf-8'), *headers
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': text.encode()})
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_chunk(send, disconnect, body, more_body=True):
+    """Пишет в поток, если клиент ещё не отключился."""
+    if not disconnect.done():
+        await send({
+            'type': 'http.response.body', 'body': body, 'more_body': more_body,
+        })
+
+
+async def wait_published(queue, disconnect, timeout):
+    """Событие из рассылки; пустой список по таймауту или отключению."""
+    message = asyncio.ensure_future(queue.get())
+    await asyncio.wait(
+        {message, disconnect}, timeout=timeout,
+        return_when=asyncio.FIRST_COMPLETED,
+    )
+    if message.done():
+        return [message.result()]
+    message.cancel()
+    return []
+
+
+async def comment_stream(scope, receive, send, news_pk):
+    hub = get_hub()
+    if hub.connections >= settings.NEWS_SSE_MAX_CONNECTIONS:
+        await send_status(
+            send, 503, 'Слишком много подключений.',
+            [(b'retry-after', str(RETRY_MS // 1000).encode())],
+        )
+        return
+    headers = dict(scope['headers'])
+    backlog = await sync_to_async(load_backlog)(
+        news_pk, headers.get(b'last-event-id', b'').decode('latin-1')
+    )
+    if backlog is None:
+        await send_status(send, 404, 'Новость не найдена.')
+        return
+    events, delivered = backlog
+    channel = news_channel(news_pk)
+    queue = hub.subscribe(channel)
+    disconnect = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        chunk = f'retry: {RETRY_MS}\n\n'.encode() + b''.join(
+            map(encode_event, events)
+        )
+        await send({
+            'type': 'http.response.body', 'body': chunk, 'more_body': True,
+        })
+        loop = asyncio.get_running_loop()
+        poll_interval = settings.NEWS_SSE_POLL_INTERVAL
+        now = loop.time()
+        idle_until = now + settings.NEWS_SSE_IDLE_TIMEOUT
+        ping_at = now + settings.NEWS_SSE_HEARTBEAT
+        poll_at = now + poll_interval if poll_interval else math.inf
+        while not disconnect.done():
+            now = loop.time()
+            if now >= idle_until:
+                break
+            if now >= poll_at:
+                events = await sync_to_async(load_events)(
+                    news_pk, delivered.poll_after,
+                    settings.NEWS_SSE_BACKLOG + len(delivered.seen),
+                )
+                poll_at = loop.time() + poll_interval
+            else:
+                events = await wait_published(
+                    queue, disconnect, min(idle_until, ping_at, poll_at) - now
+                )
+            events = delivered.filter(events)
+            now = loop.time()
+            if events:
+                chunk = b''.join(map(encode_event, events))
+                idle_until = now + settings.NEWS_SSE_IDLE_TIMEOUT
+            elif now >= ping_at:
+                chunk = b': ping\n\n'
+            else:
+                continue
+            ping_at = now + settings.NEWS_SSE_HEARTBEAT
+            await send_chunk(send, disconnect, chunk)
+        await send_chunk(send, disconnect, b'', more_body=False)
+    finally:
+        hub.unsubscribe(channel, queue)
+        disconnect.cancel()
+
+
+def with_comment_streams(application):
+    """Направляет запросы потоков комментариев мимо Django."""
+    async def router(scope, receive, send):
+        if scope['type'] == 'http':
+            match = STREAM_PATH.match(scope['path'])
+            if match:
+                return await comment_stream(
+                    scope, receive, send, int(match['pk'])
+                )
+        return await application(scope, receive, send)
+    return router
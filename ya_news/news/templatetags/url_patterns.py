@@ -0,0 +1,22 @@
+"""
+Адреса строк длинных списков без reverse на каждую строку.
+
+Представление один раз получает адрес с заглушкой вместо аргумента
+(url_pattern), а шаблон подставляет в него аргумент строки фильтром
+fill_url. Заглушка проходит и конвертер int, и конвертер slug.
+"""
+from django import template
+from django.urls import reverse
+
+URL_PLACEHOLDER = '0123456789'
+
+register = template.Library()
+
+
+def url_pattern(viewname):
+    return reverse(viewname, args=[URL_PLACEHOLDER])
+
+
+@register.filter
+def fill_url(pattern, value):
+    return pattern.replace(URL_PLACEHOLDER, str(value), 1)
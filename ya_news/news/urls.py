@@ -1,12 +1,30 @@
 from django.urls import path
 
-from news import views
+from news import api, feeds, views
+from news.async_views import read_view
 
 app_name = 'news'
 
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', read_view(views.NewsList.as_view()), name='home'),
+    path(
+        'news/<int:pk>/',
+        read_view(views.NewsDetailView.as_view()),
+        name='detail'
+    ),
+    path('feeds/<str:fmt>/', feeds.news_feed, name='feed'),
+    path(
+        'news/<int:pk>/feeds/<str:fmt>/',
+        feeds.comments_feed,
+        name='comments_feed'
+    ),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path('api/news/', api.NewsListApi.as_view(), name='api_list'),
+    path(
+        'api/news/<int:pk>/comments/',
+        api.NewsCommentsApi.as_view(),
+        name='api_comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
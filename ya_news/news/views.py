@@ -1,14 +1,45 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
 
+from .cache import (cache_anonymous, comments_page_key, get_list_version,
+                    get_news_version, get_news_versions)
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import keyset_page
+from .search import get_backend
+from .templatetags.url_patterns import url_pattern
 
 
-class NewsList(generic.ListView):
+class HotTemplateMixin:
+    """Шаблон рендерится движком HOT_TEMPLATE_ENGINE: django или jinja2."""
+
+    @property
+    def template_engine(self):
+        return settings.HOT_TEMPLATE_ENGINE
+
+
+class FragmentCacheMixin:
+    """Передаёт в шаблон время жизни кэшированных фрагментов."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['fragment_cache_timeout'] = (
+            settings.NEWS_FRAGMENT_CACHE_TIMEOUT
+        )
+        return context
+
+
+@method_decorator(
+    cache_anonymous(lambda request: get_list_version()), name='get'
+)
+class NewsList(HotTemplateMixin, FragmentCacheMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
@@ -19,20 +50,97 @@ class NewsList(generic.ListView):
 
         Их количество определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def get_context_data(self, **kwargs):
+        """Версии новостей нужны для ключей кэша записей списка."""
+        context = super().get_context_data(**kwargs)
+        news_list = context['object_list']
+        versions = get_news_versions([news.pk for news in news_list])
+        for news in news_list:
+            news.cache_version = versions[news.pk]
+        context['detail_url'] = url_pattern('news:detail')
+        return context
+
+
+def comments_page(comments, cursor):
+    """Страница комментариев новости по курсору (created, id)."""
+    return keyset_page(
+        comments,
+        ('created', 'id'),
+        cursor,
+        settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+    )
 
 
-class NewsDetail(generic.DetailView):
+def approved_comments_page(news_pk, version, cursor):
+    """
+    Страница одобренных комментариев из кэша.
+
+    Ключ содержит версию новости, поэтому HTML-страница и API делят
+    одну запись кэша до следующего изменения новости.
+    """
+    return cache.get_or_set(
+        comments_page_key(news_pk, version, cursor),
+        lambda: comments_page(
+            Comment.objects.filter(
+                news_id=news_pk, status=Comment.Status.APPROVED
+            ).listing_rows(),
+            cursor,
+        ),
+        settings.NEWS_FRAGMENT_CACHE_TIMEOUT,
+    )
+
+
+class NewsCommentsMixin(FragmentCacheMixin):
+    """Страница комментариев к новости для шаблона detail.html."""
+
+    def get_context_data(self, **kwargs):
+        """
+        Комментарии выводятся страницами по курсору (created, id).
+
+        Видны одобренные комментарии и свои комментарии на модерации.
+        Страница комментариев кэшируется до следующего изменения новости.
+        """
+        context = super().get_context_data(**kwargs)
+        version = get_news_version(self.object.pk)
+        cursor = self.request.GET.get('after')
+        user = self.request.user
+        has_own_pending = user.is_authenticated and (
+            self.object.comment_set.filter(
+                author=user, status=Comment.Status.PENDING
+            ).exists()
+        )
+        if has_own_pending:
+            # Страницу со своими комментариями на модерации
+            # в общий кэш не кладём.
+            page = comments_page(
+                self.object.comment_set.listing_rows().filter(
+                    Q(status=Comment.Status.APPROVED)
+                    | Q(status=Comment.Status.PENDING, author=user)
+                ),
+                cursor,
+            )
+        else:
+            page = approved_comments_page(self.object.pk, version, cursor)
+        context['cache_version'] = version
+        context['comments'] = page.object_list
+        context['edit_url'] = url_pattern('news:edit')
+        context['delete_url'] = url_pattern('news:delete')
+        context['next_cursor'] = page.next_cursor
+        # Поток новых комментариев есть только под ASGI.
+        context['comment_stream'] = (
+            settings.ASYNC_VIEWS and page.next_cursor is None
+        )
+        return context
+
+
+class NewsDetail(NewsCommentsMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
+        obj = get_object_or_404(self.model, pk=self.kwargs['pk'])
         return obj
 
     def get_context_data(self, **kwargs):
@@ -44,6 +152,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        NewsCommentsMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -59,7 +168,9 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        comment.status = Comment.Status.PENDING
+        with transaction.atomic():
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -69,6 +180,9 @@ class NewsComment(
 
 class NewsDetailView(generic.View):
 
+    @method_decorator(cache_anonymous(
+        lambda request, pk: get_news_version(pk)
+    ))
     def get(self, request, *args, **kwargs):
         view = NewsDetail.as_view()
         return view(request, *args, **kwargs)
@@ -98,7 +212,32 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    @transaction.atomic
+    def form_valid(self, form):
+        """Отредактированный комментарий снова проходит модерацию."""
+        form.instance.status = Comment.Status.PENDING
+        return super().form_valid(form)
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        """Удаление и уменьшение счётчика новости в одной транзакции."""
+        return super().delete(request, *args, **kwargs)
+
+
+class NewsSearch(generic.TemplateView):
+    """Поиск по новостям и комментариям."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        context['results'] = get_backend().search(
+            query, settings.NEWS_SEARCH_RESULTS
+        ) if query else []
+        return context
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -10,6 +11,8 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
+INTERNAL_IPS = ['127.0.0.1']
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -21,7 +24,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'news.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -32,14 +37,20 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yanews.urls'
 
+# Шаблоны компилируются один раз на процесс (cached.Loader); после
+# правки шаблона сервер нужно перезапустить.
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
-                'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
@@ -48,16 +59,81 @@ TEMPLATES = [
     },
 ]
 
+# Главную можно рендерить Jinja2 (pip install jinja2): шаблоны из jinja2/
+# дают тот же HTML. Включается переменной окружения
+# HOT_TEMPLATE_ENGINE=jinja2.
+JINJA2_TEMPLATES = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'DIRS': [BASE_DIR / 'jinja2'],
+    'OPTIONS': {
+        'environment': 'news.jinja2.environment',
+        'context_processors': [
+            'django.contrib.auth.context_processors.auth',
+        ],
+    },
+}
+HOT_TEMPLATE_ENGINE = os.environ.get('HOT_TEMPLATE_ENGINE', 'django')
+if HOT_TEMPLATE_ENGINE == 'jinja2':
+    TEMPLATES.append(JINJA2_TEMPLATES)
+
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+# SQLite с WAL и прагмами для одновременных запросов, см.
+# news.backends.sqlite3. Соединения живут дольше запроса, чтобы не
+# открывать файл и не выполнять прагмы каждый раз.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'news.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+    },
+}
+
+# Реплики только для чтения, см. news.routers. Локально реплика — копия
+# файла основной базы, её обновляет news.routers.sync_replicas();
+# включается переменной окружения DATABASE_REPLICA с путём к файлу.
+# Тесты объявляют псевдоним сами, см. news/pytest_tests/conftest.py.
+if os.environ.get('DATABASE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'news.backends.sqlite3',
+        'NAME': os.environ.get(
+            'DATABASE_REPLICA', BASE_DIR / 'db.replica.sqlite3'
+        ),
+        'CONN_MAX_AGE': 60,
+    }
+DATABASE_REPLICAS = ['replica'] if os.environ.get('DATABASE_REPLICA') else []
+DATABASE_ROUTERS = ['news.routers.ReplicaRouter']
+# Сколько секунд после записи клиент читает с основной базы, пока
+# реплики её догоняют.
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Сессии и пользователи сессий читаются из кеша, см. news.backends.
+# С несколькими процессами кеш должен быть общим (Memcached, Redis).
+SESSION_ENGINE = 'news.backends.sessions'
+AUTHENTICATION_BACKENDS = ['news.backends.auth.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Фрагменты шаблонов адресуются версией новости, поэтому их можно хранить
+# долго: после изменения новости старые ключи просто перестают читаться.
+NEWS_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+# Сколько секунд прокси и браузеры могут отдавать анонимные страницы
+# без повторной проверки ETag.
+NEWS_CACHE_MAX_AGE = 60
+
+# Бэкенд поиска по новостям и комментариям: путь к классу или 'auto' —
+# SQLiteFTS5Backend, если таблицы FTS5 созданы (SQLite собран с FTS5),
+# иначе LikeSearchBackend.
+NEWS_SEARCH_BACKEND = 'auto'
+NEWS_SEARCH_RESULTS = 20
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +156,50 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 20
+
+NEWS_API_PAGE_SIZE = 50
+
+# Ленты RSS и Atom собираются вне запроса, поэтому адрес сайта для ссылок
+# в них задаётся здесь.
+NEWS_FEED_BASE_URL = 'http://localhost:8000'
+NEWS_FEED_ITEMS = 20
+
+# Потоки новых комментариев (SSE), работают под ASGI. Бэкенд рассылки
+# InProcessBackend доставляет события в пределах одного процесса,
+# одобренное в других процессах поток находит опросом БД раз в
+# NEWS_SSE_POLL_INTERVAL секунд (None — не опрашивать).
+NEWS_EVENTS_BACKEND = 'news.events.InProcessBackend'
+NEWS_SSE_MAX_CONNECTIONS = 1000
+NEWS_SSE_IDLE_TIMEOUT = 5 * 60
+NEWS_SSE_HEARTBEAT = 15
+NEWS_SSE_POLL_INTERVAL = 5
+NEWS_SSE_BACKLOG = 50
+
+# Файл со списком запрещённых слов, по одному на строку. Если не задан,
+# используется news.forms.BAD_WORDS. Изменения файла подхватываются
+# без перезапуска.
+BAD_WORDS_FILE = None
+BAD_WORDS_MATCHER = 'news.profanity.AhoCorasickMatcher'
+
+# Проверки, которые фоновая модерация (manage.py moderate_comments)
+# применяет к новым комментариям. Комментарий одобряется, если все
+# проверки вернули True.
+COMMENT_MODERATION_CHECKS = [
+    'news.moderation.check_bad_words',
+    'news.moderation.check_links',
+]
+
+# Асинхронные страницы чтения; включаются в asgi.py. Размер пула потоков,
+# в котором они обращаются к БД, подбирается под число соединений СУБД.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+ASYNC_VIEWS_THREADS = int(os.environ.get('ASYNC_VIEWS_THREADS', 4))
+
+# Замеры запросов (news.instrumentation): доля запросов с замером от 0
+# (выключено) до 1, порог повторов одного SQL для признака N+1. Счётчики
+# отдаются по /metrics/ адресам из INTERNAL_IPS.
+INSTRUMENTATION_SAMPLE_RATE = float(
+    os.environ.get('INSTRUMENTATION_SAMPLE_RATE', 0)
+)
+INSTRUMENTATION_DUPLICATE_THRESHOLD = 3
@@ -0,0 +1,234 @@
+"""
+JSON API для заметок.
+
+Права те же, что у HTML-страниц: запросы идут через NoteBase.get_queryset,
+поэтому пользователь видит и меняет только свои заметки. Каждая заметка
+отдаётся с ETag; If-None-Match избавляет от повторной загрузки, а
+If-Match защищает от потерянных обновлений.
+"""
+import json
+from heapq import merge
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.forms.models import model_to_dict
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.views import generic
+
+from .forms import NoteForm
+from .models import NoteTombstone
+from .views import NoteBase, parse_cursor
+
+API_FIELDS = ('id', 'slug', 'title', 'text', 'revision', 'updated_at')
+EDITABLE_FIELDS = ('title', 'text', 'slug')
+# Поля, от которых зависит ETag заметки: ревизия меняется при каждой записи.
+ETAG_FIELDS = ('id', 'revision')
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которая отдаётся клиенту как JSON."""
+
+    def __init__(self, errors, status=400):
+        super().__init__(errors)
+        self.errors = errors
+        self.status = status
+
+
+def note_etag(note):
+    """Вычисляет ETag по ревизии заметки."""
+    return quote_etag('.'.join(
+        str(getattr(note, field)) for field in ETAG_FIELDS
+    ))
+
+
+class NoteApiMixin(NoteBase):
+    """Общая часть JSON-представлений заметок."""
+
+    def handle_no_permission(self):
+        return JsonResponse(
+            {'detail': 'Требуется авторизация.'}, status=401
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse(
+                {'errors': error.errors}, status=error.status
+            )
+        except Http404:
+            return JsonResponse({'detail': 'Не найдено.'}, status=404)
+
+    def get_fields(self):
+        """Поля из ?fields=title,slug; по умолчанию все поля API."""
+        fields = self.request.GET.get('fields')
+        if not fields:
+            return API_FIELDS
+        fields = tuple(dict.fromkeys(fields.split(',')))
+        unknown = set(fields) - set(API_FIELDS)
+        if unknown:
+            raise ApiError(
+                {'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}']}
+            )
+        return fields
+
+    def serialize(self, note, fields=API_FIELDS):
+        return {field: getattr(note, field) for field in fields}
+
+    def get_body(self):
+        try:
+            body = json.loads(self.request.body)
+        except ValueError:
+            raise ApiError({'body': ['Некорректный JSON.']})
+        if not isinstance(body, dict):
+            raise ApiError({'body': ['Ожидается JSON-объект.']})
+        return body
+
+    def save_form(self, form):
+        """Сохраняет заметку из формы или бросает ApiError."""
+        if form.is_valid():
+            try:
+                with transaction.atomic():
+                    return form.save()
+            except IntegrityError:
+                form.add_slug_error()
+        raise ApiError(form.errors)
+
+    def note_response(self, note, status=200):
+        response = JsonResponse(self.serialize(note), status=status)
+        response['ETag'] = note_etag(note)
+        return response
+
+
+class NoteListApi(NoteApiMixin, generic.View):
+    """Список заметок по курсору ?after=<id> и создание заметки."""
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        per_page = settings.NOTES_COUNT_ON_LIST_PAGE
+        notes = self.get_queryset().only(*fields).order_by('id')
+        after = request.GET.get('after')
+        if after:
+            try:
+                notes = notes.filter(id__gt=parse_cursor(after))
+            except ValueError:
+                raise ApiError({'after': ['Некорректный курсор страницы.']})
+        notes = list(notes[:per_page + 1])
+        next_url = None
+        if len(notes) > per_page:
+            query = request.GET.copy()
+            query['after'] = notes[per_page - 1].id
+            next_url = f'{request.path}?{query.urlencode()}'
+        return JsonResponse({
+            'results': [
+                self.serialize(note, fields) for note in notes[:per_page]
+            ],
+            'next': next_url,
+        })
+
+    def post(self, request, *args, **kwargs):
+        form = NoteForm(data=self.get_body())
+        form.instance.author = request.user
+        note = self.save_form(form)
+        response = self.note_response(note, status=201)
+        response['Location'] = reverse(
+            'notes:api_detail', kwargs={'slug': note.slug}
+        )
+        return response
+
+
+class NoteDetailApi(NoteApiMixin, generic.View):
+    """Чтение, изменение и удаление заметки с проверкой ETag."""
+
+    def get_object(self, fields=API_FIELDS, lock=False):
+        notes = self.get_queryset().only(*fields, *ETAG_FIELDS)
+        if lock:
+            notes = notes.select_for_update()
+        return get_object_or_404(notes, slug=self.kwargs['slug'])
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        note = self.get_object(fields)
+        etag = note_etag(note)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse(self.serialize(note, fields))
+        response['ETag'] = etag
+        return response
+
+    @transaction.atomic
+    def update(self, partial):
+        """Заметка блокируется от проверки If-Match до сохранения."""
+        note = self.get_object(lock=True)
+        response = get_conditional_response(
+            self.request, etag=note_etag(note)
+        )
+        if response is not None:
+            return response
+        data = self.get_body()
+        if partial:
+            data = {**model_to_dict(note, EDITABLE_FIELDS), **data}
+        note = self.save_form(NoteForm(data=data, instance=note))
+        return self.note_response(note)
+
+    def put(self, request, *args, **kwargs):
+        return self.update(partial=False)
+
+    def patch(self, request, *args, **kwargs):
+        return self.update(partial=True)
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        note = self.get_object(lock=True)
+        response = get_conditional_response(request, etag=note_etag(note))
+        if response is not None:
+            return response
+        note.delete()
+        return HttpResponse(status=204)
+
+
+class NoteChangesApi(NoteApiMixin, generic.View):
+    """
+    Изменения заметок после ревизии ?since=<rev> в порядке ревизий.
+
+    Выборки идут по индексам (author, revision) заметок и надгробий,
+    поэтому стоимость зависит от числа изменений, а не от числа заметок.
+    В ответе revision — курсор для следующего запроса.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            since = parse_cursor(request.GET.get('since', 0))
+        except ValueError:
+            raise ApiError({'since': ['Некорректная ревизия.']})
+        limit = settings.NOTES_CHANGES_LIMIT
+        notes = self.get_queryset().filter(
+            revision__gt=since
+        ).only(*API_FIELDS).order_by('revision')[:limit + 1]
+        tombstones = NoteTombstone.objects.filter(
+            author=request.user, revision__gt=since
+        ).order_by('revision')[:limit + 1]
+        changes = list(merge(
+            notes, tombstones, key=attrgetter('revision')
+        ))[:limit + 1]
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return JsonResponse({
+            'changes': [self.serialize_change(change) for change in changes],
+            'revision': changes[-1].revision if changes else since,
+            'has_more': has_more,
+        })
+
+    def serialize_change(self, change):
+        if isinstance(change, NoteTombstone):
+            return {
+                'id': change.note_id,
+                'slug': change.slug,
+                'revision': change.revision,
+                'deleted': True,
+            }
+        return {**self.serialize(change), 'deleted': False}
@@ -0,0 +1,65 @@
+"""
+Асинхронные обёртки страниц чтения для запуска под ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому представление целиком, вместе
+с запросами к БД и рендерингом шаблона, выполняется в отдельном пуле
+потоков. Пул не привязан к потоку запроса (как thread_sensitive=False),
+его размер задаёт ASYNC_VIEWS_THREADS. Цикл событий при этом не
+блокируется, а число одновременных обращений к БД ограничено пулом.
+"""
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .instrumentation import current_profile
+
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_VIEWS_THREADS,
+    thread_name_prefix='notes-view',
+)
+
+
+def _render(view, request, *args, **kwargs):
+    """
+    Вызывает view и рендерит ответ в потоке пула.
+
+    Ответ приходит в middleware уже отрендеренным, поэтому время
+    рендеринга записывается в замер запроса здесь.
+    """
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            profile = current_profile()
+            started = time.perf_counter()
+            response.render()
+            if profile is not None:
+                profile.template_time += time.perf_counter() - started
+        return response
+    finally:
+        # Соединения потоков пула закрываются по тем же правилам,
+        # что и соединения обычного запроса.
+        close_old_connections()
+
+
+def async_view(view):
+    """Асинхронная версия синхронного view."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            EXECUTOR,
+            functools.partial(
+                context.run, _render, view, request, *args, **kwargs
+            ),
+        )
+    return wrapper
+
+
+def read_view(view):
+    """Под ASGI (ASYNC_VIEWS) отдаёт асинхронную обёртку, иначе сам view."""
+    return async_view(view) if settings.ASYNC_VIEWS else view
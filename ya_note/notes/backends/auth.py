@@ -0,0 +1,31 @@
+"""
+Пользователь сессии из кеша.
+
+Пользователь кешируется на AUTH_USER_CACHE_TIMEOUT секунд, поэтому
+запрос с сессией в кеше доходит до представления без обращений к БД.
+Запись из кеша удаляется при любом сохранении пользователя (в том
+числе при смене пароля и входе) и при выходе, см. notes.signals.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
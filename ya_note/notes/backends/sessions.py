@@ -0,0 +1,60 @@
+"""
+Сессии в кеше с отложенной записью в БД.
+
+Как и cached_db, сессия читается из кеша, а в БД идёт только при
+промахе. Но изменения сессии во время запроса сначала попадают в кеш,
+а в БД записываются по сигналу request_finished, когда ответ уже
+отправлен. Создание сессии (нужна проверка уникальности ключа) и
+удаление при выходе выполняются сразу. Вне запросов — команды, тесты —
+сессия сохраняется как в cached_db.
+
+Кеш должен быть общим для всех процессов, иначе процессы увидят разные
+версии одной сессии.
+"""
+import threading
+
+from django.contrib.sessions.backends import cached_db, db
+from django.contrib.sessions.backends.base import UpdateError
+from django.core.signals import request_finished, request_started
+from django.dispatch import receiver
+
+_state = threading.local()
+
+
+class SessionStore(cached_db.SessionStore):
+
+    def save(self, must_create=False):
+        pending = getattr(_state, 'pending', None)
+        if must_create or pending is None or self.session_key is None:
+            return super().save(must_create)
+        self._cache.set(
+            self.cache_key, self._get_session(), self.get_expiry_age()
+        )
+        pending[self.session_key] = self
+
+    def delete(self, session_key=None):
+        pending = getattr(_state, 'pending', None)
+        if pending is not None:
+            pending.pop(session_key or self.session_key, None)
+        super().delete(session_key)
+
+
+@receiver(request_started)
+def start_write_behind(**kwargs):
+    # Под ASGI запросы могут делить поток: чужие отложенные записи
+    # не сбрасываются, а сохраняются вместе со своими.
+    if getattr(_state, 'pending', None) is None:
+        _state.pending = {}
+
+
+@receiver(request_finished)
+def flush_sessions(**kwargs):
+    """Записывает в БД сессии, изменённые за время запроса."""
+    pending = getattr(_state, 'pending', None)
+    _state.pending = None
+    for store in (pending or {}).values():
+        try:
+            db.SessionStore.save(store)
+        except UpdateError:
+            # Сессию успели удалить, например при выходе в другой вкладке.
+            store._cache.delete(store.cache_key)
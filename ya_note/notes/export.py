@@ -0,0 +1,61 @@
+"""
+Потоковая выгрузка заметок в Markdown и ZIP.
+
+Заметки читаются из БД порциями, а ответ отдаётся по мере формирования,
+поэтому память не растёт с числом выгружаемых заметок.
+"""
+import zipfile
+
+EXPORT_CHUNK_SIZE = 500
+
+
+def note_markdown(note):
+    """Заметка в виде Markdown-документа."""
+    return f'# {note.title}\n\n{note.text}\n'
+
+
+def export_markdown(notes):
+    """Все заметки одним Markdown-файлом."""
+    for note in notes.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield (note_markdown(note) + '\n').encode()
+
+
+class _ChunkBuffer:
+    """Файл только для записи, из которого забираются записанные байты."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_zip(notes):
+    """
+    ZIP-архив с файлом <slug>.md на каждую заметку.
+
+    Буфер не поддерживает seek, поэтому zipfile пишет размеры файлов
+    в дескрипторах после данных и архив можно отдавать по частям.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for note in notes.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            archive.writestr(f'{note.slug}.md', note_markdown(note))
+            yield buffer.take()
+    yield buffer.take()
+
+
+# Формат выгрузки: функция, тип содержимого и имя файла.
+EXPORT_FORMATS = {
+    'md': (export_markdown, 'text/markdown; charset=utf-8', 'notes.md'),
+    'zip': (export_zip, 'application/zip', 'notes.zip'),
+}
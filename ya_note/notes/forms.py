@@ -1,7 +1,4 @@
-from pytils.translit import slugify
-
 from django import forms
-from django.core.exceptions import ValidationError
 
 from .models import Note
 
@@ -15,15 +12,50 @@ class NoteForm(forms.ModelForm):
         model = Note
         fields = ('title', 'text', 'slug')
 
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+    def validate_unique(self):
+        """
+        Уникальность slug проверяется уникальным индексом при сохранении.
+
+        Отдельный запрос перед сохранением не защищает от гонки
+        и только добавляет обращение к БД.
+        """
+        exclude = [*self._get_validation_exclusions(), 'slug']
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except forms.ValidationError as error:
+            self._update_errors(error)
+
+    def add_slug_error(self):
+        """Сообщает о занятом slug, обнаруженном при сохранении."""
+        self.add_error('slug', self.instance.slug + WARNING)
+
+
+class NoteSelectionForm(forms.Form):
+    """Набор заметок автора, выбранных по slug."""
+    notes = forms.ModelMultipleChoiceField(
+        queryset=Note.objects.none(),
+        to_field_name='slug',
+        widget=forms.MultipleHiddenInput,
+    )
+
+    def __init__(self, *args, author, **kwargs):
+        """Выбрать можно только свои заметки."""
+        super().__init__(*args, **kwargs)
+        self.fields['notes'].queryset = Note.objects.filter(
+            author=author
+        ).only('id', 'slug')
+
+
+class NoteReplaceForm(NoteSelectionForm):
+    """Замена подстроки в заголовках и текстах выбранных заметок."""
+    TARGET_CHOICES = (('title', 'Заголовок'), ('text', 'Текст'))
+
+    find = forms.CharField(label='Найти', strip=False)
+    replace = forms.CharField(label='Заменить на', strip=False,
+                              required=False)
+    targets = forms.MultipleChoiceField(
+        label='Где заменять',
+        choices=TARGET_CHOICES,
+        initial=[value for value, _ in TARGET_CHOICES],
+        widget=forms.CheckboxSelectMultiple,
+    )
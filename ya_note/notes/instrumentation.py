@@ -0,0 +1,193 @@
+"""
+Замеры стоимости запросов: SQL, шаблоны, память.
+
+Для доли INSTRUMENTATION_SAMPLE_RATE запросов InstrumentationMiddleware
+считает число SQL-запросов и время в БД, находит повторяющиеся запросы
+(признак N+1), измеряет рендеринг шаблона и пик памяти. Результат
+уходит в заголовок Server-Timing и в счётчики METRICS, которые
+отдаёт в текстовом формате Prometheus представление metrics.
+
+Обёртка SQL ставится на соединения только после первого замера, а без
+активного замера сводится к чтению contextvar, поэтому при выключенных
+замерах их цена близка к нулю.
+"""
+import contextvars
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+# Пик памяти считает tracemalloc на весь процесс, поэтому память
+# измеряется только у одного запроса за раз.
+_memory_lock = threading.Lock()
+
+
+def record_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(sql, time.perf_counter() - started)
+
+
+def instrument_connection(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@receiver(connection_created)
+def instrument_new_connection(sender, connection, **kwargs):
+    if settings.INSTRUMENTATION_SAMPLE_RATE:
+        instrument_connection(connection)
+
+
+class RequestProfile:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.queries = Counter()
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.duration = 0.0
+        self.peak_memory = None
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    @property
+    def duplicates(self):
+        """Запросы, выполненные не меньше порога раз: {sql: число}."""
+        return {
+            sql: count for sql, count in self.queries.items()
+            if count >= settings.INSTRUMENTATION_DUPLICATE_THRESHOLD
+        }
+
+    def add_query(self, sql, elapsed):
+        # Параметры в sql не подставлены, поэтому запросы цикла
+        # N+1 с разными id совпадают.
+        self.queries[sql] += 1
+        self.db_time += elapsed
+
+    @contextmanager
+    def record(self, memory=True):
+        """Замеряет запросы к БД (во всех потоках контекста) и время."""
+        for connection in connections.all():
+            instrument_connection(connection)
+        token = _current_profile.set(self)
+        tracing = (
+            memory
+            and not tracemalloc.is_tracing()
+            and _memory_lock.acquire(blocking=False)
+        )
+        if tracing:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.duration = time.perf_counter() - started
+            if tracing:
+                self.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                _memory_lock.release()
+            _current_profile.reset(token)
+
+    def server_timing(self):
+        metrics = [
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{self.query_count} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'total;dur={self.duration * 1000:.1f}',
+        ]
+        if self.duplicates:
+            metrics.append(f'dup;desc="{len(self.duplicates)} repeated"')
+        if self.peak_memory is not None:
+            metrics.append(f'mem;desc="{self.peak_memory} bytes"')
+        return ', '.join(metrics)
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+class Metrics:
+    """Счётчики по представлениям для Prometheus."""
+
+    COUNTERS = (
+        ('requests_total', 'Запросов с замером.'),
+        ('request_duration_seconds_total', 'Время обработки.'),
+        ('db_queries_total', 'SQL-запросов.'),
+        ('db_duration_seconds_total', 'Время в БД.'),
+        ('template_duration_seconds_total', 'Время рендеринга шаблонов.'),
+        ('duplicate_queries_total', 'Повторяющихся SQL-запросов (N+1).'),
+    )
+    GAUGES = (
+        ('peak_memory_bytes', 'Наибольший пик памяти запроса.'),
+    )
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._views = defaultdict(Counter)
+
+    def observe(self, view, profile):
+        with self._lock:
+            values = self._views[view]
+            values['requests_total'] += 1
+            values['request_duration_seconds_total'] += profile.duration
+            values['db_queries_total'] += profile.query_count
+            values['db_duration_seconds_total'] += profile.db_time
+            values['template_duration_seconds_total'] += (
+                profile.template_time
+            )
+            values['duplicate_queries_total'] += len(profile.duplicates)
+            if profile.peak_memory is not None:
+                values['peak_memory_bytes'] = max(
+                    values['peak_memory_bytes'], profile.peak_memory
+                )
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        with self._lock:
+            views = {
+                view: dict(values) for view, values in self._views.items()
+            }
+        lines = []
+        for kind, metrics in (('counter', self.COUNTERS),
+                              ('gauge', self.GAUGES)):
+            for name, help_text in metrics:
+                full_name = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {full_name} {help_text}')
+                lines.append(f'# TYPE {full_name} {kind}')
+                for view, values in sorted(views.items()):
+                    lines.append(
+                        f'{full_name}{{view="{view}"}} {values.get(name, 0):g}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics('yanote')
+
+
+def metrics(request):
+    """Счётчики в текстовом формате Prometheus, только для INTERNAL_IPS."""
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(
+        METRICS.render(), content_type='text/plain; version=0.0.4'
+    )
@@ -0,0 +1,21 @@
+"""
+Окружение Jinja2 для горячих шаблонов из каталога jinja2/.
+
+Шаблоны повторяют вывод шаблонов Django из templates/, поэтому здесь
+те же теги и фильтры: url и fill_url.
+"""
+from django.urls import reverse
+from jinja2 import Environment
+
+from .templatetags.url_patterns import fill_url
+
+
+def url(viewname, *args):
+    return reverse(viewname, args=args)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals['url'] = url
+    env.filters['fill_url'] = fill_url
+    return env
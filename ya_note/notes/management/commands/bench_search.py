@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note
+from notes.search import FTS5Backend, TokenIndexBackend
+
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'на', 'ле', 'то', 'ва', 'ре', 'су', 'пи', 'до', 'ла',
+)
+ENDINGS = ('', 'а', 'ы', 'ой', 'ами', 'ого', 'ить', 'ил', 'ая')
+BACKENDS = {'fts5': FTS5Backend, 'tokens': TokenIndexBackend}
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет задержку поиска по заметкам. Данные создаются во '
+        'временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--authors', type=int, default=100)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--backend', choices=tuple(BACKENDS), default='fts5'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        stems = [
+            ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+            for _ in range(5000)
+        ]
+
+        def word():
+            return rng.choice(stems) + rng.choice(ENDINGS)
+
+        backend = BACKENDS[options['backend']]()
+        with transaction.atomic():
+            user_model = get_user_model()
+            user_model.objects.bulk_create([
+                user_model(username=f'bench_{i}', password='!')
+                for i in range(options['authors'])
+            ])
+            authors = list(
+                user_model.objects.filter(username__startswith='bench_')
+            )
+            started = time.perf_counter()
+            last_id = Note.objects.order_by('-id').values_list(
+                'id', flat=True
+            ).first() or 0
+            for offset in range(0, options['notes'], options['batch_size']):
+                size = min(options['batch_size'], options['notes'] - offset)
+                Note.objects.bulk_create(
+                    Note(
+                        title=' '.join(word() for _ in range(3)),
+                        text=' '.join(word() for _ in range(30)),
+                        slug=f'bench-{offset + i}',
+                        author=authors[(offset + i) % len(authors)],
+                    )
+                    for i in range(size)
+                )
+                batch = list(Note.objects.filter(id__gt=last_id))
+                backend.index_notes(batch)
+                last_id = batch[-1].id
+                self.stderr.write(f'\r{offset + size}', ending='')
+            self.stderr.write('')
+            indexed = time.perf_counter() - started
+            timings = []
+            for _ in range(options['queries']):
+                query = ' '.join(word() for _ in range(rng.randint(1, 2)))
+                started = time.perf_counter()
+                backend.search(rng.choice(authors), query, 50)
+                timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+        timings.sort()
+        self.stdout.write(
+            f'{options["backend"]}: {options["notes"]} заметок, '
+            f'создание и индексация {indexed:.1f} с; запрос: медиана '
+            f'{statistics.median(timings):.2f} мс, '
+            f'p95 {timings[int(len(timings) * 0.95) - 1]:.2f} мс'
+        )
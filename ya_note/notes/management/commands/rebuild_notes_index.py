@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+from notes.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс заметок текущего бэкенда.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        batch_size = options['batch_size']
+        last_id = indexed = 0
+        while True:
+            batch = list(
+                Note.objects.filter(id__gt=last_id).order_by('id')
+                .only('id', 'author_id', 'title', 'text')[:batch_size]
+            )
+            if not batch:
+                break
+            backend.index_notes(batch)
+            last_id = batch[-1].id
+            indexed += len(batch)
+        self.stdout.write(
+            f'{type(backend).__name__}: проиндексировано заметок {indexed}'
+        )
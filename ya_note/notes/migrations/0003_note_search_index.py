@@ -0,0 +1,52 @@
+# Generated by Django 3.2.15 on 2026-10-18 16:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+
+def create_fts_table(apps, schema_editor):
+    """FTS5 есть не в каждой сборке SQLite, без неё работает NoteTerm."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE VIRTUAL TABLE notes_note_fts USING fts5('
+                'author_id UNINDEXED, title, text, '
+                "tokenize = 'unicode61 remove_diacritics 0')"
+            )
+    except OperationalError:
+        pass
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS notes_note_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='notes.note')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='noteterm',
+            index=models.Index(fields=['author', 'term'], name='noteterm_author_term_idx'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.2.15 on 2026-10-18 16:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_revisions(apps, schema_editor):
+    """Существующие заметки автора нумеруются по порядку id."""
+    Note = apps.get_model('notes', 'Note')
+    AuthorRevision = apps.get_model('notes', 'AuthorRevision')
+    revisions = {}
+    notes = []
+    for note in Note.objects.only('id', 'author_id').order_by('id'):
+        revisions[note.author_id] = revisions.get(note.author_id, 0) + 1
+        note.revision = revisions[note.author_id]
+        notes.append(note)
+    Note.objects.bulk_update(notes, ['revision'], batch_size=500)
+    AuthorRevision.objects.bulk_create(
+        AuthorRevision(author_id=author_id, revision=revision)
+        for author_id, revision in revisions.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0003_note_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorRevision',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('revision', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NoteTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_id', models.BigIntegerField()),
+                ('slug', models.SlugField(db_index=False, max_length=100)),
+                ('revision', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Изменена'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'revision'], name='note_author_revision_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notetombstone',
+            index=models.Index(fields=['author', 'revision'], name='notetombstone_author_rev_idx'),
+        ),
+        migrations.RunPython(fill_revisions, migrations.RunPython.noop),
+    ]
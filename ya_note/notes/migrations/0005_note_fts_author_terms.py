@@ -0,0 +1,94 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:48
+
+from django.db import migrations
+
+OLD_COLUMNS = (
+    "author_id UNINDEXED, title, text, "
+    "tokenize = 'unicode61 remove_diacritics 0'"
+)
+NEW_COLUMNS = (
+    'title, text, '
+    "tokenize = \"unicode61 remove_diacritics 0 tokenchars '_'\""
+)
+BATCH_SIZE = 1000
+
+
+def add_author(author_id, stems):
+    return ' '.join(f'{author_id}_{stem}' for stem in stems.split())
+
+
+def strip_author(terms):
+    return ' '.join(term.split('_', 1)[1] for term in terms.split())
+
+
+def copy_fts_table(schema_editor, columns, select, insert, convert):
+    """
+    Переносит индекс в таблицу с новыми колонками пачками по rowid.
+
+    Основы уже лежат в таблице, стеммер для переноса не нужен.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    if 'notes_note_fts' not in connection.introspection.table_names():
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE notes_note_fts_new USING fts5({columns})'
+    )
+    last_id = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(select, [last_id, BATCH_SIZE])
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany(insert, [convert(*row) for row in rows])
+            last_id = rows[-1][0]
+    schema_editor.execute('DROP TABLE notes_note_fts')
+    schema_editor.execute(
+        'ALTER TABLE notes_note_fts_new RENAME TO notes_note_fts'
+    )
+
+
+def prefix_terms(apps, schema_editor):
+    """
+    Основы в FTS5 теперь хранятся с префиксом автора.
+
+    «_» входит в токен, чтобы префикс не отделялся от основы.
+    """
+    copy_fts_table(
+        schema_editor, NEW_COLUMNS,
+        'SELECT rowid, author_id, title, text FROM notes_note_fts '
+        'WHERE rowid > %s ORDER BY rowid LIMIT %s',
+        'INSERT INTO notes_note_fts_new (rowid, title, text) '
+        'VALUES (%s, %s, %s)',
+        lambda rowid, author_id, title, text: (
+            rowid, add_author(author_id, title), add_author(author_id, text)
+        ),
+    )
+
+
+def unprefix_terms(apps, schema_editor):
+    copy_fts_table(
+        schema_editor, OLD_COLUMNS,
+        'SELECT fts.rowid, note.author_id, fts.title, fts.text '
+        'FROM notes_note_fts AS fts '
+        'JOIN notes_note AS note ON note.id = fts.rowid '
+        'WHERE fts.rowid > %s ORDER BY fts.rowid LIMIT %s',
+        'INSERT INTO notes_note_fts_new (rowid, author_id, title, text) '
+        'VALUES (%s, %s, %s, %s)',
+        lambda rowid, author_id, title, text: (
+            rowid, author_id, strip_author(title), strip_author(text)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_revision'),
+    ]
+
+    operations = [
+        migrations.RunPython(prefix_terms, unprefix_terms),
+    ]
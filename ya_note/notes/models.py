@@ -1,8 +1,106 @@
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Max, Min
+from django.utils import timezone
+from django.utils.crypto import get_random_string
 
 from pytils.translit import slugify
 
+# Сколько раз пробуем сохранить заметку с новым slug при коллизиях.
+SLUG_ATTEMPTS = 5
+SLUG_SUFFIX_LENGTH = 6
+SLUG_SUFFIX_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+@lru_cache(maxsize=4096)
+def transliterate(title, max_length):
+    """Кэширует транслитерацию одинаковых заголовков."""
+    return slugify(title)[:max_length] or 'note'
+
+
+class AuthorRevision(models.Model):
+    """Последняя выданная ревизия заметок автора."""
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+    revision = models.PositiveBigIntegerField(default=0)
+
+
+def allocate_revisions(author_id, count=1):
+    """
+    Выдаёт автору count новых ревизий и возвращает последнюю из них.
+
+    UPDATE счётчика блокирует его строку до конца транзакции, поэтому
+    изменения одного автора фиксируются в порядке ревизий и клиент,
+    запомнивший ревизию, не пропустит более раннюю незафиксированную.
+    Вызывать нужно в той же транзакции, что и запись заметок.
+    """
+    counters = AuthorRevision.objects.filter(author_id=author_id)
+    if not counters.update(revision=F('revision') + count):
+        try:
+            with transaction.atomic():
+                AuthorRevision.objects.create(
+                    author_id=author_id, revision=count
+                )
+            return count
+        except IntegrityError:
+            counters.update(revision=F('revision') + count)
+    return counters.values_list('revision', flat=True).get()
+
+
+class NoteQuerySet(models.QuerySet):
+
+    def update_with_revision(self, **kwargs):
+        """
+        Изменяет заметки одним UPDATE на автора и выдаёт им новые ревизии.
+
+        Ревизия заметки равна её id плюс сдвиг, поэтому внутри автора
+        ревизии уникальны и монотонны, но могут идти с пропусками.
+        """
+        updated = 0
+        with transaction.atomic():
+            id_ranges = self.order_by().values('author_id').annotate(
+                first_id=Min('id'), last_id=Max('id')
+            )
+            for row in id_ranges:
+                last_revision = allocate_revisions(
+                    row['author_id'], row['last_id'] - row['first_id'] + 1
+                )
+                updated += self.filter(author_id=row['author_id']).update(
+                    revision=F('id') + (last_revision - row['last_id']),
+                    updated_at=timezone.now(),
+                    **kwargs,
+                )
+        return updated
+
+    def delete(self):
+        """Удалённые заметки оставляют надгробия для синхронизации."""
+        with transaction.atomic():
+            tombstones = []
+            notes = self.order_by('author_id', 'id').values_list(
+                'author_id', 'id', 'slug'
+            )
+            for author_id, rows in groupby(notes, key=itemgetter(0)):
+                rows = list(rows)
+                last_revision = allocate_revisions(author_id, len(rows))
+                first_revision = last_revision - len(rows) + 1
+                tombstones += [
+                    NoteTombstone(
+                        author_id=author_id, note_id=note_id, slug=slug,
+                        revision=first_revision + index,
+                    )
+                    for index, (_, note_id, slug) in enumerate(rows)
+                ]
+            NoteTombstone.objects.bulk_create(tombstones, batch_size=500)
+            return super().delete()
+
 
 class Note(models.Model):
     title = models.CharField(
@@ -27,12 +125,116 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated_at = models.DateTimeField('Изменена', auto_now=True)
+    revision = models.PositiveBigIntegerField(default=0, editable=False)
+
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+            models.Index(
+                fields=('author', 'revision'),
+                name='note_author_revision_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """Каждое сохранение получает новую ревизию автора."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields, 'revision', 'updated_at'
+            }
+        with transaction.atomic():
+            self.revision = allocate_revisions(self.author_id)
+            return self._save_with_slug(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Удалённая заметка оставляет надгробие для синхронизации."""
+        with transaction.atomic():
+            NoteTombstone.objects.create(
+                author_id=self.author_id, note_id=self.pk, slug=self.slug,
+                revision=allocate_revisions(self.author_id),
+            )
+            return super().delete(*args, **kwargs)
+
+    def _save_with_slug(self, *args, **kwargs):
+        """
+        Пустой slug формируется из заголовка.
+
+        Уникальность проверяет индекс БД: при коллизии slug сохранение
+        откатывается до точки сохранения и повторяется со случайным
+        суффиксом. Прочие ошибки целостности пробрасываются как есть.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = transliterate(self.title, max_slug_length)
+        self.slug = base
+        for _ in range(SLUG_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if not self._slug_taken():
+                    self.slug = ''
+                    raise
+                suffix = '-' + get_random_string(
+                    SLUG_SUFFIX_LENGTH, SLUG_SUFFIX_CHARS
+                )
+                self.slug = base[:max_slug_length - len(suffix)] + suffix
+        self.slug = ''
+        raise IntegrityError('Не удалось подобрать уникальный slug.')
+
+    def _slug_taken(self):
+        return Note.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+
+
+class NoteTombstone(models.Model):
+    """Запись об удалённой заметке для дельта-синхронизации."""
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    note_id = models.BigIntegerField()
+    slug = models.SlugField(max_length=100, db_index=False)
+    revision = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'revision'),
+                name='notetombstone_author_rev_idx',
+            ),
+        )
+
+
+class NoteTerm(models.Model):
+    """Запись обратного индекса: основа слова в заметке и её вес."""
+    TERM_MAX_LENGTH = 64
+
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='terms',
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    term = models.CharField(max_length=TERM_MAX_LENGTH)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'term'), name='noteterm_author_term_idx'
+            ),
+        )
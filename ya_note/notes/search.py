@@ -0,0 +1,147 @@
+"""
+Полнотекстовый поиск по заметкам автора.
+
+Заголовок и текст заметки разбиваются на слова и приводятся к основам
+русским стеммером. Если SQLite собран с FTS5, основы хранятся в
+виртуальной таблице FTS5 с префиксом автора и ранжируются по BM25.
+Иначе используется обратный индекс в таблице NoteTerm. Индекс
+обновляется сигналами при сохранении и удалении заметки.
+"""
+import re
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from .models import NoteTerm
+from .stemming import stem
+
+FTS_TABLE = 'notes_note_fts'
+TITLE_WEIGHT = 5
+WORD = re.compile(r'\w+')
+
+
+def terms(text):
+    """Основы слов текста в порядке следования."""
+    return [stem(word) for word in WORD.findall(text.lower())]
+
+
+class TokenIndexBackend:
+    """Обратный индекс в обычной таблице, работает на любой СУБД."""
+
+    @staticmethod
+    def _terms(text):
+        """Основы, обрезанные по длине колонки, — при индексации и поиске."""
+        return [term[:NoteTerm.TERM_MAX_LENGTH] for term in terms(text)]
+
+    def index_notes(self, notes):
+        notes = list(notes)
+        with transaction.atomic():
+            self.remove_notes([note.id for note in notes])
+            NoteTerm.objects.bulk_create(
+                (
+                    NoteTerm(
+                        note_id=note.id, author_id=note.author_id,
+                        term=term, weight=weight,
+                    )
+                    for note in notes
+                    for term, weight in self._weights(note).items()
+                ),
+                batch_size=1000,
+            )
+
+    def _weights(self, note):
+        weights = Counter(self._terms(note.text))
+        for term in self._terms(note.title):
+            weights[term] += TITLE_WEIGHT
+        return weights
+
+    def remove_notes(self, note_ids):
+        NoteTerm.objects.filter(note_id__in=note_ids).delete()
+
+    def search(self, author, query, limit):
+        query_terms = set(self._terms(query))
+        if not query_terms:
+            return []
+        return list(
+            NoteTerm.objects.filter(author=author, term__in=query_terms)
+            .values('note_id')
+            .annotate(matched=Count('term'), score=Sum('weight'))
+            .filter(matched=len(query_terms))
+            .order_by('-score', '-note_id')
+            .values_list('note_id', flat=True)[:limit]
+        )
+
+
+class FTS5Backend:
+    """
+    Виртуальная таблица SQLite FTS5 с ранжированием BM25.
+
+    Каждая основа хранится с префиксом id автора («42_основ»), поэтому
+    MATCH читает списки документов только этого автора, а не всех.
+    """
+
+    @staticmethod
+    def _author_terms(author_id, text):
+        return ' '.join(f'{author_id}_{term}' for term in terms(text))
+
+    def index_notes(self, notes):
+        notes = list(notes)
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._delete(cursor, [note.id for note in notes])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [
+                    (
+                        note.id,
+                        self._author_terms(note.author_id, note.title),
+                        self._author_terms(note.author_id, note.text),
+                    )
+                    for note in notes
+                ],
+            )
+
+    def _delete(self, cursor, note_ids):
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(note_id,) for note_id in note_ids],
+        )
+
+    def remove_notes(self, note_ids):
+        with connection.cursor() as cursor:
+            self._delete(cursor, note_ids)
+
+    def search(self, author, query, limit):
+        query_terms = set(self._author_terms(author.pk, query).split())
+        if not query_terms:
+            return []
+        match = ' '.join(f'"{term}"' for term in query_terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, %s, 1) LIMIT %s',
+                [match, TITLE_WEIGHT, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+@lru_cache(maxsize=None)
+def _fts_table_exists(vendor, database_name):
+    return (
+        vendor == 'sqlite'
+        and FTS_TABLE in connection.introspection.table_names()
+    )
+
+
+def get_backend():
+    """Бэкенд поиска согласно настройке NOTES_SEARCH_BACKEND."""
+    backend = settings.NOTES_SEARCH_BACKEND
+    if backend == 'auto':
+        use_fts = _fts_table_exists(
+            connection.vendor, str(connection.settings_dict['NAME'])
+        )
+        backend = 'fts5' if use_fts else 'tokens'
+    return FTS5Backend() if backend == 'fts5' else TokenIndexBackend()
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends.auth import forget_user
+from .models import Note
+from .search import get_backend
+
+
+@receiver(post_save, sender=Note)
+def index_note(sender, instance, raw=False, **kwargs):
+    """Сохранённая заметка переиндексируется для поиска."""
+    if not raw:
+        get_backend().index_notes([instance])
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note(sender, instance, **kwargs):
+    """Удалённая заметка пропадает из поискового индекса."""
+    get_backend().remove_notes([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_saved_user(sender, instance, **kwargs):
+    """Изменённый пользователь (например, пароль) перечитывается из БД."""
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
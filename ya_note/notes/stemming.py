@@ -0,0 +1,122 @@
+"""
+Стеммер для русского языка по алгоритму Snowball.
+
+Описание алгоритма: https://snowballstem.org/algorithms/russian/stemmer.html
+Слова не на кириллице возвращаются без изменений.
+"""
+import re
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND_1 = ('вшись', 'вши', 'в')
+PERFECTIVE_GERUND_2 = ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв')
+ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое',
+    'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых', 'ую',
+    'юю', 'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE_1 = ('ем', 'нн', 'вш', 'ющ', 'щ')
+PARTICIPLE_2 = ('ивш', 'ывш', 'ующ')
+REFLEXIVE = ('ся', 'сь')
+VERB_1 = (
+    'ете', 'йте', 'ешь', 'нно', 'ла', 'на', 'ли', 'ем', 'ло', 'но',
+    'ет', 'ют', 'ны', 'ть', 'й', 'л', 'н',
+)
+VERB_2 = (
+    'ейте', 'уйте', 'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило',
+    'ыло', 'ено', 'ует', 'уют', 'ены', 'ить', 'ыть', 'ишь', 'ей', 'уй',
+    'ил', 'ыл', 'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую', 'ю',
+)
+NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие',
+    'ье', 'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах',
+    'ях', 'ию', 'ью', 'ия', 'ья', 'а', 'е', 'и', 'й', 'о', 'у', 'ы',
+    'ь', 'ю', 'я',
+)
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+CYRILLIC_WORD = re.compile('^[а-я]+$')
+
+
+def _longest(word, endings):
+    """Самое длинное окончание из списка, которым кончается слово."""
+    return max(
+        (ending for ending in endings if word.endswith(ending)),
+        key=len,
+        default=None,
+    )
+
+
+def _after_a_ya(word, endings):
+    """Окончание первой группы: перед ним должна стоять «а» или «я»."""
+    ending = _longest(word, endings)
+    if ending and word[:-len(ending)].endswith(('а', 'я')):
+        return ending
+    return None
+
+
+def _strip(word, ending):
+    return word[:-len(ending)] if ending else word
+
+
+def _region_after_vowel_consonant(word):
+    for i in range(1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _step_1(rv):
+    gerund = _after_a_ya(rv, PERFECTIVE_GERUND_1)
+    gerund_2 = _longest(rv, PERFECTIVE_GERUND_2)
+    if gerund or gerund_2:
+        return _strip(rv, max(gerund or '', gerund_2 or '', key=len))
+    rv = _strip(rv, _longest(rv, REFLEXIVE))
+    adjective = _longest(rv, ADJECTIVE)
+    if adjective:
+        rv = _strip(rv, adjective)
+        participle = _longest(rv, PARTICIPLE_2) or _after_a_ya(
+            rv, PARTICIPLE_1
+        )
+        return _strip(rv, participle)
+    verb_1 = _after_a_ya(rv, VERB_1)
+    verb_2 = _longest(rv, VERB_2)
+    if verb_1 or verb_2:
+        return _strip(rv, max(verb_1 or '', verb_2 or '', key=len))
+    return _strip(rv, _longest(rv, NOUN))
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    """Основа слова. Ожидается слово в нижнем регистре."""
+    word = word.replace('ё', 'е')
+    if not CYRILLIC_WORD.match(word):
+        return word
+    start = next(
+        (i + 1 for i, char in enumerate(word) if char in VOWELS), len(word)
+    )
+    prefix, rv = word[:start], word[start:]
+    rv = _step_1(rv)
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    # R2 считается от начала слова, переводим его в координаты RV.
+    word_r1 = _region_after_vowel_consonant(word)
+    r2_start = word_r1 + _region_after_vowel_consonant(word[word_r1:])
+    derivational = _longest(rv, DERIVATIONAL)
+    if derivational and len(prefix) + len(rv) - len(derivational) >= (
+        r2_start
+    ):
+        rv = _strip(rv, derivational)
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        superlative = _longest(rv, SUPERLATIVE)
+        if superlative:
+            rv = _strip(rv, superlative)
+            if rv.endswith('нн'):
+                rv = rv[:-1]
+        elif rv.endswith('ь'):
+            rv = rv[:-1]
+    return prefix + rv
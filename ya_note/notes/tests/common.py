@@ -15,6 +15,10 @@ class CommonTestCase(TestCase):
         cls.list_url = reverse('notes:list')
         cls.add_url = reverse('notes:add')
         cls.success_url = reverse('notes:success')
+        cls.search_url = reverse('notes:search')
+        cls.bulk_delete_url = reverse('notes:bulk_delete')
+        cls.bulk_replace_url = reverse('notes:bulk_replace')
+        cls.bulk_export_url = reverse('notes:bulk_export')
 
         # Пользователи
         cls.user1 = User.objects.create_user(
@@ -0,0 +1,13 @@
+from django.conf import settings
+
+
+def pytest_configure(config):
+    """
+    Объявляет реплику для тестов маршрутизации чтений.
+
+    Её тестовая база SQLite, как и основная, создаётся в памяти.
+    """
+    settings.DATABASES.setdefault('replica', {
+        'ENGINE': 'notes.backends.sqlite3',
+        'NAME': settings.BASE_DIR / 'db.replica.sqlite3',
+    })
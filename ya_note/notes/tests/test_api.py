@@ -0,0 +1,221 @@
+import json
+from http import HTTPStatus
+
+from django.test import override_settings
+from django.urls import reverse
+
+from notes.models import Note
+
+from .common import CommonTestCase
+
+
+class NoteApiTests(CommonTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.api_list_url = reverse('notes:api_list')
+        cls.api_detail_url = lambda slug: reverse(
+            'notes:api_detail', kwargs={'slug': slug})
+
+    def send(self, method, url, data, **headers):
+        return getattr(self.authenticated_client, method)(
+            url, json.dumps(data), content_type='application/json',
+            **headers)
+
+    def test_anonymous_user_gets_401(self):
+        """Анонимный пользователь получает 401 вместо редиректа."""
+        response = self.client.get(self.api_list_url)
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_list_contains_only_own_notes(self):
+        """В списке только заметки автора."""
+        response = self.authenticated_client.get(self.api_list_url)
+        slugs = [note['slug'] for note in response.json()['results']]
+        self.assertEqual(slugs, [note.slug for note in self.notes_user1])
+        self.assertIsNone(response.json()['next'])
+
+    def test_sparse_fieldset(self):
+        """?fields= ограничивает поля ответа и загружаемые колонки."""
+        self.authenticated_client.get(self.api_list_url)
+        with self.assertNumQueries(1):
+            # Сессия и пользователь уже в кеше, остаются сами заметки.
+            response = self.authenticated_client.get(
+                self.api_list_url, {'fields': 'slug,title'})
+        for note in response.json()['results']:
+            self.assertEqual(set(note), {'slug', 'title'})
+
+    def test_unknown_field_rejected(self):
+        """Неизвестное поле в ?fields= даёт 400."""
+        response = self.authenticated_client.get(
+            self.api_list_url, {'fields': 'slug,author'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    @override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+    def test_cursor_pagination(self):
+        """Страницы связаны ссылкой next до последней."""
+        url, slugs = self.api_list_url, []
+        while url:
+            data = self.authenticated_client.get(url).json()
+            slugs += [note['slug'] for note in data['results']]
+            url = data['next']
+        self.assertEqual(slugs, [note.slug for note in self.notes_user1])
+
+    def test_invalid_cursor_rejected(self):
+        """Нечисловой или слишком большой курсор даёт JSON 400."""
+        for after in ('abc', '9' * 30):
+            with self.subTest(after=after):
+                response = self.authenticated_client.get(
+                    self.api_list_url, {'after': after})
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST)
+                self.assertIn('after', response.json()['errors'])
+
+    def test_detail_not_modified(self):
+        """Повтор с If-None-Match получает 304."""
+        url = self.api_detail_url(self.notes_user1[0].slug)
+        response = self.authenticated_client.get(url)
+        self.assertEqual(response.json()['title'], self.notes_user1[0].title)
+        response = self.authenticated_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_foreign_note_not_found(self):
+        """Чужая заметка недоступна."""
+        response = self.authenticated_client.get(
+            self.api_detail_url(self.notes_user2[0].slug))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_create(self):
+        """Создание возвращает 201, Location и ETag."""
+        response = self.send('post', self.api_list_url, self.form_data)
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertEqual(response['Location'],
+                         self.api_detail_url(self.form_data['slug']))
+        self.assertIn('ETag', response)
+        note = Note.objects.get(slug=self.form_data['slug'])
+        self.assertEqual(note.author, self.user1)
+
+    def test_create_duplicate_slug(self):
+        """Занятый slug даёт 400 с ошибкой поля."""
+        data = {**self.form_data, 'slug': self.notes_user2[0].slug}
+        response = self.send('post', self.api_list_url, data)
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('slug', response.json()['errors'])
+
+    def test_patch_with_if_match(self):
+        """Изменение проходит только с актуальным ETag."""
+        note = self.notes_user1[0]
+        url = self.api_detail_url(note.slug)
+        etag = self.authenticated_client.get(url)['ETag']
+        response = self.send('patch', url, {'title': 'Новый'},
+                             HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()['text'], note.text)
+        self.assertNotEqual(response['ETag'], etag)
+        response = self.send('patch', url, {'title': 'Устаревший'},
+                             HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code,
+                         HTTPStatus.PRECONDITION_FAILED)
+        note.refresh_from_db()
+        self.assertEqual(note.title, 'Новый')
+
+    def test_delete_with_stale_etag(self):
+        """Удаление с устаревшим ETag отклоняется."""
+        note = self.notes_user1[0]
+        url = self.api_detail_url(note.slug)
+        response = self.authenticated_client.delete(
+            url, HTTP_IF_MATCH='"stale"')
+        self.assertEqual(response.status_code,
+                         HTTPStatus.PRECONDITION_FAILED)
+        response = self.authenticated_client.delete(url)
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Note.objects.filter(pk=note.pk).exists())
+
+
+class NoteChangesApiTests(CommonTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.changes_url = reverse('notes:changes')
+
+    def get_changes(self, since):
+        return self.authenticated_client.get(
+            self.changes_url, {'since': since}).json()
+
+    def test_revisions_are_per_author_and_increasing(self):
+        """Ревизии каждого автора растут с каждым сохранением."""
+        self.assertEqual(
+            [note.revision for note in self.notes_user1], [1, 2, 3, 4, 5])
+        self.assertEqual(
+            [note.revision for note in self.notes_user2], [1, 2, 3, 4, 5])
+        note = self.notes_user1[0]
+        note.save()
+        self.assertEqual(note.revision, 6)
+
+    def test_only_changes_since_revision(self):
+        """Возвращаются только изменения после переданной ревизии."""
+        data = self.get_changes(0)
+        self.assertEqual(len(data['changes']), 5)
+        self.assertEqual(data['revision'], 5)
+        note = self.notes_user1[2]
+        note.title = 'Изменённая'
+        note.save()
+        self.notes_user2[0].save()
+        data = self.get_changes(5)
+        self.assertEqual(
+            [change['slug'] for change in data['changes']], [note.slug])
+        self.assertEqual(data['changes'][0]['title'], 'Изменённая')
+        self.assertEqual(data['revision'], 6)
+        self.assertEqual(self.get_changes(6)['changes'], [])
+
+    def test_invalid_since_rejected(self):
+        """Нечисловая или слишком большая ревизия даёт JSON 400."""
+        for since in ('abc', '9' * 30):
+            with self.subTest(since=since):
+                response = self.authenticated_client.get(
+                    self.changes_url, {'since': since})
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST)
+                self.assertIn('since', response.json()['errors'])
+
+    def test_deleted_notes_become_tombstones(self):
+        """Удаление по одной и пачкой оставляет надгробия."""
+        deleted_ids = [self.notes_user1[i].id for i in (0, 3, 4)]
+        self.notes_user1[0].delete()
+        Note.objects.filter(pk__in=deleted_ids[1:]).delete()
+        changes = self.get_changes(5)['changes']
+        self.assertEqual(
+            [(change['id'], change['deleted']) for change in changes],
+            [(note_id, True) for note_id in deleted_ids],
+        )
+        self.assertEqual(
+            [change['revision'] for change in changes], [6, 7, 8])
+
+    def test_bulk_replace_allocates_revisions(self):
+        """Пакетная замена выдаёт изменённым заметкам новые ревизии."""
+        self.authenticated_client.post(reverse('notes:bulk_replace'), {
+            'notes': [note.slug for note in self.notes_user1[:2]],
+            'find': 'Test',
+            'replace': 'Новый',
+            'targets': ['text'],
+        })
+        changes = self.get_changes(5)['changes']
+        self.assertEqual(
+            [change['id'] for change in changes],
+            [note.id for note in self.notes_user1[:2]],
+        )
+        self.assertTrue(all(change['revision'] > 5 for change in changes))
+
+    @override_settings(NOTES_CHANGES_LIMIT=2)
+    def test_changes_paginated_by_revision(self):
+        """Изменения выдаются порциями до has_more=false."""
+        since, slugs = 0, []
+        while True:
+            data = self.get_changes(since)
+            slugs += [change['slug'] for change in data['changes']]
+            since = data['revision']
+            if not data['has_more']:
+                break
+        self.assertEqual(slugs, [note.slug for note in self.notes_user1])
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.models import User
+from django.test import (AsyncRequestFactory, SimpleTestCase,
+                         TransactionTestCase, override_settings)
+
+from notes import views
+from notes.async_views import async_view, read_view
+from notes.instrumentation import RequestProfile
+from notes.models import Note
+
+
+class ReadViewTests(SimpleTestCase):
+
+    def test_read_view_follows_flag(self):
+        """Асинхронная обёртка используется только с ASYNC_VIEWS."""
+        view = views.NotesList.as_view()
+        with override_settings(ASYNC_VIEWS=False):
+            self.assertIs(read_view(view), view)
+        with override_settings(ASYNC_VIEWS=True):
+            self.assertTrue(asyncio.iscoroutinefunction(read_view(view)))
+
+
+class AsyncViewTests(TransactionTestCase):
+
+    def test_note_detail_rendered_in_pool(self):
+        """Заметка рендерится в потоке пула и доступна только автору."""
+        author = User.objects.create_user(username='async_author')
+        note = Note.objects.create(
+            title='Асинхронная заметка', text='Текст', author=author)
+        threads = []
+
+        def view(request, *args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return views.NoteDetail.as_view()(request, *args, **kwargs)
+
+        request = AsyncRequestFactory().get('/')
+        request.user = author
+        response = async_to_sync(async_view(view))(request, slug=note.slug)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(note.title, response.content.decode())
+        self.assertTrue(threads[0].startswith('notes-view'))
+
+    def test_render_time_recorded(self):
+        """Рендеринг в потоке пула попадает в замер запроса."""
+        author = User.objects.create_user(username='async_author')
+        note = Note.objects.create(
+            title='Асинхронная заметка', text='Текст', author=author)
+        request = AsyncRequestFactory().get('/')
+        request.user = author
+        with RequestProfile().record(memory=False) as profile:
+            async_to_sync(async_view(views.NoteDetail.as_view()))(
+                request, slug=note.slug
+            )
+        self.assertGreater(profile.template_time, 0)
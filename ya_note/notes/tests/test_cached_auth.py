@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.backends.auth import user_cache_key
+
+AUTH_TABLES = ('FROM "auth_user"', 'FROM "django_session"')
+
+
+class CachedAuthTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='cached_user', password='secret')
+        cls.list_url = reverse('notes:list')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_logged_in_list_skips_auth_queries(self):
+        """Повторный запрос с сессией не читает сессию и пользователя."""
+        self.client.get(self.list_url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        auth_queries = [
+            query for query in queries.captured_queries
+            if any(table in query['sql'] for table in AUTH_TABLES)
+        ]
+        self.assertLessEqual(len(auth_queries), 1)
+
+    def test_login_written_to_db_after_request(self):
+        """Сессия после входа записывается в БД к концу запроса."""
+        self.client.logout()
+        self.client.post(reverse('users:login'), {
+            'username': 'cached_user', 'password': 'secret',
+        })
+        session = Session.objects.get(pk=self.client.session.session_key)
+        self.assertEqual(
+            session.get_decoded()['_auth_user_id'], str(self.user.pk))
+
+    def test_password_change_invalidates_user(self):
+        """После смены пароля старая сессия перестаёт действовать."""
+        self.client.get(self.list_url)
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.client.get(self.list_url)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={self.list_url}')
+
+    def test_logout_forgets_user_and_session(self):
+        """Выход удаляет сессию и пользователя из кеша."""
+        self.client.get(self.list_url)
+        session_key = self.client.session.session_key
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.client.post(reverse('users:logout'))
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertFalse(Session.objects.filter(pk=session_key).exists())
@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.test import override_settings
 from django.urls import reverse
 
 from .common import CommonTestCase
@@ -49,3 +50,35 @@ class TestHome(CommonTestCase):
             self.assertEqual(edit_response.status_code, HTTPStatus.OK)
             self.assertIn('form', edit_response.context)
             self.assertIsInstance(edit_response.context['form'], NoteForm)
+
+
+class TestNotesListPagination(CommonTestCase):
+
+    @override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+    def test_keyset_pages_cover_all_notes(self):
+        """Переход по ?after= выдаёт все заметки автора по одному разу."""
+        seen, after = [], None
+        while True:
+            response = self.authenticated_client.get(
+                self.list_url, {'after': after} if after else {}
+            )
+            seen += [note.id for note in response.context['object_list']]
+            after = response.context['next_after']
+            if after is None:
+                break
+        self.assertEqual(seen, [note.id for note in self.notes_user1])
+
+    def test_list_loads_only_displayed_fields(self):
+        """Текст заметок в списке не загружается."""
+        response = self.authenticated_client.get(self.list_url)
+        for note in response.context['object_list']:
+            self.assertIn('text', note.get_deferred_fields())
+
+    def test_invalid_cursor(self):
+        """Нечисловой или слишком большой курсор приводит к 404."""
+        for after in ('abc', '9' * 30):
+            with self.subTest(after=after):
+                response = self.authenticated_client.get(
+                    self.list_url, {'after': after}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
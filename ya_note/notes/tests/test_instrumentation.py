@@ -0,0 +1,67 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from notes.instrumentation import METRICS, RequestProfile
+from notes.models import Note
+
+from .common import CommonTestCase
+
+
+@override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+class InstrumentationTests(CommonTestCase):
+
+    def setUp(self):
+        METRICS.clear()
+        self.addCleanup(METRICS.clear)
+
+    def test_server_timing_header(self):
+        """Замер попадает в заголовок Server-Timing."""
+        response = self.authenticated_client.get(self.list_url)
+        profile = response.wsgi_request.profile
+        self.assertGreater(profile.query_count, 0)
+        self.assertGreater(profile.template_time, 0)
+        self.assertGreater(profile.peak_memory, 0)
+        self.assertIn(
+            f'desc="{profile.query_count} queries"',
+            response['Server-Timing'],
+        )
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_disabled_without_sampling(self):
+        """Без выборки замеров нет."""
+        response = self.authenticated_client.get(self.list_url)
+        self.assertNotIn('Server-Timing', response)
+
+    def test_read_pages_have_no_repeated_queries(self):
+        """На страницах чтения нет повторяющихся запросов (N+1)."""
+        for url in (
+            self.list_url,
+            self.detail_url(self.notes_user1[0].slug),
+            reverse('notes:api_list'),
+        ):
+            with self.subTest(url=url):
+                response = self.authenticated_client.get(url)
+                self.assertEqual(response.wsgi_request.profile.duplicates, {})
+
+    def test_repeated_queries_detected(self):
+        """Чтение автора каждой заметки в цикле распознаётся как N+1."""
+        profile = RequestProfile()
+        with profile.record(memory=False):
+            for note in Note.objects.all():
+                note.author.username
+        [(sql, count)] = profile.duplicates.items()
+        self.assertIn('auth_user', sql)
+        self.assertEqual(count, Note.objects.count())
+
+    def test_metrics_endpoint(self):
+        """Счётчики по представлениям отдаются в формате Prometheus."""
+        self.authenticated_client.get(self.list_url)
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('# TYPE yanote_requests_total counter', body)
+        self.assertIn('yanote_requests_total{view="notes:list"} 1', body)
+
+    @override_settings(INTERNAL_IPS=[])
+    def test_metrics_hidden_from_outside(self):
+        """Счётчики недоступны не из INTERNAL_IPS."""
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 404)
@@ -1,11 +1,20 @@
+import io
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 
 from pytils.translit import slugify
 
+from django.contrib.auth.models import User
+from django.db import IntegrityError, OperationalError, connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.search import get_backend
 
 from .common import CommonTestCase
 
@@ -72,3 +81,155 @@ class NoteLogicTests(CommonTestCase):
         new_note = Note.objects.latest('id')
         expected_slug = slugify(data_without_slug['title'])
         self.assertEqual(new_note.slug, expected_slug)
+
+    def test_other_integrity_error_not_retried(self):
+        """Ошибка целостности не из-за slug не маскируется повторами."""
+        note = Note(title='Без текста', text=None, author=self.user1)
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertRaisesRegex(IntegrityError, 'NOT NULL'):
+                note.save()
+        inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT INTO "notes_note"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(note.slug, '')
+
+
+class BulkOperationsTests(CommonTestCase):
+
+    def test_bulk_delete_own_notes(self):
+        """Выбранные заметки автора удаляются одним запросом."""
+        slugs = [note.slug for note in self.notes_user1[:3]]
+        response = self.authenticated_client.post(
+            self.bulk_delete_url, {'notes': slugs})
+        self.assertRedirects(response, self.success_url)
+        self.assertFalse(Note.objects.filter(slug__in=slugs).exists())
+        self.assertEqual(Note.objects.filter(author=self.user1).count(), 2)
+
+    def test_bulk_delete_foreign_note_rejected(self):
+        """Чужая заметка в выборке отклоняет всю операцию."""
+        slugs = [self.notes_user1[0].slug, self.notes_user2[0].slug]
+        response = self.authenticated_client.post(
+            self.bulk_delete_url, {'notes': slugs})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.context['form'].errors)
+        self.assertEqual(Note.objects.filter(slug__in=slugs).count(), 2)
+
+    def test_bulk_replace(self):
+        """Замена меняет заголовки и тексты и обновляет поиск."""
+        slugs = [note.slug for note in self.notes_user1[:2]]
+        response = self.authenticated_client.post(self.bulk_replace_url, {
+            'notes': slugs,
+            'find': 'Test',
+            'replace': 'Сводка',
+            'targets': ['title', 'text'],
+        })
+        self.assertRedirects(response, self.success_url)
+        for note in Note.objects.filter(slug__in=slugs):
+            self.assertTrue(note.title.startswith('User1 Note'))
+            self.assertEqual(note.text, 'Сводка text')
+        self.assertEqual(
+            Note.objects.filter(text='Test text').count(), 8
+        )
+        found = get_backend().search(self.user1, 'сводка', 10)
+        self.assertCountEqual(
+            found, [note.id for note in self.notes_user1[:2]]
+        )
+
+    def test_bulk_replace_title_only(self):
+        """Можно заменить только в заголовках."""
+        note = self.notes_user1[0]
+        self.authenticated_client.post(self.bulk_replace_url, {
+            'notes': [note.slug],
+            'find': 'Note',
+            'replace': 'Заметка',
+            'targets': ['title'],
+        })
+        note.refresh_from_db()
+        self.assertEqual(note.title, 'User1 Заметка 0')
+        self.assertEqual(note.text, 'Test text')
+
+    def test_bulk_replace_case_sensitive(self):
+        """Заметка с подстрокой в другом регистре не получает ревизию."""
+        note = self.notes_user1[0]
+        self.authenticated_client.post(self.bulk_replace_url, {
+            'notes': [note.slug],
+            'find': 'TEST',
+            'replace': 'Сводка',
+            'targets': ['title', 'text'],
+        })
+        self.assertEqual(
+            Note.objects.get(pk=note.pk).revision, note.revision
+        )
+
+    def test_bulk_export_zip(self):
+        """В архиве по файлу Markdown на каждую свою заметку."""
+        response = self.authenticated_client.get(
+            self.bulk_export_url, {'format': 'zip'})
+        self.assertTrue(response.streaming)
+        archive = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content))
+        )
+        self.assertCountEqual(
+            archive.namelist(),
+            [f'{note.slug}.md' for note in self.notes_user1],
+        )
+        note = self.notes_user1[0]
+        self.assertEqual(
+            archive.read(f'{note.slug}.md').decode(),
+            f'# {note.title}\n\n{note.text}\n',
+        )
+
+    def test_bulk_export_markdown_selected(self):
+        """Выгружаются только выбранные свои заметки."""
+        response = self.authenticated_client.get(self.bulk_export_url, {
+            'format': 'md',
+            'notes': [self.notes_user1[1].slug, self.notes_user2[0].slug],
+        })
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.count('# '), 1)
+        self.assertIn(self.notes_user1[1].title, content)
+
+
+class SlugConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+    NOTES_PER_THREAD = 5
+    LOCK_RETRIES = 5000
+
+    def create_note(self, author):
+        # Тестовая БД SQLite в памяти сразу отвечает «table is locked»
+        # на конкурентную запись, поэтому повторяем, но не бесконечно.
+        for _ in range(self.LOCK_RETRIES):
+            try:
+                return Note.objects.create(
+                    title='Одинаковый заголовок', text='Текст', author=author
+                )
+            except OperationalError:
+                time.sleep(0.001)
+        return Note.objects.create(
+            title='Одинаковый заголовок', text='Текст', author=author
+        )
+
+    def create_notes(self, author):
+        try:
+            return [
+                self.create_note(author).slug
+                for _ in range(self.NOTES_PER_THREAD)
+            ]
+        finally:
+            connection.close()
+
+    def test_identical_titles_from_many_threads(self):
+        """Заметки с одинаковым заголовком из разных потоков получают
+        разные slug без ошибок уникальности.
+        """
+        author = User.objects.create_user(username='stress')
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            results = list(executor.map(
+                self.create_notes, [author] * self.THREADS
+            ))
+        slugs = [slug for thread_slugs in results for slug in thread_slugs]
+        self.assertEqual(len(slugs), self.THREADS * self.NOTES_PER_THREAD)
+        self.assertEqual(len(set(slugs)), len(slugs))
+        self.assertIn(slugify('Одинаковый заголовок'), slugs)
@@ -0,0 +1,71 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.middleware import ReplicaPinMiddleware
+from notes.models import Note
+from notes.routers import end_request, start_request, sync_replicas
+
+
+@skipUnless('replica' in settings.DATABASES, 'Псевдоним replica не объявлен.')
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    # Все объявленные базы: без реплики класс пропускается целиком.
+    databases = '__all__'
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='replica_author')
+        self.client.force_login(self.author)
+        self.list_url = reverse('notes:list')
+        sync_replicas()
+        self.replica = connections['replica']
+
+    def test_list_read_from_replica(self):
+        """Список читается с реплики и видит заметку после синхронизации."""
+        Note.objects.create(
+            title='Свежая заметка', text='Текст', author=self.author)
+        with CaptureQueriesContext(self.replica) as queries:
+            response = self.client.get(self.list_url)
+        self.assertTrue(queries.captured_queries)
+        self.assertNotContains(response, 'Свежая заметка')
+        sync_replicas()
+        self.assertContains(self.client.get(self.list_url), 'Свежая заметка')
+
+    def test_reads_after_write_stay_on_primary(self):
+        """После записи клиент некоторое время читает с основной базы."""
+        response = self.client.post(reverse('notes:add'), data={
+            'title': 'Заметка', 'text': 'Текст', 'slug': 'replica-note',
+        })
+        cookie = response.cookies[ReplicaPinMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], 10)
+        with CaptureQueriesContext(self.replica) as queries:
+            response = self.client.get(self.list_url)
+        self.assertFalse(queries.captured_queries)
+        self.assertContains(response, 'replica-note')
+
+    def test_reads_outside_requests_on_primary(self):
+        """Вне запросов и внутри транзакций чтения идут на основную базу."""
+        self.assertEqual(router.db_for_read(Note), DEFAULT_DB_ALIAS)
+        token = start_request(pinned=False)
+        try:
+            self.assertEqual(router.db_for_read(Note), 'replica')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Note), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_write(Note), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_read(Note), DEFAULT_DB_ALIAS)
+        finally:
+            self.assertTrue(end_request(token))
+
+    @override_settings(DATABASE_REPLICAS=['missing'])
+    def test_undeclared_replica_falls_back_to_primary(self):
+        """Реплика без записи в DATABASES не используется."""
+        token = start_request(pinned=False)
+        try:
+            self.assertEqual(router.db_for_read(Note), DEFAULT_DB_ALIAS)
+        finally:
+            end_request(token)
@@ -16,6 +16,10 @@ class PublicPagesTests(CommonTestCase):
             self.list_url,
             self.add_url,
             self.success_url,
+            self.search_url,
+            self.bulk_delete_url,
+            self.bulk_replace_url,
+            self.bulk_export_url,
             self.detail_url(self.notes_user1[0].slug),
             self.edit_url(self.notes_user1[0].slug),
             self.delete_url(self.notes_user1[0].slug),
@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from notes.models import Note, NoteTerm
+from notes.stemming import stem
+
+from .common import CommonTestCase
+
+
+class SearchTestsMixin:
+
+    def setUp(self):
+        call_command('rebuild_notes_index', stdout=StringIO())
+        self.shopping = Note.objects.create(
+            title='Список покупок', text='Купить молоко и хлеб',
+            author=self.user1,
+        )
+        self.trip = Note.objects.create(
+            title='Поездка', text='Не забыть список вещей и купить билеты',
+            author=self.user1,
+        )
+
+    def search(self, query, client=None):
+        response = (client or self.authenticated_client).get(
+            self.search_url, {'q': query}
+        )
+        return [note.id for note in response.context['object_list']]
+
+    def test_morphology(self):
+        """Поиск находит другие формы слова."""
+        self.assertEqual(
+            set(self.search('купил')), {self.shopping.id, self.trip.id}
+        )
+        self.assertEqual(self.search('билетов купили'), [self.trip.id])
+        self.assertEqual(self.search('молока'), [self.shopping.id])
+
+    def test_title_ranked_higher(self):
+        """Совпадение в заголовке важнее совпадения в тексте."""
+        self.assertEqual(
+            self.search('список'), [self.shopping.id, self.trip.id]
+        )
+
+    def test_search_scoped_to_author(self):
+        """Чужие заметки в результаты не попадают."""
+        self.assertEqual(
+            self.search('молоко', self.another_authenticated_client), []
+        )
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении заметки."""
+        self.shopping.text = 'Купить кефир'
+        self.shopping.save()
+        self.assertEqual(self.search('молоко'), [])
+        self.assertEqual(self.search('кефира'), [self.shopping.id])
+        self.shopping.delete()
+        self.assertEqual(self.search('кефир'), [])
+
+    def test_same_words_of_other_author_ignored(self):
+        """Совпадения в чужих заметках не мешают поиску автора."""
+        Note.objects.create(
+            title='Список', text='Купить молоко', author=self.user2,
+        )
+        self.assertEqual(self.search('молоко'), [self.shopping.id])
+
+    def test_long_word(self):
+        """Слово длиннее колонки индекса находится по полному запросу."""
+        word = 'а' * (NoteTerm.TERM_MAX_LENGTH + 10)
+        note = Note.objects.create(
+            title='Длинное', text=word, author=self.user1,
+        )
+        self.assertEqual(self.search(word), [note.id])
+
+    def test_empty_query(self):
+        """Пустой запрос ничего не ищет."""
+        self.assertEqual(self.search(''), [])
+
+
+@override_settings(NOTES_SEARCH_BACKEND='fts5')
+class FTS5SearchTests(SearchTestsMixin, CommonTestCase):
+    pass
+
+
+@override_settings(NOTES_SEARCH_BACKEND='tokens')
+class TokenIndexSearchTests(SearchTestsMixin, CommonTestCase):
+    pass
+
+
+class StemmerTests(CommonTestCase):
+
+    def test_russian_stems(self):
+        """Формы одного слова сводятся к общей основе."""
+        for words in (
+            ('заметка', 'заметки', 'заметками'),
+            ('купить', 'купил', 'купила'),
+            ('красивый', 'красивая', 'красивейший'),
+        ):
+            with self.subTest(words=words):
+                self.assertEqual(len({stem(word) for word in words}), 1)
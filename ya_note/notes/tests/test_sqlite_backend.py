@@ -0,0 +1,68 @@
+import tempfile
+import threading
+from pathlib import Path
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+
+class SQLiteBackendTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'db.sqlite3'
+        self.connection = self.open_database()
+        self.addCleanup(self.connection.close)
+        with self.connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+
+    def open_database(self, **options):
+        handler = ConnectionHandler({DEFAULT_DB_ALIAS: {
+            'ENGINE': 'notes.backends.sqlite3',
+            'NAME': self.path,
+            'OPTIONS': options,
+        }})
+        connection = handler[DEFAULT_DB_ALIAS]
+        self.addCleanup(connection.close)
+        return connection
+
+    @staticmethod
+    def pragma(connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """При подключении включаются WAL и остальные прагмы."""
+        self.assertEqual(self.pragma(self.connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(self.connection, 'synchronous'), 1)
+        self.assertEqual(self.pragma(self.connection, 'busy_timeout'), 5000)
+        other = self.open_database(pragmas={'busy_timeout': 100})
+        self.assertEqual(self.pragma(other, 'busy_timeout'), 100)
+
+    def test_transaction_takes_write_lock(self):
+        """Транзакция сразу берёт блокировку записи."""
+        other = self.open_database(
+            pragmas={'busy_timeout': 0}, lock_retries=0)
+        self.connection._start_transaction_under_autocommit()
+        with self.assertRaisesMessage(OperationalError, 'locked'):
+            other._start_transaction_under_autocommit()
+        self.connection.rollback()
+
+    def test_write_retried_on_lock(self):
+        """Запись, не дождавшаяся блокировки, повторяется."""
+        other = self.open_database(
+            pragmas={'busy_timeout': 0}, lock_retries=5)
+        self.connection._start_transaction_under_autocommit()
+        self.connection.inc_thread_sharing()
+        release = threading.Timer(0.1, self.connection.rollback)
+        release.start()
+        with other.cursor() as cursor:
+            cursor.execute('INSERT INTO item (id) VALUES (1)')
+        release.join()
+        self.connection.dec_thread_sharing()
+        with other.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM item')
+            self.assertEqual(cursor.fetchone(), (1,))
@@ -0,0 +1,40 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+
+from notes.templatetags.url_patterns import fill_url, url_pattern
+
+from .common import CommonTestCase
+
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+
+class HotTemplateTests(CommonTestCase):
+
+    def test_url_pattern_matches_reverse(self):
+        """Заполненный шаблон адреса совпадает с результатом reverse."""
+        for viewname in ('notes:detail', 'notes:edit', 'notes:delete'):
+            with self.subTest(viewname=viewname):
+                self.assertEqual(
+                    fill_url(url_pattern(viewname), 'note-slug'),
+                    reverse(viewname, args=['note-slug']),
+                )
+
+    @skipUnless(jinja2, 'Jinja2 не установлен')
+    def test_jinja2_list_matches_django(self):
+        """Список заметок на Jinja2 совпадает со списком на Django."""
+        pages = []
+        for engine in ('django', 'jinja2'):
+            with override_settings(
+                TEMPLATES=[*settings.TEMPLATES, settings.JINJA2_TEMPLATES],
+                HOT_TEMPLATE_ENGINE=engine,
+            ):
+                response = self.authenticated_client.get(self.list_url)
+            pages.append(' '.join(response.content.decode().split()))
+        self.assertEqual(pages[0], pages[1])
+        self.assertIn(self.detail_url(self.notes_user1[0].slug), pages[1])
@@ -1,6 +1,7 @@
 from django.urls import path
 
-from notes import views
+from notes import api, views
+from notes.async_views import read_view
 
 app_name = 'notes'
 
@@ -8,8 +9,23 @@ urlpatterns = [
     path('', views.Home.as_view(), name='home'),
     path('add/', views.NoteCreate.as_view(), name='add'),
     path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
-    path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
+    path(
+        'note/<slug:slug>/', read_view(views.NoteDetail.as_view()),
+        name='detail'
+    ),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
-    path('notes/', views.NotesList.as_view(), name='list'),
+    path('notes/', read_view(views.NotesList.as_view()), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('bulk/delete/', views.NoteBulkDelete.as_view(), name='bulk_delete'),
+    path(
+        'bulk/replace/', views.NoteBulkReplace.as_view(), name='bulk_replace'
+    ),
+    path('bulk/export/', views.NoteBulkExport.as_view(), name='bulk_export'),
+    path('api/notes/', api.NoteListApi.as_view(), name='api_list'),
+    path('api/changes/', api.NoteChangesApi.as_view(), name='changes'),
+    path(
+        'api/notes/<slug:slug>/', api.NoteDetailApi.as_view(),
+        name='api_detail'
+    ),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
@@ -1,9 +1,30 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Q, Value
+from django.db.models.functions import Left, Replace, StrIndex
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .export import EXPORT_FORMATS
+from .forms import NoteForm, NoteReplaceForm, NoteSelectionForm
 from .models import Note
+from .search import get_backend
+from .templatetags.url_patterns import url_pattern
+
+
+def parse_cursor(value):
+    """
+    Курсор страницы — целое в пределах 64-битного id.
+
+    Для остальных значений выбрасывает ValueError: слишком большое число
+    иначе упало бы в драйвере БД.
+    """
+    cursor = int(value)
+    if abs(cursor) > BigIntegerField.MAX_BIGINT:
+        raise ValueError('Курсор вне диапазона id.')
+    return cursor
 
 
 class Home(generic.TemplateView):
@@ -26,22 +47,38 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class HotTemplateMixin:
+    """Шаблон рендерится движком HOT_TEMPLATE_ENGINE: django или jinja2."""
+
+    @property
+    def template_engine(self):
+        return settings.HOT_TEMPLATE_ENGINE
+
+
+class NoteFormMixin:
+    """Сохранение заметки с обработкой занятого slug."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            form.add_slug_error()
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteBase, NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -49,11 +86,152 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
-class NotesList(NoteBase, generic.ListView):
+class NotesList(HotTemplateMixin, NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        """
+        Заметки после ?after=<id> в порядке id, только выводимые поля.
+
+        Индекс (author, id) позволяет читать страницу без OFFSET.
+        """
+        queryset = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        after = self.request.GET.get('after')
+        if after:
+            try:
+                queryset = queryset.filter(id__gt=parse_cursor(after))
+            except ValueError:
+                raise Http404('Некорректный курсор страницы.')
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        per_page = settings.NOTES_COUNT_ON_LIST_PAGE
+        notes = list(self.object_list[:per_page + 1])
+        context = super().get_context_data(
+            object_list=notes[:per_page], **kwargs
+        )
+        context['next_after'] = (
+            notes[per_page - 1].id if len(notes) > per_page else None
+        )
+        context['detail_url'] = url_pattern('notes:detail')
+        return context
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Полнотекстовый поиск по своим заметкам."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        """Найденные заметки в порядке релевантности."""
+        self.query = self.request.GET.get('q', '').strip()
+        if not self.query:
+            return []
+        note_ids = get_backend().search(
+            self.request.user, self.query, settings.NOTES_SEARCH_RESULTS
+        )
+        notes = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).in_bulk(note_ids)
+        return [notes[note_id] for note_id in note_ids if note_id in notes]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+class NoteBulkMixin(NoteBase):
+    """Операция над несколькими заметками, выбранными по slug."""
+    template_name = 'notes/bulk.html'
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['author'] = self.request.user
+        return kwargs
+
+    def get_initial(self):
+        """Выбор можно передать в GET, чтобы показать форму подтверждения."""
+        return {'notes': self.request.GET.getlist('notes')}
+
+
+class NoteBulkDelete(NoteBulkMixin, generic.FormView):
+    """Удаление выбранных заметок одним запросом."""
+    form_class = NoteSelectionForm
+    extra_context = {'title': 'Удалить выбранные заметки'}
+
+    def form_valid(self, form):
+        with transaction.atomic():
+            form.cleaned_data['notes'].delete()
+        return super().form_valid(form)
+
+
+class NoteBulkReplace(NoteBulkMixin, generic.FormView):
+    """Замена подстроки в выбранных заметках."""
+    form_class = NoteReplaceForm
+    extra_context = {'title': 'Заменить в выбранных заметках'}
+
+    def form_valid(self, form):
+        """
+        Замена выполняется одним UPDATE с функцией REPLACE.
+
+        update() не отправляет сигналы, поэтому изменённые заметки
+        получают ревизии и переиндексируются для поиска явно. Заметки
+        отбираются через StrIndex: как и REPLACE, он учитывает регистр,
+        а __contains на SQLite — нет.
+        """
+        find = form.cleaned_data['find']
+        replace = form.cleaned_data['replace']
+        positions = {}
+        changed = Q()
+        updates = {}
+        for target in form.cleaned_data['targets']:
+            positions[f'{target}_position'] = StrIndex(target, Value(find))
+            changed |= Q(**{f'{target}_position__gt': 0})
+            expression = Replace(target, Value(find), Value(replace))
+            max_length = self.model._meta.get_field(target).max_length
+            if max_length:
+                expression = Left(expression, max_length)
+            updates[target] = expression
+        with transaction.atomic():
+            note_ids = list(
+                form.cleaned_data['notes'].annotate(**positions)
+                .filter(changed)
+                .values_list('id', flat=True)
+            )
+            notes = self.model.objects.filter(pk__in=note_ids)
+            notes.update_with_revision(**updates)
+            get_backend().index_notes(
+                notes.only('id', 'author_id', 'title', 'text')
+            )
+        return super().form_valid(form)
+
+
+class NoteBulkExport(NoteBase, generic.View):
+    """Потоковая выгрузка выбранных или всех заметок пользователя."""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            export, content_type, filename = EXPORT_FORMATS[
+                request.GET.get('format', 'zip')
+            ]
+        except KeyError:
+            raise Http404('Неизвестный формат выгрузки.')
+        notes = self.get_queryset().only('slug', 'title', 'text')
+        slugs = request.GET.getlist('notes')
+        if slugs:
+            notes = notes.filter(slug__in=slugs)
+        response = StreamingHttpResponse(
+            export(notes.order_by('id')), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"'
+        )
+        return response
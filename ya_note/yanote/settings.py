@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -10,6 +11,8 @@ DEBUG = False
 
 ALLOWED_HOSTS = ['*']
 
+INTERNAL_IPS = ['127.0.0.1']
+
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -22,7 +25,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'notes.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -33,14 +38,20 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yanote.urls'
 
+# Шаблоны компилируются один раз на процесс (cached.Loader); после
+# правки шаблона сервер нужно перезапустить.
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
-                'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
@@ -49,16 +60,67 @@ TEMPLATES = [
     },
 ]
 
+# Список заметок можно рендерить Jinja2 (pip install jinja2): шаблоны из
+# jinja2/ дают тот же HTML. Включается переменной окружения
+# HOT_TEMPLATE_ENGINE=jinja2.
+JINJA2_TEMPLATES = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'DIRS': [BASE_DIR / 'jinja2'],
+    'OPTIONS': {
+        'environment': 'notes.jinja2.environment',
+        'context_processors': [
+            'django.contrib.auth.context_processors.auth',
+        ],
+    },
+}
+HOT_TEMPLATE_ENGINE = os.environ.get('HOT_TEMPLATE_ENGINE', 'django')
+if HOT_TEMPLATE_ENGINE == 'jinja2':
+    TEMPLATES.append(JINJA2_TEMPLATES)
+
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+# SQLite с WAL и прагмами для одновременных запросов, см.
+# notes.backends.sqlite3. Соединения живут дольше запроса, чтобы не
+# открывать файл и не выполнять прагмы каждый раз.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'notes.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+    },
+}
+
+# Реплики только для чтения, см. notes.routers. Локально реплика — копия
+# файла основной базы, её обновляет notes.routers.sync_replicas();
+# включается переменной окружения DATABASE_REPLICA с путём к файлу.
+# Тесты объявляют псевдоним сами, см. notes/tests/conftest.py.
+if os.environ.get('DATABASE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'notes.backends.sqlite3',
+        'NAME': os.environ.get(
+            'DATABASE_REPLICA', BASE_DIR / 'db.replica.sqlite3'
+        ),
+        'CONN_MAX_AGE': 60,
+    }
+DATABASE_REPLICAS = ['replica'] if os.environ.get('DATABASE_REPLICA') else []
+DATABASE_ROUTERS = ['notes.routers.ReplicaRouter']
+# Сколько секунд после записи клиент читает с основной базы, пока
+# реплики её догоняют.
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Сессии и пользователи сессий читаются из кеша, см. notes.backends.
+# С несколькими процессами кеш должен быть общим (Memcached, Redis).
+SESSION_ENGINE = 'notes.backends.sessions'
+AUTHENTICATION_BACKENDS = ['notes.backends.auth.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 60
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +149,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 100
+
+# Бэкенд поиска: 'fts5' — SQLite FTS5, 'tokens' — обратный индекс
+# в таблице NoteTerm, 'auto' — FTS5, если таблица для него создана.
+# После смены бэкенда выполните manage.py rebuild_notes_index.
+NOTES_SEARCH_BACKEND = 'auto'
+NOTES_SEARCH_RESULTS = 50
+
+NOTES_CHANGES_LIMIT = 500
+
+# Асинхронные страницы чтения; включаются в asgi.py. Размер пула потоков,
+# в котором они обращаются к БД, подбирается под число соединений СУБД.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+ASYNC_VIEWS_THREADS = int(os.environ.get('ASYNC_VIEWS_THREADS', 4))
+
+# Замеры запросов (notes.instrumentation): доля запросов с замером от 0
+# (выключено) до 1, порог повторов одного SQL для признака N+1. Счётчики
+# отдаются по /metrics/ адресам из INTERNAL_IPS.
+INSTRUMENTATION_SAMPLE_RATE = float(
+    os.environ.get('INSTRUMENTATION_SAMPLE_RATE', 0)
+)
+INSTRUMENTATION_DUPLICATE_THRESHOLD = 3